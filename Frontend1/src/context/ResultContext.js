@@ -1,12 +1,24 @@
-import React, { createContext, useContext, useState } from "react";
+import React, { createContext, useCallback, useContext, useState } from "react";
 
 const ResultContext = createContext(null); // <- 현재 null
 
 export const ResultProvider = ({ children }) => {
   const [result, setResult] = useState(null); // 분석 결과 저장
 
+  // ✅ 단계별 부분 결과(SSE stage 이벤트의 patch) 병합: { report: {...} } / { whisper: {...} }
+  const applyPatch = useCallback((patch) => {
+    setResult((prev) => {
+      const next = { ...(prev || {}) };
+      Object.entries(patch || {}).forEach(([key, value]) => {
+        const isObject = value && typeof value === "object" && !Array.isArray(value);
+        next[key] = isObject ? { ...(next[key] || {}), ...value } : value;
+      });
+      return next;
+    });
+  }, []);
+
   return (
-    <ResultContext.Provider value={{ result, setResult }}>
+    <ResultContext.Provider value={{ result, setResult, applyPatch }}>
       {children}
     </ResultContext.Provider>
   );
@@ -16,7 +16,7 @@ const QUESTIONS = [
 
 export default function Interview() {
   const navigate = useNavigate();
-  const { setResult } = useResult(); // ✅ Context setter
+  const { setResult, applyPatch } = useResult(); // ✅ Context setter
   const videoRef = useRef(null);
   const mediaRef = useRef({ recorder: null, chunks: [], stream: null });
   const questionTimer = useRef(null);
@@ -72,14 +72,32 @@ export default function Interview() {
     formData.append("video", blob, "recording.webm");
     formData.append("user_id", "demo_user_123");
 
-    try {
-      const isLocal =
-        window.location.hostname === "localhost" ||
-        window.location.hostname === "127.0.0.1";
+    const isLocal =
+      window.location.hostname === "localhost" ||
+      window.location.hostname === "127.0.0.1";
+    const API_BASE = isLocal
+      ? "http://127.0.0.1:5000/fersona/api"
+      : "https://fersona.cloud/fersona/api";
+
+    // ✅ 단계별 부분 결과 (시선/표정 → 전사 → 억양 → 피드백) 를 SSE 로 받아 카드별로 먼저 표시
+    // - job_id 를 미리 정해 업로드보다 먼저 스트림을 연결
+    const jobId = crypto.randomUUID().replace(/-/g, "");
+    let navigated = false;
+    setResult(null);
+    const events = new EventSource(`${API_BASE}/jobs/${jobId}/events`);
+    events.addEventListener("stage", (e) => {
+      const { patch } = JSON.parse(e.data);
+      applyPatch(patch);
+      if (!navigated) {
+        navigated = true;
+        navigate("/report-menu");
+      }
+    });
+    events.addEventListener("done", () => events.close());
+    events.addEventListener("failed", () => events.close());
 
-      const API_URL = isLocal
-        ? "http://127.0.0.1:5000/upload"
-        : "https://fersona.cloud/fersona/api/upload";
+    try {
+      const API_URL = `${API_BASE}/upload?job_id=${jobId}`;
 
       console.log("🚀 업로드 시작:", API_URL);
 
@@ -88,21 +106,33 @@ export default function Interview() {
         body: formData,
       });
 
+      // ✅ 분석 대기열이 가득 찬 경우 (Retry-After 초 후 재시도 안내)
+      if (response.status === 429) {
+        const retryAfter = response.headers.get("Retry-After") || "잠시";
+        alert(`⏳ 분석 요청이 많습니다. ${retryAfter}초 후 다시 시도해주세요.`);
+        return;
+      }
+
       if (!response.ok) throw new Error(`서버 응답 오류: ${response.status}`);
 
       const result = await response.json();
       console.log("✅ 업로드 성공:", result);
 
+      // ✅ 최종 결과 (미리보기 / 영상 경로 포함) 로 교체
       if (result) {
         setResult(result.result || result);
         console.log("[Context] 분석 결과 저장 완료 ✅");
       }
 
-      alert("✅ 영상 업로드 및 분석 완료!");
-      navigate("/report-menu");
+      if (!navigated) {
+        alert("✅ 영상 업로드 및 분석 완료!");
+        navigate("/report-menu");
+      }
     } catch (err) {
       console.error("❌ 업로드 실패:", err);
       alert("⚠️ 업로드 중 오류가 발생했습니다. 콘솔을 확인해주세요.");
+    } finally {
+      events.close();
     }
   };
 
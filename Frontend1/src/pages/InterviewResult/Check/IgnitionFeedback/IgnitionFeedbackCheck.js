@@ -37,11 +37,15 @@ export default function FeedbackReport() {
   const report = result.report || {};
 
   // ✅ Whisper 피드백 데이터
+  // - 구간 항목은 message_id 만 갖고, 문구는 feedback.messages 카탈로그에서 조회 (예전 결과는 항목에 문구 포함)
+  const messages = whisper.feedback?.messages || {};
+  const withMessage = (item) =>
+    item.message_id ? { ...(messages[item.message_id] || {}), ...item } : item;
   const speechFeedbackData = Array.isArray(whisper.feedback?.speech)
-    ? whisper.feedback.speech
+    ? whisper.feedback.speech.map(withMessage)
     : [];
   const pitchFeedbackData = Array.isArray(whisper.feedback?.pitch)
-    ? whisper.feedback.pitch
+    ? whisper.feedback.pitch.map(withMessage)
     : [];
 
   // ✅ 비정상 구간만 필터링
@@ -50,6 +54,7 @@ export default function FeedbackReport() {
   );
   const abnormalPitchData = pitchFeedbackData.filter(
     (d) =>
+      d.pitch_label === -1 ||
       d.feedback?.includes("억양 변화") ||
       d.feedback?.includes("단조") ||
       d.feedback?.includes("억양이 낮습니다")
@@ -66,8 +71,9 @@ export default function FeedbackReport() {
   const chartValues = timeLabels.map((_, idx) => {
     const start = idx * interval;
     const end = start + interval;
+    // 병합된 구간은 여러 칸에 걸칠 수 있으므로 겹치는 구간 기준
     const inRange = speechFeedbackData.filter(
-      (item) => item.start_time >= start && item.end_time <= end
+      (item) => item.start_time < end && item.end_time > start
     );
     if (inRange.length === 0) return 0;
     const avg = inRange.reduce((sum, cur) => sum + (cur.wpm_label ?? 0), 0);
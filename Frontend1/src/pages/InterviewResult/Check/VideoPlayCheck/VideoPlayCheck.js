@@ -16,26 +16,37 @@ export default function VideoPlayCheck() {
       let videoPath = result.video_file.trim();
       let absoluteUrl = "";
 
-      // ✅ 1️⃣ 이미 http로 시작하면 그대로 사용
+      // ✅ 재생은 /fersona/api/playback/<key> (Range/ETag 지원 + 쿼터 정리용 최근 재생 시각 기록)
+      //    정적 경로 /fersona/api/uploads/<key> 와 같은 key 를 사용
+      const playbackUrl = (key) => `https://fersona.cloud/fersona/api/playback/${key}`;
+
+      // ✅ 1️⃣ 이미 http로 시작하면 그대로 사용 (객체 저장소 / CDN)
       if (videoPath.startsWith("http")) {
         absoluteUrl = videoPath;
 
+      // ✅ 서버가 내려준 공개 경로 (/fersona/api/uploads/blobs/ab/cd/<hash>.webm)
+      } else if (videoPath.startsWith("/fersona/api/uploads/")) {
+        absoluteUrl = playbackUrl(videoPath.slice("/fersona/api/uploads/".length));
+
+      } else if (videoPath.startsWith("/fersona/api/")) {
+        absoluteUrl = `https://fersona.cloud${videoPath}`;
+
       // ✅ 2️⃣ /tmp 경로이지만 파일명이 존재할 경우 (업로드된 파일)
       } else if (videoPath.includes("/tmp/")) {
         const fileName = videoPath.split("/").pop();
         // FastAPI가 업로드 완료 후 실제 저장 폴더로 이동시킨 파일 접근
-        absoluteUrl = `https://fersona.cloud/fersona/api/uploads/${fileName}`;
+        absoluteUrl = playbackUrl(fileName);
         console.log(`[VideoPlayCheck] tmp 경로 변환됨 → ${absoluteUrl}`);
 
       // ✅ 3️⃣ 서버 내부 경로 (/home/ubuntu/fersona/uploads)
       } else if (videoPath.includes("/uploads/")) {
         const fileName = videoPath.split("/").pop();
-        absoluteUrl = `https://fersona.cloud/fersona/api/uploads/${fileName}`;
+        absoluteUrl = playbackUrl(fileName);
 
       // ✅ 4️⃣ 나머지 상대경로 처리
       } else {
         const fileName = videoPath.split("/").pop();
-        absoluteUrl = `https://fersona.cloud/fersona/api/uploads/${fileName}`;
+        absoluteUrl = playbackUrl(fileName);
       }
 
       console.log("[VideoPlayCheck] 최종 videoUrl =", absoluteUrl);
@@ -17,7 +17,8 @@ CREATE TABLE IF NOT EXISTS guest_sessions (
     token VARCHAR(128) NOT NULL UNIQUE,
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     expires_at TIMESTAMP NOT NULL,
-    metadata_json JSON NULL
+    metadata_json JSON NULL,
+    INDEX IX_guest_sessions_expires_at (expires_at)
 );
 
 -- VIDEOS
@@ -29,10 +30,18 @@ CREATE TABLE IF NOT EXISTS videos (
     guest_token VARCHAR(128),
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     metadata_json JSON NULL,
+    content_hash CHAR(64) NULL,
+    size_bytes BIGINT NULL,
+    storage_tier VARCHAR(16) NOT NULL DEFAULT 'original',
+    tier_changed_at DATETIME NULL,
+    last_accessed_at DATETIME NULL,
     CONSTRAINT FK_videos_users_owner FOREIGN KEY (owner_id) REFERENCES users(id) ON DELETE SET NULL,
     CONSTRAINT FK_videos_guest FOREIGN KEY (guest_token) REFERENCES guest_sessions(token) ON DELETE CASCADE,
     INDEX IX_videos_owner_id (owner_id),
-    INDEX IX_videos_guest_token (guest_token)
+    INDEX IX_videos_guest_token (guest_token),
+    INDEX IX_videos_content_hash (content_hash),
+    INDEX IX_videos_tier_created (storage_tier, created_at),
+    INDEX IX_videos_owner_accessed (owner_id, last_accessed_at)
 );
 
 -- INTERVIEW_FEEDBACK_SECTIONS
@@ -115,3 +124,35 @@ CREATE TABLE IF NOT EXISTS interview_results (
     owner_id INT,
     CONSTRAINT FK_interview_results_users FOREIGN KEY (owner_id) REFERENCES users(id) ON DELETE SET NULL
 );
+
+-- REPORTS
+CREATE TABLE IF NOT EXISTS reports (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    interview_id INT NOT NULL,
+    file_path VARCHAR(512) NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    INDEX IX_reports_interview_id (interview_id)
+);
+
+-- USER_SCORE_AGGREGATES
+CREATE TABLE IF NOT EXISTS user_score_aggregates (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    metric VARCHAR(32) NOT NULL,
+    count INT NOT NULL DEFAULT 0,
+    mean FLOAT NOT NULL DEFAULT 0,
+    best FLOAT,
+    last FLOAT,
+    recent JSON NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    CONSTRAINT FK_score_aggregates_users FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    UNIQUE KEY UX_user_score_aggregates_user_metric (user_id, metric)
+);
+
+-- ANALYSIS_RESULT (기존 테이블은 create_all 이 컬럼/인덱스를 추가하지 않으므로 배포 전에 1회 실행)
+ALTER TABLE analysis_result
+    ADD COLUMN trace_json JSON NULL,
+    ADD COLUMN video_id INT NULL,
+    ADD CONSTRAINT FK_analysis_result_videos FOREIGN KEY (video_id) REFERENCES videos(id) ON DELETE SET NULL,
+    ADD INDEX IX_analysis_result_video_id (video_id),
+    ADD INDEX IX_analysis_result_user_created (user_id, created_at);
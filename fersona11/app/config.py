@@ -16,6 +16,107 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "defaultsecretkey"           # 기본값, .env가 있으면 덮어씀
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60          # 기본값, 필요 시 .env에서 덮어쓰기
 
+    # ----------------------------
+    # ✅ 업로드 / 재생 설정
+    # ----------------------------
+    UPLOAD_DIR: str = "/home/ubuntu/fersona/uploads"
+    PLAYBACK_ACCEL_REDIRECT: str = ""              # 예: "/_protected_uploads/" (nginx sendfile 위임, 비우면 앱에서 직접 전송)
+
+    # ----------------------------
+    # ✅ 미디어 저장소 백엔드 (local | s3)
+    # ----------------------------
+    STORAGE_BACKEND: str = "local"
+    S3_BUCKET: str = "fersona-media"
+    S3_ENDPOINT_URL: str = ""                      # MinIO 등 S3 호환 서버 (예: http://localhost:9000)
+    S3_REGION: str = "eu-north-1"
+    S3_ACCESS_KEY_ID: str = ""
+    S3_SECRET_ACCESS_KEY: str = ""
+    S3_PUBLIC_URL: str = ""                        # 공개/CDN 주소 (비우면 endpoint/bucket)
+    DIRECT_UPLOAD_EXPIRE_SEC: int = 900            # 직접 업로드 URL 유효 시간
+    DIRECT_UPLOAD_MAX_MB: int = 1024               # 직접 업로드 1건 최대 크기 (로컬 PUT 수신 / S3 POST 정책)
+    STORAGE_PRIVATE_DIR: str = "/home/ubuntu/fersona/upload_private"   # 공개 마운트(UPLOAD_DIR) 밖: 임시 파일(.tmp) / 직접 업로드 대기(incoming/)
+    STORAGE_STALE_SEC: int = 21600                 # 완료되지 않은 incoming/ 객체 · 남은 임시 파일 정리 기준 (6시간)
+
+    # ----------------------------
+    # ✅ 분석 작업 입장 제어 (프로세스당)
+    # ----------------------------
+    ANALYSIS_MAX_CONCURRENCY: int = 2              # 동시에 실행할 분석 수 (서버 전체, serve.py 워커 수로 나눔 - 워커당 최소 1)
+    ANALYSIS_QUEUE_DEPTH: int = 8                  # 대기열 길이 (초과 시 429, 서버 전체 기준)
+    ANALYSIS_QUEUE_TIMEOUT_SEC: float = 0.0        # 대기열 최대 대기 시간 (0 이면 무제한)
+    ANALYSIS_DURATION_EWMA_ALPHA: float = 0.2      # 작업 시간 이동 평균 가중치
+    ANALYSIS_INITIAL_DURATION_SEC: float = 30.0    # 측정 전 작업 시간 추정값
+    ANALYSIS_PRELOAD_MODELS: bool = False          # 시작 시 Whisper/FaceMesh 미리 로드 (분석 워커용, 기본은 첫 분석 때)
+    ANALYSIS_TARGET_COMPLETION_SEC: float = 0.0    # 업로드~결과 목표 시간, 넘을 것 같으면 가벼운 분석 설정으로 (0 이면 항상 기본 설정)
+
+    # ----------------------------
+    # ✅ 시선/표정(FaceMesh) 입력 설정
+    # ----------------------------
+    VISION_WORK_MAX_SIDE: int = 640                # 프레임 긴 변을 이 크기로 축소 후 처리 (0 이면 원본 해상도)
+    VISION_ROI_TRACKING: bool = True               # 얼굴을 찾은 뒤에는 직전 위치 주변만 잘라서 처리
+    VISION_ROI_PADDING: float = 0.35               # ROI 여백 (랜드마크 bbox 한 변 대비, 양쪽 각각)
+    VISION_ROI_MIN_SIDE: int = 192                 # ROI 최소 한 변 (px, 작업 해상도 기준)
+
+    # ----------------------------
+    # ✅ 비회원 데이터 만료 스윕 설정
+    # ----------------------------
+    GUEST_SWEEP_INTERVAL_SEC: int = 60             # 스윕 주기
+    GUEST_SWEEP_BATCH_SIZE: int = 500              # 한 배치에서 삭제할 세션 수
+    GUEST_SWEEP_MAX_BATCHES: int = 10              # 1회 스윕당 최대 배치 수
+
+    # ----------------------------
+    # ✅ 영상 보관 단계 / 용량 쿼터 설정
+    # ----------------------------
+    RETENTION_INTERVAL_SEC: int = 600              # 보관 작업 주기
+    RETENTION_ORIGINAL_HOURS: int = 72             # 원본을 유지하는 기간 (이후 저용량 변환 후 원본 삭제)
+    RETENTION_TRANSCODE_BATCH: int = 4             # 1회 작업당 최대 변환 개수
+    TRANSCODE_CLAIM_TIMEOUT_SEC: int = 3600        # 변환 중 상태가 이보다 오래되면 재시도
+    TRANSCODE_MAX_HEIGHT: int = 480                # 리뷰용 해상도 상한
+    TRANSCODE_CRF: int = 40                        # VP9 화질 (클수록 저용량)
+    TRANSCODE_AUDIO_BITRATE: str = "48k"
+    USER_STORAGE_QUOTA_MB: int = 1024              # 회원당 영상 용량 한도 (0 이면 무제한)
+    QUOTA_SWEEP_USERS: int = 100                   # 1회 작업당 쿼터 검사할 최대 사용자 수
+
+    # ----------------------------
+    # ✅ PDF 리포트 설정
+    # ----------------------------
+    REPORT_DIR: str = "/home/ubuntu/fersona/reports"   # 결과 id + 설정 버전별 PDF 캐시
+    REPORT_FONT_PATH: str = ""                     # 한글 TTF (비우면 내장 CID 폰트)
+    REPORT_LOGO_PATH: str = ""
+    REPORT_RENDER_WORKERS: int = 2                 # 백그라운드 렌더링 스레드 수
+
+    # ----------------------------
+    # ✅ 운영 서버 (serve.py pre-fork) 설정
+    # ----------------------------
+    SERVE_HOST: str = "0.0.0.0"
+    SERVE_PORT: int = 5000
+    SERVE_WORKERS: int = 0                         # 0 이면 CPU 코어 수
+    SERVE_PRELOAD_WHISPER: bool = True             # 마스터에서 1회 로드 → 워커들이 copy-on-write 로 공유
+    SERVE_TORCH_THREADS: int = 0                   # 워커당 torch 스레드 (0 이면 코어 수 / 워커 수)
+    SERVE_MAX_WORKER_MEMORY_MB: int = 0            # 워커 고유 메모리(공유 페이지 제외) 상한, 넘으면 교체 (0 이면 무제한)
+    SERVE_MEMORY_CHECK_SEC: float = 10.0
+    SERVE_GRACEFUL_TIMEOUT_SEC: int = 300          # 교체/종료 시 진행 중 분석을 기다리는 시간
+    RUN_BACKGROUND_JOBS: bool = True               # 만료 스윕 / 보관 정책 스레드 실행 여부 (serve.py 는 워커 0번만)
+
+    # ----------------------------
+    # ✅ 단계별 부분 결과 (SSE) 설정
+    # ----------------------------
+    PROGRESS_POLL_SEC: float = 0.5                 # SSE 가 진행 문서를 다시 읽는 간격
+    PROGRESS_HEARTBEAT_SEC: float = 15.0           # 변화가 없을 때 연결 유지용 주석 전송 간격
+    PROGRESS_WAIT_FOR_JOB_SEC: float = 60.0        # 업로드보다 SSE 가 먼저 열렸을 때 작업 등록을 기다리는 시간
+    PROGRESS_STREAM_MAX_SEC: float = 1800.0        # SSE 연결 1개의 최대 유지 시간
+    PROGRESS_RETENTION_HOURS: int = 24             # 끝난 진행 문서 보관 기간 (만료 스위퍼가 삭제)
+
+    # ----------------------------
+    # ✅ 작업 트레이스 / 디버그 설정
+    # ----------------------------
+    TRACE_PROFILE_SAMPLE_RATE: float = 0.0         # 샘플링 프로파일러를 붙일 작업 비율 (0~1)
+    DEBUG_TOKEN: str = ""                          # /debug 엔드포인트 토큰 (비우면 비활성)
+
+    # ----------------------------
+    # ✅ 점수 추이(trend) 설정
+    # ----------------------------
+    SCORE_HISTORY_WINDOW: int = 10                 # 지표별로 보관할 최근 점수 개수
+
     class Config:
         # 루트 디렉토리의 .env 파일 자동 로드
         env_file = ".env"
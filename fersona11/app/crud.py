@@ -1,4 +1,7 @@
-from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+from fastapi import Response
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session, Query
 from app import models, schemas
 from passlib.context import CryptContext
 
@@ -67,7 +70,7 @@ def create_feedback(db: Session, feedback: schemas.FeedbackCreate):
 
 
 # ===== GazeData =====
-def create_gaze(db: Session, gaze: schemas.GazeDataCreate):
+def create_gaze(db: Session, gaze: schemas.GazeCreate):
     """
     시선 데이터 저장
     """
@@ -76,3 +79,88 @@ def create_gaze(db: Session, gaze: schemas.GazeDataCreate):
     db.commit()
     db.refresh(db_gaze)
     return db_gaze
+
+
+# ===== Bulk insert =====
+BULK_INSERT_MAX_ROWS = 1000
+
+
+_consecutive_ids: Dict[str, bool] = {}    # 엔진 URL → 다중 VALUES INSERT 의 id 가 연속으로 할당되는지
+
+
+def _multi_row_ids_consecutive(db: Session) -> bool:
+    """
+    MySQL 에서 한 INSERT 의 id 가 lastrowid 부터 1씩 연속인지 (엔진별 1회 확인)
+    - auto_increment_increment = 1 이고 innodb_autoinc_lock_mode 가 0(traditional) / 1(consecutive) 일 때만 보장
+    - MySQL 8 기본값 2(interleaved) 에서는 동시 INSERT 와 id 가 섞일 수 있음
+    """
+    bind = db.get_bind()
+    key = str(bind.url)
+    if key not in _consecutive_ids:
+        consecutive = False
+        if bind.dialect.name == "mysql":
+            try:
+                increment, lock_mode = db.execute(
+                    text("SELECT @@auto_increment_increment, @@innodb_autoinc_lock_mode")
+                ).one()
+                consecutive = int(increment) == 1 and int(lock_mode) in (0, 1)
+            except Exception as e:
+                print(f"[BULK] auto_increment 설정 확인 실패 → 행 단위 INSERT: {e}")
+        _consecutive_ids[key] = consecutive
+    return _consecutive_ids[key]
+
+
+def bulk_insert(db: Session, model, rows: List[dict]) -> List[int]:
+    """
+    여러 행을 저장하고 생성된 id 를 입력 순서대로 반환
+    - 커밋은 호출자가 수행 (한 트랜잭션)
+    - RETURNING 지원 DB: INSERT 한 문장(multi-VALUES) + 반환된 id 사용
+    - MySQL 이고 id 가 연속 할당되는 설정: INSERT 한 문장 + lastrowid(첫 id) 부터 순서대로 계산
+    - 그 외(interleaved 잠금 모드 등): 같은 트랜잭션 안에서 행마다 INSERT (id 는 행별 lastrowid)
+    """
+    if not rows:
+        return []
+    table = model.__table__
+    dialect = db.get_bind().dialect
+
+    if dialect.insert_returning:
+        stmt = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+        return list(db.execute(stmt, rows).scalars())
+
+    if _multi_row_ids_consecutive(db):
+        result = db.execute(insert(table).values(rows))
+        first_id = int(result.lastrowid)
+        return list(range(first_id, first_id + len(rows)))
+
+    return [db.execute(insert(table).values(row)).inserted_primary_key[0] for row in rows]
+
+
+def missing_video_ids(db: Session, video_ids) -> List[int]:
+    """주어진 video_id 중 videos 에 없는 것 (한 번의 IN 조회)"""
+    wanted = set(video_ids)
+    if not wanted:
+        return []
+    found = {row.id for row in db.query(models.Video.id).filter(models.Video.id.in_(wanted))}
+    return sorted(wanted - found)
+
+
+# ===== Pagination =====
+PAGE_SIZE_DEFAULT = 50
+PAGE_SIZE_MAX = 200
+
+
+def keyset_page(query: Query, id_column, after_id: Optional[int] = None, limit: int = PAGE_SIZE_DEFAULT):
+    """
+    id 기준 커서(keyset) 페이지 조회
+    - OFFSET 없이 `id > after_id ORDER BY id LIMIT n` 으로 인덱스만 타고 내려감
+    - 테이블 크기와 무관하게 페이지당 비용 일정
+    """
+    if after_id is not None:
+        query = query.filter(id_column > after_id)
+    return query.order_by(id_column.asc()).limit(limit).all()
+
+
+def set_next_cursor(response: Response, items: list, limit: int) -> None:
+    """다음 페이지가 있을 수 있으면 X-Next-After-Id 헤더로 커서 전달"""
+    if items and len(items) >= limit:
+        response.headers["X-Next-After-Id"] = str(items[-1].id)
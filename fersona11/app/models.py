@@ -1,3 +1,4 @@
+import secrets
 from sqlalchemy import (
     Column,
     Integer,
@@ -8,7 +9,12 @@ from sqlalchemy import (
     ForeignKey,
     Text,
     JSON,
+    LargeBinary,
+    BigInteger,
+    UniqueConstraint,
+    Index,
 )
+from sqlalchemy.dialects.mysql import LONGBLOB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -39,23 +45,185 @@ class User(Base):
 # =====================================================
 class AnalysisResult(Base):
     __tablename__ = "analysis_result"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        Index("IX_analysis_result_user_created", "user_id", "created_at"),
+        {"extend_existing": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    video_id = Column(Integer, ForeignKey("videos.id", ondelete="SET NULL"), nullable=True, index=True)
 
     # 업로드된 파일 정보
     video_file = Column(String(255), nullable=False)
     audio_file = Column(String(255), nullable=True)
 
-    # 분석 결과
+    # 분석 결과 (result_data 는 점수/피드백 요약만, 구간·프레임 시계열은 detail 테이블)
     transcript = Column(Text, nullable=True)
     duration_sec = Column(Float, nullable=True)
     result_data = Column(JSON, nullable=True)
 
+    # 작업 트레이스 (단계별 span / 선택적 프로파일, 느린 작업 분석용)
+    trace_json = Column(JSON, nullable=True)
+
     # 생성 일시
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
 
     # 관계 설정 (N:1)
     user = relationship("User", back_populates="analysis_results")
 
+
+# =====================================================
+# ✅ 분석 상세 문서(AnalysisResultDetail) 테이블 모델
+# - segments / 프레임별 시계열 등 큰 값만 압축 저장 (요약 행 스캔 비용과 분리)
+# =====================================================
+class AnalysisResultDetail(Base):
+    __tablename__ = "analysis_result_details"
+    __table_args__ = {"extend_existing": True}
+
+    result_id = Column(Integer, ForeignKey("analysis_result.id", ondelete="CASCADE"), primary_key=True)
+    schema_version = Column(Integer, nullable=False)
+    codec = Column(String(32), nullable=False)          # 예: "zstd+orjson", "zlib+json"
+    raw_size = Column(Integer, nullable=False)          # 압축 전 바이트 수
+    payload = Column(LargeBinary().with_variant(LONGBLOB, "mysql"), nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+
+
+# =====================================================
+# ✅ 비회원 세션(GuestSession) 테이블 모델
+# =====================================================
+class GuestSession(Base):
+    __tablename__ = "guest_sessions"
+    __table_args__ = {"extend_existing": True}
+
+    id = Column(Integer, primary_key=True, index=True)
+    token = Column(String(128), unique=True, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)  # 만료 스윕용 인덱스
+    metadata_json = Column(JSON, nullable=True)
+
+    @staticmethod
+    def create_token() -> str:
+        return secrets.token_urlsafe(32)
+
+
+# =====================================================
+# ✅ 영상(Video) 테이블 모델
+# =====================================================
+class Video(Base):
+    __tablename__ = "videos"
+    __table_args__ = (
+        Index("IX_videos_tier_created", "storage_tier", "created_at"),
+        Index("IX_videos_owner_accessed", "owner_id", "last_accessed_at"),
+        {"extend_existing": True},
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    filename = Column(String(512), nullable=False)
+    original_name = Column(String(512), nullable=True)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
+    guest_token = Column(
+        String(128),
+        ForeignKey("guest_sessions.token", ondelete="CASCADE"),
+        nullable=True,
+        index=True,
+    )
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    metadata_json = Column(JSON, nullable=True)
+
+    # 내용 주소 저장소(blobs/) 정보 - 같은 content_hash 행 수가 참조 카운트
+    content_hash = Column(String(64), nullable=True, index=True)
+    size_bytes = Column(BigInteger, nullable=True)
+
+    # 보관 단계: original(원본) → transcoding → compact(리뷰용 저용량) / failed / evicted(쿼터 초과로 파일 삭제)
+    storage_tier = Column(String(16), nullable=False, default="original", server_default="original")
+    tier_changed_at = Column(DateTime, nullable=True)
+    last_accessed_at = Column(DateTime, nullable=True)
+
+
+# =====================================================
+# ✅ 피드백(Feedback) 테이블 모델
+# =====================================================
+class Feedback(Base):
+    __tablename__ = "feedbacks"
+    __table_args__ = {"extend_existing": True}
+
+    id = Column(Integer, primary_key=True, index=True)
+    video_id = Column(Integer, ForeignKey("videos.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
+    guest_token = Column(String(128), nullable=True, index=True)
+    content = Column(Text, nullable=True)
+    auto_saved = Column(Boolean, default=False, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+
+# =====================================================
+# ✅ 시선 데이터(GazeData) 테이블 모델
+# =====================================================
+class GazeData(Base):
+    __tablename__ = "gaze_data"
+    __table_args__ = {"extend_existing": True}
+
+    id = Column(Integer, primary_key=True, index=True)
+    video_id = Column(Integer, ForeignKey("videos.id", ondelete="CASCADE"), nullable=False, index=True)
+    feedback_id = Column(Integer, ForeignKey("feedbacks.id"), nullable=True, index=True)
+    result_json = Column(JSON, nullable=True)
+    raw_blob = Column(LargeBinary().with_variant(LONGBLOB, "mysql"), nullable=True)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+
+# =====================================================
+# ✅ 리포트(Report) 테이블 모델
+# =====================================================
+class Report(Base):
+    __tablename__ = "reports"
+    __table_args__ = {"extend_existing": True}
+
+    id = Column(Integer, primary_key=True, index=True)
+    interview_id = Column(Integer, nullable=False, index=True)
+    file_path = Column(String(512), nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+
+# =====================================================
+# ✅ 사용자별 점수 누적 집계(UserScoreAggregate) 테이블 모델
+# =====================================================
+class UserScoreAggregate(Base):
+    __tablename__ = "user_score_aggregates"
+    __table_args__ = (
+        UniqueConstraint("user_id", "metric", name="UX_user_score_aggregates_user_metric"),
+        {"extend_existing": True},
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    metric = Column(String(32), nullable=False)   # gaze / expression / speech / pitch
+
+    # 증분 집계값
+    count = Column(Integer, default=0, nullable=False)
+    mean = Column(Float, default=0.0, nullable=False)
+    best = Column(Float, nullable=True)
+    last = Column(Float, nullable=True)
+    recent = Column(JSON, nullable=True)          # 최근 N회 [{result_id, score, at}]
+
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+
+# =====================================================
+# ✅ 분석 작업 진행 문서(AnalysisJob) 테이블 모델
+# - 파이프라인이 단계별 부분 결과를 기록 → SSE 엔드포인트가 읽어서 전송
+# - 업로드를 받은 워커와 SSE 를 받는 워커가 달라도 같은 문서를 봄
+# =====================================================
+class AnalysisJob(Base):
+    __tablename__ = "analysis_jobs"
+    __table_args__ = {"extend_existing": True}
+
+    job_id = Column(String(32), primary_key=True)
+    user_id = Column(String(150), nullable=True)          # 업로드 요청의 user_id (username)
+    status = Column(String(16), nullable=False, default="queued")   # queued / running / done / error
+    version = Column(Integer, nullable=False, default=0)  # 문서가 바뀔 때마다 1 증가
+    document = Column(JSON, nullable=True)                # {"stages": {name: {"seq", "patch"}}, "error": ...}
+    result_id = Column(Integer, ForeignKey("analysis_result.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), nullable=False, index=True)
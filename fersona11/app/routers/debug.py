@@ -0,0 +1,72 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import get_db
+from app import models
+
+# 느린 작업 목록을 고를 때 살펴볼 최근 결과 수
+RECENT_SCAN_LIMIT = 200
+
+
+def require_debug_token(x_debug_token: Optional[str] = Header(default=None)) -> None:
+    """DEBUG_TOKEN 미설정 시 엔드포인트 자체를 숨김(404), 토큰 불일치 시 403"""
+    if not settings.DEBUG_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_debug_token != settings.DEBUG_TOKEN:
+        raise HTTPException(status_code=403, detail="invalid debug token")
+
+
+router = APIRouter(prefix="/debug", tags=["debug"], dependencies=[Depends(require_debug_token)])
+
+
+def _summary(result_id: int, created_at, trace: dict) -> dict:
+    spans = trace.get("spans") or []
+    slowest = max(spans, key=lambda s: s.get("duration_ms", 0), default=None)
+    return {
+        "result_id": result_id,
+        "job_id": trace.get("job_id"),
+        "created_at": created_at,
+        "duration_ms": trace.get("duration_ms"),
+        "media_duration_sec": next(
+            (s["attrs"]["media_duration_sec"] for s in spans if "media_duration_sec" in s.get("attrs", {})),
+            None,
+        ),
+        "slowest_span": slowest.get("name") if slowest else None,
+        "slowest_span_ms": slowest.get("duration_ms") if slowest else None,
+        "profiled": "profile" in trace,
+    }
+
+
+# ===========================
+# 최근 작업 중 느린 순 목록
+# ===========================
+@router.get("/traces")
+def list_slow_traces(limit: int = Query(20, ge=1, le=100), db: Session = Depends(get_db)):
+    rows = (
+        db.query(models.AnalysisResult.id, models.AnalysisResult.created_at, models.AnalysisResult.trace_json)
+        .filter(models.AnalysisResult.trace_json.isnot(None))
+        .order_by(models.AnalysisResult.id.desc())
+        .limit(RECENT_SCAN_LIMIT)
+        .all()
+    )
+    items = [_summary(r.id, r.created_at, r.trace_json) for r in rows if isinstance(r.trace_json, dict)]
+    items.sort(key=lambda item: item["duration_ms"] or 0, reverse=True)
+    return {"scanned": len(rows), "traces": items[:limit]}
+
+
+# ===========================
+# 결과 1건의 전체 트레이스
+# ===========================
+@router.get("/traces/{result_id}")
+def get_trace(result_id: int, db: Session = Depends(get_db)):
+    row = (
+        db.query(models.AnalysisResult.id, models.AnalysisResult.trace_json)
+        .filter(models.AnalysisResult.id == result_id)
+        .first()
+    )
+    if row is None:
+        raise HTTPException(status_code=404, detail="Result not found")
+    if not row.trace_json:
+        raise HTTPException(status_code=404, detail="No trace recorded for this result")
+    return {"result_id": row.id, "trace": row.trace_json}
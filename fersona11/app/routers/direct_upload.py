@@ -0,0 +1,153 @@
+import os
+import hmac
+import hashlib
+import traceback
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from app import schemas
+from app.config import settings
+from app.services.storage import blob_store, LocalStorageBackend, INCOMING_PREFIX
+from app.services.pipeline import run_upload_pipeline, adopt_upload
+from app.routers.jobs import start_job_progress
+from app.services.result_payload import parse_include, slim_result
+from app.services.admission import analysis_admission, AdmissionRejected
+from app.utils.json_response import FastJSONResponse
+from app.utils.metrics import stage_timer
+from app.utils.tracing import JobTrace, use_trace, annotate
+
+router = APIRouter(tags=["direct-upload"])
+
+# 직접 업로드로 받는 형식 (MediaRecorder / 일반 영상 파일)
+ALLOWED_CONTENT_TYPES = (
+    "video/webm", "video/mp4", "video/quicktime", "video/x-matroska", "video/ogg",
+    "audio/webm", "audio/mp4", "audio/mpeg", "audio/ogg", "audio/wav", "audio/x-wav",
+)
+
+
+def _max_upload_bytes() -> int:
+    return settings.DIRECT_UPLOAD_MAX_MB * 1024 * 1024
+
+
+def _content_type(value: str) -> str:
+    """"video/webm;codecs=vp8,opus" → "video/webm" (허용 목록 밖이면 415)"""
+    base = (value or "").split(";", 1)[0].strip().lower()
+    if base not in ALLOWED_CONTENT_TYPES:
+        raise HTTPException(status_code=415, detail=f"지원하지 않는 형식입니다: {value}")
+    return base
+
+
+def _check_incoming_key(key: str) -> None:
+    parts = key.split("/")
+    if parts[0] != INCOMING_PREFIX or len(parts) != 2 or ".." in parts or not parts[1]:
+        raise HTTPException(status_code=400, detail="잘못된 업로드 키")
+
+
+def _upload_token(key: str, user_id: str) -> str:
+    """발급한 incoming 키를 요청한 user_id 에 묶는 서명 (다른 사용자가 남의 업로드를 완료 처리하지 못하게)"""
+    msg = f"upload:{key}:{user_id}".encode()
+    return hmac.new(settings.SECRET_KEY.encode(), msg, hashlib.sha256).hexdigest()
+
+
+# ===========================
+# 1) 업로드 URL 발급
+# ===========================
+@router.post("/upload/presign", response_model=schemas.PresignUploadOut)
+def presign_upload(body: schemas.PresignUploadIn):
+    """
+    브라우저가 영상을 저장소로 바로 PUT 할 수 있는 서명 URL 발급
+    - S3/MinIO: presigned put_object URL
+    - 로컬: 이 서버의 /storage/{key} 서명 URL
+    - upload_token: 완료 요청 때 같은 user_id 인지 확인하는 서명
+    - 영상/음성 형식만, 크기는 DIRECT_UPLOAD_MAX_MB 까지
+    """
+    content_type = _content_type(body.content_type)
+    key = blob_store.new_incoming_key(body.filename)
+    expires_in = settings.DIRECT_UPLOAD_EXPIRE_SEC
+    signed = blob_store.backend.presign_upload(key, content_type, expires_in, _max_upload_bytes())
+    return schemas.PresignUploadOut(
+        key=key, expires_in=expires_in, upload_token=_upload_token(key, body.user_id), **signed
+    )
+
+
+# ===========================
+# 2) 로컬 백엔드용 서명 PUT 수신
+# ===========================
+@router.put("/storage/{key:path}")
+async def put_object(key: str, expires: int, signature: str, request: Request):
+    backend = blob_store.backend
+    if not isinstance(backend, LocalStorageBackend):
+        raise HTTPException(status_code=404, detail="Not found")
+    _check_incoming_key(key)
+    if not backend.verify_upload_signature(key, expires, signature):
+        raise HTTPException(status_code=403, detail="서명이 유효하지 않거나 만료되었습니다.")
+
+    max_bytes = _max_upload_bytes()
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes:
+        raise HTTPException(status_code=413, detail="업로드 최대 크기를 넘었습니다.")
+
+    dest = backend.path(key)
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    tmp_path = dest + ".part"
+    try:
+        # 요청 본문을 메모리에 모으지 않고 그대로 디스크로 흘려보냄 (최대 크기를 넘으면 중단)
+        received = 0
+        with open(tmp_path, "wb") as out:
+            async for chunk in request.stream():
+                received += len(chunk)
+                if received > max_bytes:
+                    raise HTTPException(status_code=413, detail="업로드 최대 크기를 넘었습니다.")
+                out.write(chunk)
+        os.replace(tmp_path, dest)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return {"key": key}
+
+
+# ===========================
+# 3) 업로드 완료 → 분석
+# ===========================
+@router.post("/upload/complete")
+async def complete_upload(
+    body: schemas.CompleteUploadIn,
+    include: Optional[str] = None,
+    job_id: Optional[str] = None,
+):
+    """
+    저장소에 올라간 incoming/ 객체를 blob 으로 편입하고 기존 업로드와 같은 분석 실행
+    응답 형식(?include= / ?job_id= 포함)은 POST /fersona/api/upload 와 동일
+    """
+    _check_incoming_key(body.key)
+    if not hmac.compare_digest(_upload_token(body.key, body.user_id), body.upload_token):
+        raise HTTPException(status_code=403, detail="이 사용자에게 발급된 업로드 키가 아닙니다.")
+    if not await run_in_threadpool(blob_store.backend.exists, body.key):
+        raise HTTPException(status_code=404, detail="업로드된 파일이 없습니다.")
+
+    progress = await start_job_progress(job_id, body.user_id)
+    try:
+        print(f"[UPLOAD] 직접 업로드 완료 user_id={body.user_id}, key={body.key}, job_id={progress.job_id}")
+        trace = JobTrace(
+            "direct_upload", job_id=progress.job_id, user_id=body.user_id, filename=body.filename or body.key
+        )
+        async with analysis_admission.slot():
+            with use_trace(trace), stage_timer("upload_adopt"):
+                blob, video_id = await run_in_threadpool(adopt_upload, body.key, body.filename, body.user_id)
+                annotate(size=blob.size, dedup=not blob.created)
+            result_data = await run_in_threadpool(
+                run_upload_pipeline, body.user_id, blob, body.filename or body.key, trace, progress, video_id
+            )
+        print("[UPLOAD] 전체 프로세스 완료 ✅")
+        return FastJSONResponse(
+            {"result": slim_result(result_data, parse_include(include))},
+            headers={"X-Job-Id": progress.job_id},
+        )
+    except AdmissionRejected as e:
+        await run_in_threadpool(progress.fail, e.reason)
+        raise
+    except Exception as e:
+        await run_in_threadpool(progress.fail, f"{type(e).__name__}: {e}")
+        print("[ERROR] 직접 업로드 처리 중 예외 발생:", e)
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
-from app import models, schemas
+from app import models, schemas, crud
 
 router = APIRouter(prefix="/feedbacks", tags=["feedbacks"])
 
@@ -34,10 +35,54 @@ def create_feedback(feedback: schemas.FeedbackCreate, db: Session = Depends(get_
     db.refresh(fb)
     return fb  # 스키마 FeedbackOut에서 id, content 등 반환
 
+@router.post("/bulk", response_model=schemas.BulkCreateOut, status_code=201)
+def create_feedbacks_bulk(feedbacks: list[schemas.FeedbackCreate], db: Session = Depends(get_db)):
+    """
+    피드백 일괄 생성 (구간/질문별 데이터를 한 번에)
+    - 전체를 먼저 검증하고, 하나라도 실패하면 아무것도 저장하지 않음
+    - 한 번의 INSERT + 한 번의 커밋, 생성 id 를 요청 순서대로 반환
+    """
+    if len(feedbacks) > crud.BULK_INSERT_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"max {crud.BULK_INSERT_MAX_ROWS} items per request")
+
+    invalid = [i for i, fb in enumerate(feedbacks) if not fb.user_id and not fb.guest_token]
+    if invalid:
+        raise HTTPException(status_code=400, detail={"error": "user_id or guest_token required", "indexes": invalid})
+
+    missing = crud.missing_video_ids(db, [fb.video_id for fb in feedbacks])
+    if missing:
+        raise HTTPException(status_code=404, detail={"error": "Video not found", "video_ids": missing})
+
+    rows = [
+        {
+            "video_id": fb.video_id,
+            "user_id": fb.user_id,
+            "guest_token": fb.guest_token,
+            "content": fb.content,
+            "auto_saved": bool(fb.auto_saved),
+        }
+        for fb in feedbacks
+    ]
+    try:
+        ids = crud.bulk_insert(db, models.Feedback, rows)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"ids": ids}
+
 @router.get("/video/{video_id}", response_model=list[schemas.FeedbackOut])
-def list_feedbacks(video_id: int, db: Session = Depends(get_db)):
+def list_feedbacks(
+    video_id: int,
+    response: Response,
+    after_id: Optional[int] = Query(None, ge=0),
+    limit: int = Query(crud.PAGE_SIZE_DEFAULT, ge=1, le=crud.PAGE_SIZE_MAX),
+    db: Session = Depends(get_db),
+):
     """
-    특정 영상에 대한 피드백 리스트 조회
+    특정 영상에 대한 피드백 리스트 조회 (커서 페이지네이션)
     """
-    feedbacks = db.query(models.Feedback).filter(models.Feedback.video_id == video_id).all()
+    query = db.query(models.Feedback).filter(models.Feedback.video_id == video_id)
+    feedbacks = crud.keyset_page(query, models.Feedback.id, after_id, limit)
+    crud.set_next_cursor(response, feedbacks, limit)
     return feedbacks
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session, load_only
 from app.database import SessionLocal
-from app import models, schemas
+from app import models, schemas, crud
 
 router = APIRouter(prefix="/gaze", tags=["gaze"])
 
@@ -20,7 +21,7 @@ def create_gaze(gaze: schemas.GazeCreate, db: Session = Depends(get_db)):
     gd = models.GazeData(
         video_id=gaze.video_id,
         feedback_id=gaze.feedback_id,
-        result_json=gaze.result,  # 모델 컬럼명 맞춤
+        result_json=gaze.result_json,  # 모델 컬럼명 맞춤
         raw_blob=gaze.raw_blob
     )
     db.add(gd)
@@ -28,10 +29,97 @@ def create_gaze(gaze: schemas.GazeCreate, db: Session = Depends(get_db)):
     db.refresh(gd)
     return gd
 
-@router.get("/video/{video_id}", response_model=list[schemas.GazeOut])
-def list_gaze(video_id: int, db: Session = Depends(get_db)):
+@router.post("/bulk", response_model=schemas.BulkCreateOut, status_code=201)
+def create_gaze_bulk(entries: list[schemas.GazeCreate], db: Session = Depends(get_db)):
     """
-    특정 영상에 대한 시선 데이터 조회
+    시선 데이터 일괄 생성
+    - 전체를 먼저 검증하고, 하나라도 실패하면 아무것도 저장하지 않음
+    - 한 번의 INSERT + 한 번의 커밋, 생성 id 를 요청 순서대로 반환
     """
-    entries = db.query(models.GazeData).filter(models.GazeData.video_id == video_id).all()
+    if len(entries) > crud.BULK_INSERT_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"max {crud.BULK_INSERT_MAX_ROWS} items per request")
+
+    missing = crud.missing_video_ids(db, [e.video_id for e in entries])
+    if missing:
+        raise HTTPException(status_code=404, detail={"error": "Video not found", "video_ids": missing})
+
+    rows = [
+        {
+            "video_id": e.video_id,
+            "feedback_id": e.feedback_id,
+            "result_json": e.result_json,
+            "raw_blob": e.raw_blob,
+        }
+        for e in entries
+    ]
+    try:
+        ids = crud.bulk_insert(db, models.GazeData, rows)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"ids": ids}
+
+@router.get("/video/{video_id}", response_model=list[schemas.GazeListItem])
+def list_gaze(
+    video_id: int,
+    response: Response,
+    after_id: Optional[int] = Query(None, ge=0),
+    limit: int = Query(crud.PAGE_SIZE_DEFAULT, ge=1, le=crud.PAGE_SIZE_MAX),
+    db: Session = Depends(get_db),
+):
+    """
+    특정 영상에 대한 시선 데이터 목록 조회 (커서 페이지네이션)
+    - result_json / raw_blob 은 읽지 않음 → 상세 조회에서 include 로 요청
+    """
+    query = (
+        db.query(models.GazeData)
+        .options(load_only(
+            models.GazeData.id,
+            models.GazeData.video_id,
+            models.GazeData.feedback_id,
+            models.GazeData.created_at,
+        ))
+        .filter(models.GazeData.video_id == video_id)
+    )
+    entries = crud.keyset_page(query, models.GazeData.id, after_id, limit)
+    crud.set_next_cursor(response, entries, limit)
     return entries
+
+@router.get("/{gaze_id}", response_model=schemas.GazeOut)
+def get_gaze(
+    gaze_id: int,
+    include: Optional[str] = Query(None, description="쉼표 구분: result_json,raw_blob"),
+    db: Session = Depends(get_db),
+):
+    """
+    시선 데이터 상세 조회
+    - 무거운 컬럼(result_json, raw_blob)은 include 로 요청한 경우에만 로드
+    """
+    heavy = {"result_json", "raw_blob"}
+    requested = {f.strip() for f in include.split(",")} & heavy if include else set()
+
+    columns = [
+        models.GazeData.id,
+        models.GazeData.video_id,
+        models.GazeData.feedback_id,
+        models.GazeData.created_at,
+    ] + [getattr(models.GazeData, name) for name in sorted(requested)]
+
+    gd = (
+        db.query(models.GazeData)
+        .options(load_only(*columns))
+        .filter(models.GazeData.id == gaze_id)
+        .first()
+    )
+    if not gd:
+        raise HTTPException(status_code=404, detail="Gaze data not found")
+
+    return schemas.GazeOut(
+        id=gd.id,
+        video_id=gd.video_id,
+        feedback_id=gd.feedback_id,
+        created_at=gd.created_at,
+        result_json=gd.result_json if "result_json" in requested else None,
+        raw_blob=gd.raw_blob if "raw_blob" in requested else None,
+    )
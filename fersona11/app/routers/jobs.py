@@ -0,0 +1,120 @@
+import time
+import asyncio
+from typing import Any, AsyncIterator, Dict, Optional
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from app.config import settings
+from app.database import SessionLocal
+from app.services.progress import (
+    FINAL_STATUSES, JobIdInUse, ProgressPublisher, load_job, new_job_id,
+)
+from app.utils.json_response import dumps
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+# ===========================
+# 업로드 엔드포인트 공통: 진행 문서 등록
+# ===========================
+async def start_job_progress(requested_job_id: Optional[str], user_id: Optional[str]) -> ProgressPublisher:
+    """?job_id= (클라이언트가 SSE 를 먼저 열 때) 확인 후 queued 상태로 등록"""
+    try:
+        job_id = new_job_id(requested_job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        return await run_in_threadpool(ProgressPublisher.create, job_id, user_id)
+    except JobIdInUse:
+        raise HTTPException(status_code=409, detail="이미 사용 중인 job_id 입니다.")
+
+
+def _read(job_id: str) -> Optional[Dict[str, Any]]:
+    db = SessionLocal()
+    try:
+        return load_job(db, job_id)
+    finally:
+        db.close()
+
+
+def _event(name: str, data: Dict[str, Any], event_id: Optional[int] = None) -> bytes:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return head.encode() + f"event: {name}\ndata: ".encode() + dumps(data) + b"\n\n"
+
+
+# ===========================
+# 진행 문서 조회 (SSE 를 못 쓰는 클라이언트 / 새로고침)
+# ===========================
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    doc = await run_in_threadpool(_read, job_id)
+    if doc is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return doc
+
+
+# ===========================
+# 단계별 부분 결과 스트림 (text/event-stream)
+# ===========================
+async def _stream(request: Request, job_id: str, last_seq: int) -> AsyncIterator[bytes]:
+    """
+    이벤트
+      - stage  : {"stage", "patch"} (id = 단계 seq → 재연결 시 Last-Event-ID 이후만)
+      - status : {"status"} (queued → running)
+      - done   : {"result_id"} / failed : {"error"} → 스트림 종료
+    진행 문서를 PROGRESS_POLL_SEC 마다 다시 읽음 (업로드를 받은 워커와 달라도 동작)
+    """
+    started = time.monotonic()
+    last_sent = started
+    seen_version, seen_status = -1, None
+    yield b"retry: 3000\n\n"
+
+    while True:
+        if await request.is_disconnected():
+            return
+        now = time.monotonic()
+        doc = await run_in_threadpool(_read, job_id)
+
+        if doc is None:
+            if now - started > settings.PROGRESS_WAIT_FOR_JOB_SEC:
+                yield _event("failed", {"error": "job_not_found"})
+                return
+        elif doc["version"] != seen_version:
+            seen_version = doc["version"]
+            stages = sorted(doc["stages"].items(), key=lambda item: item[1]["seq"])
+            for name, stage in stages:
+                if stage["seq"] > last_seq:
+                    yield _event("stage", {"stage": name, "patch": stage["patch"]}, event_id=stage["seq"])
+                    last_seq = stage["seq"]
+            if doc["status"] != seen_status:
+                seen_status = doc["status"]
+                if seen_status == "done":
+                    yield _event("done", {"result_id": doc["result_id"]})
+                elif seen_status == "error":
+                    yield _event("failed", {"error": doc["error"]})
+                else:
+                    yield _event("status", {"status": seen_status})
+            last_sent = now
+            if seen_status in FINAL_STATUSES:
+                return
+
+        if now - started > settings.PROGRESS_STREAM_MAX_SEC:
+            return
+        if now - last_sent > settings.PROGRESS_HEARTBEAT_SEC:
+            # 프록시가 유휴 연결을 끊지 않도록 주석 줄 전송
+            yield b": keep-alive\n\n"
+            last_sent = now
+        await asyncio.sleep(settings.PROGRESS_POLL_SEC)
+
+
+@router.get("/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request, last_event_id: Optional[str] = Header(default=None)):
+    try:
+        last_seq = int(last_event_id) if last_event_id else 0
+    except ValueError:
+        last_seq = 0
+    return StreamingResponse(
+        _stream(request, job_id, last_seq),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,50 @@
+import os
+import mimetypes
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import RedirectResponse
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import get_db
+from app.services.storage import blob_store, LocalStorageBackend
+from app.services.retention import touch_video_access
+from app.utils.file_response import ranged_file_response
+
+router = APIRouter(prefix="/playback", tags=["playback"])
+
+_VIDEO_TYPES = {".webm": "video/webm", ".mp4": "video/mp4", ".mkv": "video/x-matroska"}
+
+
+# ===========================
+# 업로드 영상 재생 (Range / ETag 지원)
+# ===========================
+@router.get("/{file_path:path}")
+def play_upload(file_path: str, request: Request, db: Session = Depends(get_db)):
+    # 재생 시작 요청(Range 없음 / 0 부터)만 쿼터 LRU 기준 시각으로 기록
+    range_header = request.headers.get("range", "")
+    if not range_header or range_header.replace(" ", "").startswith("bytes=0-"):
+        try:
+            touch_video_access(db, file_path)
+        except Exception as e:
+            db.rollback()
+            print(f"[PLAYBACK] 접근 시각 갱신 실패: {e}")
+
+    backend = blob_store.backend
+    if not isinstance(backend, LocalStorageBackend):
+        # 객체 저장소는 자체적으로 Range 를 지원 → 공개/CDN URL 로 넘김
+        if ".." in file_path.split("/"):
+            raise HTTPException(status_code=404, detail="File not found")
+        return RedirectResponse(blob_store.url(file_path), status_code=307)
+
+    root = os.path.realpath(backend.root)
+    full_path = os.path.realpath(os.path.join(root, file_path))
+    if not full_path.startswith(root + os.sep) or not os.path.isfile(full_path):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    ext = os.path.splitext(full_path)[1].lower()
+    media_type = _VIDEO_TYPES.get(ext) or mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+
+    accel = None
+    if settings.PLAYBACK_ACCEL_REDIRECT:
+        accel = settings.PLAYBACK_ACCEL_REDIRECT.rstrip("/") + "/" + os.path.relpath(full_path, root)
+
+    return ranged_file_response(request, full_path, media_type, accel_redirect=accel)
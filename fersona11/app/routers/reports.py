@@ -1,10 +1,10 @@
 # app/routers/reports.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
-from app import models, schemas
+from app import models, schemas, crud
 from app.database import get_db
 
 # ===========================
@@ -13,11 +13,18 @@ from app.database import get_db
 router = APIRouter(prefix="/reports", tags=["reports"])
 
 # ===========================
-# 전체 리포트 조회
+# 전체 리포트 조회 (커서 페이지네이션)
 # ===========================
 @router.get("/", response_model=List[schemas.ReportOut])
-def list_reports(db: Session = Depends(get_db)):
-    return db.query(models.Report).all()
+def list_reports(
+    response: Response,
+    after_id: Optional[int] = Query(None, ge=0),
+    limit: int = Query(crud.PAGE_SIZE_DEFAULT, ge=1, le=crud.PAGE_SIZE_MAX),
+    db: Session = Depends(get_db),
+):
+    reports = crud.keyset_page(db.query(models.Report), models.Report.id, after_id, limit)
+    crud.set_next_cursor(response, reports, limit)
+    return reports
 
 # ===========================
 # 특정 리포트 조회
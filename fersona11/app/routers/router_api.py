@@ -1,54 +1,74 @@
-from fastapi import APIRouter, FastAPI, UploadFile, File, Response
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, FastAPI, UploadFile, File, Request, Response
+from fastapi.responses import FileResponse, JSONResponse
 from pydantic import BaseModel
 import os
 
+from app.utils.file_response import ranged_file_response
+from app.services.pdf_report import request_report, report_filename, shutdown_report_workers
+
 router = APIRouter(prefix="/interview", tags=["interview"])
 
 # 저장 경로
-REPORT_DIR = "reports"
 VIDEO_DIR = "uploads"
-os.makedirs(REPORT_DIR, exist_ok=True)
 os.makedirs(VIDEO_DIR, exist_ok=True)
 
+REPORT_RETRY_AFTER_SEC = 2
+
 # ==========================
 # Request Body 모델
 # ==========================
 class ReportRequest(BaseModel):
-    video_file: str
-    gaze_ratio: float = 0.0
-    speech_speed_wpm: float = 0.0
-    expression: str = "neutral"
+    result_id: int            # analysis_result.id (결과 조회 / 업로드 API 의 result.id)
+    retry: bool = False       # 직전 생성 실패 시 다시 시도
 
 # ==========================
-# PDF 생성
+# PDF 생성 (백그라운드)
 # ==========================
+def _report_response(result_id: int, state: dict) -> JSONResponse:
+    body = {
+        "result_id": result_id,
+        "status": state["status"],
+        "pdf_file": f"report/download/{result_id}",
+    }
+    if state["status"] == "ready":
+        return JSONResponse(body)
+    if state["status"] == "failed":
+        body["error"] = state.get("error")
+        return JSONResponse(body, status_code=500)
+    return JSONResponse(body, status_code=202, headers={"Retry-After": str(REPORT_RETRY_AFTER_SEC)})
+
+
 @router.post("/report/generate/")
-def create_report(result: ReportRequest):
-    output_path = os.path.join(REPORT_DIR, f"interview_report_{result.video_file}.pdf")
-    # generate_interview_pdf(result.dict(), output_path)   # 실제 구현 함수 연결
-    return {"pdf_file": output_path}
+def create_report(body: ReportRequest):
+    """렌더링을 예약하고 바로 반환 (캐시가 있으면 ready)"""
+    return _report_response(body.result_id, request_report(body.result_id, retry=body.retry))
 
 # ==========================
 # PDF 다운로드
 # ==========================
-@router.get("/report/download/{filename}")
-def download_report(filename: str):
-    file_path = os.path.join(REPORT_DIR, filename)
-    if not os.path.exists(file_path):
-        return {"error": "File not found"}
-    return FileResponse(file_path, media_type='application/pdf', filename=filename)
+@router.get("/report/download/{result_id}")
+def download_report(result_id: int):
+    """캐시된 PDF 는 바로 전송, 없으면 생성을 예약하고 202"""
+    state = request_report(result_id)
+    if state["status"] != "ready":
+        return _report_response(result_id, state)
+    return FileResponse(
+        state["path"],
+        media_type="application/pdf",
+        filename=report_filename(result_id),
+        headers={"Cache-Control": "private, max-age=86400"},
+    )
 
 # ==========================
 # 비디오 반환 (재생용)
 # ==========================
 @router.get("/video/{video_id}")
-def get_video(video_id: str):
+def get_video(video_id: str, request: Request):
     # 실제 저장 포맷이 uploads/{video_id}_video.webm라고 가정
     video_path = os.path.join(VIDEO_DIR, f"{video_id}_video.webm")
     if not os.path.exists(video_path):
         return Response(status_code=404)
-    return FileResponse(video_path, media_type="video/webm")
+    return ranged_file_response(request, video_path, "video/webm")
 
 # ==========================
 # 비디오 업로드 예시 (선택)
@@ -65,3 +85,8 @@ async def upload_video(file: UploadFile = File(...)):
 # FastAPI에 router 등록
 app = FastAPI()
 app.include_router(router)
+
+
+@app.on_event("shutdown")
+def _stop_report_workers():
+    shutdown_report_workers()
@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app import models, schemas
+from app.services.score_history import TREND_METRICS
+
+router = APIRouter(prefix="/users", tags=["trends"])
+
+
+# ===========================
+# 사용자 점수 추이 조회
+# ===========================
+@router.get("/{username}/trend", response_model=schemas.UserTrendOut)
+def get_score_trend(username: str, db: Session = Depends(get_db)):
+    """
+    지표별 응시 횟수 / 평균 / 최고점 / 최근 N회 점수
+    - user_score_aggregates 의 사전 집계 행만 읽음 (응시 횟수와 무관하게 일정 비용)
+    """
+    user_row = db.query(models.User.id).filter(models.User.username == username).first()
+    if not user_row:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    rows = (
+        db.query(models.UserScoreAggregate)
+        .filter(models.UserScoreAggregate.user_id == user_row.id)
+        .all()
+    )
+    by_metric = {row.metric: row for row in rows}
+
+    metrics = []
+    for metric in TREND_METRICS:
+        row = by_metric.get(metric)
+        if row is None:
+            metrics.append(schemas.MetricTrendOut(metric=metric, count=0, mean=0.0))
+            continue
+        metrics.append(schemas.MetricTrendOut(
+            metric=metric,
+            count=row.count,
+            mean=round(row.mean, 1),
+            best=row.best,
+            last=row.last,
+            recent=row.recent or [],
+        ))
+
+    return {"user_id": username, "metrics": metrics}
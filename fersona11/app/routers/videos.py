@@ -1,48 +1,21 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session, load_only
 from datetime import datetime, timedelta
-import os
-import shutil
-import uuid
+from typing import Optional
 import random
-import threading
 
-from app import models, schemas
+from app import models, schemas, crud
 from app.database import get_db
 from app.utils.auth import get_current_user_optional
 from app.questions import INTERVIEW_QUESTIONS
+from app.services.storage import blob_store, StoredBlob
+from app.services.remux import remux_for_playback
+from app.services.pipeline import discard_video
 
 # ✅ 프론트 요청에 맞춰 prefix 변경
 # (프론트: http://localhost:5000/fersona/api/upload-media)
 router = APIRouter(prefix="", tags=["videos"])
 
-UPLOAD_DIR = "uploaded_videos"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
-
-# ===========================
-# 비회원 영상 자동 삭제 함수
-# ===========================
-def delete_guest_video(video_id: int, file_path: str, db_session_maker, delay_seconds: int = 3600):
-    """delay_seconds 후에 비회원 영상 DB와 파일 삭제 (Thread 기반)"""
-    def worker():
-        try:
-            threading.Event().wait(delay_seconds)  # non-blocking sleep
-            db = db_session_maker()
-            video = db.query(models.Video).filter(models.Video.id == video_id).first()
-            if video:
-                db.delete(video)
-                db.commit()
-            if os.path.exists(file_path):
-                os.remove(file_path)
-        except Exception as e:
-            print(f"Error deleting guest video {video_id}: {e}")
-        finally:
-            db.close()
-
-    thread = threading.Thread(target=worker, daemon=True)
-    thread.start()
-
 
 # ===========================
 # 면접 질문 랜덤 API
@@ -57,71 +30,79 @@ def get_interview_questions():
 # ===========================
 @router.post("/upload-media", response_model=schemas.VideoOut)
 def upload_video(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user_optional)
 ):
-    unique_filename = f"{uuid.uuid4()}_{file.filename}"
-    file_location = os.path.join(UPLOAD_DIR, unique_filename)
-
-    # 파일 저장
-    with open(file_location, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-
-    if current_user:
-        video = models.Video(
-            filename=file_location,
-            original_name=file.filename,
-            owner_id=current_user.id
-        )
-        db.add(video)
-        db.commit()
-        db.refresh(video)
-    else:
-        # 비회원 토큰 생성
-        token = models.GuestSession.create_token()
+    # 비회원 토큰을 먼저 생성 → 영상 행 등록 시 바로 연결
+    guest_token = None
+    if not current_user:
         guest_session = models.GuestSession(
-            token=token,
+            token=models.GuestSession.create_token(),
             created_at=datetime.utcnow(),
             expires_at=datetime.utcnow() + timedelta(hours=1)
         )
         db.add(guest_session)
         db.commit()
-        db.refresh(guest_session)
+        guest_token = guest_session.token
+        # ✅ 자동 삭제는 expiry_sweeper 가 expires_at 기준으로 일괄 처리
+
+    # 영상 행 = blob 참조 → 키가 정해지는 즉시 등록 (dedup 재사용 blob 이 그 사이 정리되지 않도록)
+    registered = {}
 
+    def register(blob: StoredBlob) -> None:
         video = models.Video(
-            filename=file_location,
+            filename=blob.key,
             original_name=file.filename,
-            guest_token=guest_session.token
+            owner_id=current_user.id if current_user else None,
+            guest_token=guest_token,
+            content_hash=blob.digest,
+            size_bytes=blob.size,
         )
         db.add(video)
         db.commit()
-        db.refresh(video)
-
-        # ✅ 자동 삭제 스케줄 등록
-        background_tasks.add_task(
-            delete_guest_video,
-            video_id=video.id,
-            file_path=file_location,
-            db_session_maker=db.get_bind().session_factory,
-            delay_seconds=3600
-        )
-
+        registered["video"] = video
+
+    # 파일 저장 (내용 해시 기반, 동일 내용은 기존 blob 재사용, 새 파일은 재생용 remux)
+    try:
+        blob_store.put_stream(file.file, file.filename, remux_for_playback, claim=register)
+    except Exception:
+        if "video" in registered:
+            discard_video(registered["video"].id)
+        raise
+
+    video = registered["video"]
+    db.refresh(video)
     return video
 
 
 # ===========================
-# 회원 업로드 영상 조회
+# 회원 업로드 영상 조회 (커서 페이지네이션, metadata_json 제외)
 # ===========================
 @router.get("/videos", response_model=list[schemas.VideoOut])
 def list_videos(
+    response: Response,
+    after_id: Optional[int] = Query(None, ge=0),
+    limit: int = Query(crud.PAGE_SIZE_DEFAULT, ge=1, le=crud.PAGE_SIZE_MAX),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user_optional)
 ):
     if not current_user:
         raise HTTPException(status_code=401, detail="Not authenticated")
-    videos = db.query(models.Video).filter(models.Video.owner_id == current_user.id).all()
+    query = (
+        db.query(models.Video)
+        .options(load_only(
+            models.Video.id,
+            models.Video.filename,
+            models.Video.original_name,
+            models.Video.owner_id,
+            models.Video.guest_token,
+            models.Video.created_at,
+        ))
+        .filter(models.Video.owner_id == current_user.id)
+    )
+    videos = crud.keyset_page(query, models.Video.id, after_id, limit)
+    crud.set_next_cursor(response, videos, limit)
     return videos
 
 
@@ -147,8 +128,7 @@ def delete_video(
     db.delete(video)
     db.commit()
 
-    # 실제 파일 삭제
-    if os.path.exists(video.filename):
-        os.remove(video.filename)
+    # 실제 파일 삭제 (같은 blob 을 참조하는 다른 영상이 없을 때만)
+    blob_store.release(db, video)
 
     return {"message": "Video deleted successfully"}
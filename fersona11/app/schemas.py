@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from pydantic import BaseModel
 
 # ==========================
@@ -78,7 +78,7 @@ class FeedbackInput(BaseModel):
 # GAZE DATA
 # ==========================
 class GazeBase(BaseModel):
-    result_json: Optional[str] = None
+    result_json: Optional[Any] = None  # gaze_data.result_json 은 JSON 컬럼
 
 class GazeCreate(GazeBase):
     video_id: int
@@ -95,6 +95,23 @@ class GazeOut(GazeBase):
     class Config:
         from_attributes = True
 
+class GazeListItem(BaseModel):
+    """목록 조회용 경량 스키마 (result_json / raw_blob 제외)"""
+    id: int
+    video_id: int
+    feedback_id: Optional[int] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+# ==========================
+# BULK INSERT
+# ==========================
+class BulkCreateOut(BaseModel):
+    ids: List[int]  # 요청 배열과 같은 순서
+
 
 # ==========================
 # GUEST SESSIONS
@@ -175,3 +192,48 @@ class ReportOut(ReportBase):
 
     class Config:
         from_attributes = True
+
+
+# ==========================
+# SCORE TRENDS
+# ==========================
+class ScorePoint(BaseModel):
+    result_id: Optional[int] = None
+    score: float
+    at: Optional[datetime] = None
+
+class MetricTrendOut(BaseModel):
+    metric: str
+    count: int
+    mean: float
+    best: Optional[float] = None
+    last: Optional[float] = None
+    recent: List[ScorePoint] = []
+
+class UserTrendOut(BaseModel):
+    user_id: str
+    metrics: List[MetricTrendOut]
+
+
+# ==========================
+# DIRECT UPLOADS
+# ==========================
+class PresignUploadIn(BaseModel):
+    user_id: str
+    filename: str
+    content_type: str = "video/webm"
+
+class PresignUploadOut(BaseModel):
+    key: str
+    method: str
+    url: str
+    headers: Dict[str, str] = {}
+    fields: Dict[str, str] = {}    # method=POST(S3) 일 때 함께 보낼 폼 필드 (파일은 마지막 file 필드)
+    expires_in: int
+    upload_token: str          # /upload/complete 에 그대로 전달 (key 를 발급받은 user_id 에 묶음)
+
+class CompleteUploadIn(BaseModel):
+    user_id: str
+    key: str
+    upload_token: str
+    filename: Optional[str] = None
@@ -0,0 +1,138 @@
+import math
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+from app.config import settings
+from app.utils.metrics import gauge
+
+
+class AdmissionRejected(Exception):
+    """대기열이 가득 차 분석 요청을 받지 않음 → 429 + Retry-After"""
+
+    def __init__(self, retry_after: int, reason: str = "queue_full"):
+        super().__init__(f"analysis {reason} (retry after {retry_after}s)")
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+# =========================================
+# ✅ 분석 작업 입장 제어 (프로세스당 1개, 이벤트 루프 안에서만 사용)
+# =========================================
+class AdmissionController:
+    """
+    동시에 실행할 분석 수(limit)와 대기열 길이(max_queue)를 제한
+    - 실행 슬롯이 없으면 대기열에서 순서대로 기다림
+    - 대기열도 가득 차면 즉시 AdmissionRejected
+    - Retry-After = 최근 작업 시간 EWMA x (앞에 있는 작업 수 / limit)
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        max_queue: int,
+        max_wait_sec: float = 0.0,
+        alpha: float = 0.2,
+        initial_duration_sec: float = 30.0,
+    ):
+        self.limit = max(1, limit)
+        self.max_queue = max(0, max_queue)
+        self.max_wait_sec = max_wait_sec
+        self.alpha = alpha
+        self.avg_duration_sec = initial_duration_sec
+        self.running = 0
+        self.waiting = 0
+        self.admitted_total = 0
+        self.rejected_total = 0
+        self.completed_total = 0
+        self.failed_total = 0
+        self._sem: Optional[asyncio.Semaphore] = None
+
+    def resize(self, limit: int, max_queue: int) -> None:
+        """한도 변경 - 첫 요청 전에만 (serve.py 워커가 서버 전체 한도를 나눠 가질 때)"""
+        if self._sem is not None:
+            raise RuntimeError("admission limits must be set before the first request")
+        self.limit = max(1, limit)
+        self.max_queue = max(0, max_queue)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # 이벤트 루프가 뜬 뒤 첫 요청에서 생성
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.limit)
+        return self._sem
+
+    def retry_after(self) -> int:
+        ahead = self.running + self.waiting
+        return max(1, math.ceil(self.avg_duration_sec * max(1, ahead) / self.limit))
+
+    def _record_duration(self, elapsed: float) -> None:
+        self.avg_duration_sec = self.alpha * elapsed + (1.0 - self.alpha) * self.avg_duration_sec
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        self.rejected_total += 1
+        return AdmissionRejected(self.retry_after(), reason)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        sem = self._semaphore()
+        if sem.locked() and self.waiting >= self.max_queue:
+            raise self._reject("queue_full")
+
+        self.waiting += 1
+        try:
+            if self.max_wait_sec > 0:
+                await asyncio.wait_for(sem.acquire(), timeout=self.max_wait_sec)
+            else:
+                await sem.acquire()
+        except asyncio.TimeoutError:
+            raise self._reject("queue_timeout")
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+        self.admitted_total += 1
+        started = time.monotonic()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.running -= 1
+            sem.release()
+            if ok:
+                self.completed_total += 1
+                self._record_duration(time.monotonic() - started)
+            else:
+                self.failed_total += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "waiting": self.waiting,
+            "avg_duration_sec": round(self.avg_duration_sec, 2),
+            "retry_after_sec": self.retry_after(),
+            "admitted_total": self.admitted_total,
+            "rejected_total": self.rejected_total,
+            "completed_total": self.completed_total,
+            "failed_total": self.failed_total,
+        }
+
+
+analysis_admission = AdmissionController(
+    limit=settings.ANALYSIS_MAX_CONCURRENCY,
+    max_queue=settings.ANALYSIS_QUEUE_DEPTH,
+    max_wait_sec=settings.ANALYSIS_QUEUE_TIMEOUT_SEC,
+    alpha=settings.ANALYSIS_DURATION_EWMA_ALPHA,
+    initial_duration_sec=settings.ANALYSIS_INITIAL_DURATION_SEC,
+)
+
+# ✅ 대기열 상태 지표 (/metrics 수집 시점에 읽음)
+gauge("fersona_admission_running", "Analyses currently running", callback=lambda: analysis_admission.running)
+gauge("fersona_admission_waiting", "Analyses waiting for a slot", callback=lambda: analysis_admission.waiting)
+gauge("fersona_admission_limit", "Configured analysis concurrency", callback=lambda: analysis_admission.limit)
+gauge(
+    "fersona_admission_avg_duration_seconds", "EWMA of analysis job duration",
+    callback=lambda: analysis_admission.avg_duration_sec,
+)
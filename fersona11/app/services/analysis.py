@@ -1,52 +1,96 @@
 import os
-import cv2
 import numpy as np
-import librosa
-import whisper
-import mediapipe as mp
 import subprocess
-import soundfile as sf
 import re
-from typing import Dict, Any
+import time
+import threading
+from typing import Callable, Dict, Any, Optional, Sequence
+from app.config import settings
+from app.services.previews import PreviewCollector, fill_previews
+from app.services.face_roi import FaceMeshInput
+from app.utils.metrics import stage_timer, MODEL_LOAD_SECONDS
+from app.utils.tracing import annotate
+from app.services.scoring import SCORING_VERSION, speech_score, pitch_score, speech_scores, pitch_scores
 
 # ----------------------------------------
 # 전역 모델 캐시
+# - whisper(torch) / mediapipe / librosa / cv2 는 함수 안에서 import
+#   → API 만 처리하는 프로세스는 ML 모듈을 로드하지 않음 (첫 분석 때 1회 로드)
 # ----------------------------------------
-whisper_model = None
-face_mesh = None
+whisper_models: Dict[str, Any] = {}     # 모델 이름 → 로드된 모델 (작업별 설정에 따라 여러 개)
+_whisper_lock = threading.Lock()
+
+PYIN_HOP_LENGTH = 512   # librosa.pyin 기본 hop (프레임 → 시간 변환용)
+
+
+def default_whisper_model_name() -> str:
+    return os.getenv("WHISPER_MODEL", "base").strip()
 
 
 # ----------------------------------------
 # Whisper 및 FaceMesh 초기화
 # ----------------------------------------
-def get_whisper_model():
-    global whisper_model
-    if whisper_model is None:
-        model_name = os.getenv("WHISPER_MODEL", "base").strip()
+def get_whisper_model(model_name: Optional[str] = None):
+    import whisper
+
+    model_name = model_name or default_whisper_model_name()
+    if model_name in whisper_models:
+        return whisper_models[model_name]
+    # 동시에 들어온 작업이 같은 모델을 두 번 로드하지 않도록
+    with _whisper_lock:
+        if model_name in whisper_models:
+            return whisper_models[model_name]
+        started = time.perf_counter()
+        loaded_name = model_name
         try:
             print(f"[INFO] Whisper 모델 로드 중... (model={model_name})")
-            whisper_model = whisper.load_model(model_name)
+            model = whisper.load_model(model_name)
         except Exception as e:
             print(f"[WARN] 모델 '{model_name}' 로드 실패 → tiny로 폴백: {e}")
-            whisper_model = whisper.load_model("tiny")
+            loaded_name = "tiny"
+            model = whisper_models.get("tiny") or whisper.load_model(loaded_name)
+            whisper_models["tiny"] = model
+        whisper_models[model_name] = model
+        MODEL_LOAD_SECONDS.set(time.perf_counter() - started, model=f"whisper:{loaded_name}")
         print("[INFO] Whisper 모델 로드 완료")
-    return whisper_model
-
-
-def get_face_mesh():
-    global face_mesh
-    if face_mesh is None:
-        print("[INFO] Mediapipe FaceMesh 초기화 중...")
-        mp_face_mesh = mp.solutions.face_mesh
-        face_mesh = mp_face_mesh.FaceMesh(
-            static_image_mode=False,
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5,
-        )
-        print("[INFO] FaceMesh 초기화 완료")
-    return face_mesh
+    return model
+
+
+def create_face_mesh(static_image_mode: bool = False):
+    """
+    FaceMesh 새 인스턴스 (추적 상태가 영상 / 입력 화면 사이에 섞이지 않도록 공유하지 않음)
+    - static_image_mode=False: 같은 화면이 이어지는 입력 (추적)
+    - static_image_mode=True: 매번 얼굴 검출부터 (크기가 다른 입력, 재검출)
+    """
+    import mediapipe as mp
+
+    started = time.perf_counter()
+    mesh = mp.solutions.face_mesh.FaceMesh(
+        static_image_mode=static_image_mode,
+        max_num_faces=1,
+        refine_landmarks=True,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5,
+    )
+    MODEL_LOAD_SECONDS.set(time.perf_counter() - started, model="facemesh")
+    return mesh
+
+
+def warm_face_mesh() -> None:
+    """mediapipe import + 모델 그래프 로드를 미리 1회 (인스턴스는 분석마다 새로 만듦)"""
+    print("[INFO] Mediapipe FaceMesh 초기화 중...")
+    create_face_mesh().close()
+    print("[INFO] FaceMesh 초기화 완료")
+
+
+def preload_models(whisper_names: Sequence[str] = ()) -> None:
+    """
+    분석 전용 워커에서 첫 요청 지연을 없애고 싶을 때 (ANALYSIS_PRELOAD_MODELS)
+    - whisper_names: 작업별 설정에서 쓰일 수 있는 모델들 (없으면 WHISPER_MODEL 하나)
+    """
+    for name in whisper_names or (default_whisper_model_name(),):
+        get_whisper_model(name)
+    warm_face_mesh()
 
 
 # ----------------------------------------
@@ -67,10 +111,26 @@ def extract_audio_from_video(video_path: str, audio_path: str):
 # ----------------------------------------
 # 시선 + 표정 분석
 # ----------------------------------------
-def analyze_video_features(video_path: str, max_frames: int = 150, frame_interval: int = 5) -> Dict[str, Any]:
+def analyze_video_features(
+    video_path: str,
+    max_frames: int = 150,
+    frame_interval: int = 5,
+    preview_dir: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    시선 + 표정 분석
+    - preview_dir 지정 시 샘플링한 프레임으로 썸네일/스프라이트/VTT 도 함께 생성
+      분석이 max_frames 에서 먼저 멈추면 나머지 구간은 시간 탐색으로 채움 (미리보기가 영상 전체를 덮도록)
+    """
+    import cv2
+
     cap = cv2.VideoCapture(video_path)
     gaze_list, mouth_ratio_list = [], []
     processed, frame_idx = 0, 0
+    fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+    previews = PreviewCollector() if preview_dir else None
+    last_t = 0.0
+    reached_end = False
 
     if not cap.isOpened():
         return {
@@ -82,34 +142,65 @@ def analyze_video_features(video_path: str, max_frames: int = 150, frame_interva
             "expression_score_value": 0.0,
         }
 
-    face_mesh_local = get_face_mesh()
-
-    while processed < max_frames:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        if frame_idx % frame_interval != 0:
-            frame_idx += 1
-            continue
-
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = face_mesh_local.process(frame_rgb)
-        multi = getattr(results, "multi_face_landmarks", [])
-
-        if multi:
-            face = multi[0].landmark
-            left_eye = np.array([[face[i].x, face[i].y] for i in [33, 133]])
-            right_eye = np.array([[face[i].x, face[i].y] for i in [362, 263]])
-            mouth = np.array([[face[i].x, face[i].y] for i in [13, 14]])
-
-            gaze = np.mean([left_eye.mean(axis=0), right_eye.mean(axis=0)], axis=0)
-            gaze_list.append(gaze)
-            mouth_ratio_list.append(np.linalg.norm(mouth[1] - mouth[0]))
-
-        processed += 1
-        frame_idx += 1
-
-    cap.release()
+    # FaceMesh 입력: 작업 해상도 축소 + 직전 얼굴 주변 ROI 크롭 (좌표는 원본 기준으로 되돌려 받음)
+    # 영상마다 새 FaceMesh (동시 분석 / 이전 영상의 추적 상태와 섞이지 않음)
+    mesh_input = FaceMeshInput(
+        create_face_mesh,
+        max_side=settings.VISION_WORK_MAX_SIDE,
+        padding=settings.VISION_ROI_PADDING,
+        min_side=settings.VISION_ROI_MIN_SIDE,
+        use_roi=settings.VISION_ROI_TRACKING,
+    )
+    # 프레임 디코딩 + FaceMesh
+    with stage_timer("video_frames"):
+        try:
+            while processed < max_frames:
+                ret, frame = cap.read()
+                if not ret:
+                    reached_end = True
+                    break
+                if frame_idx % frame_interval != 0:
+                    frame_idx += 1
+                    continue
+
+                if previews is not None:
+                    pos_ms = cap.get(cv2.CAP_PROP_POS_MSEC)
+                    last_t = pos_ms / 1000.0 if pos_ms > 0 else (frame_idx / fps if fps > 0 else float(processed))
+                    previews.add(last_t, frame)
+
+                face = mesh_input.landmarks(frame)
+
+                if face is not None:
+                    left_eye = face[[33, 133]]
+                    right_eye = face[[362, 263]]
+                    mouth = face[[13, 14]]
+
+                    gaze = np.mean([left_eye.mean(axis=0), right_eye.mean(axis=0)], axis=0)
+                    gaze_list.append(gaze)
+                    mouth_ratio_list.append(np.linalg.norm(mouth[1] - mouth[0]))
+
+                processed += 1
+                frame_idx += 1
+        finally:
+            mesh_input.close()
+
+        preview_partial = False
+        if previews is not None and not reached_end:
+            frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0.0
+            duration = frame_count / fps if fps > 0 and frame_count > 0 else 0.0
+            with stage_timer("previews_seek"):
+                last_t, complete = fill_previews(cap, previews, duration)
+            preview_partial = not complete
+            if complete and duration > 0:
+                last_t = duration
+
+        cap.release()
+        annotate(frames_sampled=processed, faces_detected=len(gaze_list), fps=round(fps, 2), **mesh_input.summary())
+
+    preview_manifest = {}
+    if previews is not None:
+        with stage_timer("previews"):
+            preview_manifest = previews.write(preview_dir, end_time=last_t, partial=preview_partial)
 
     gaze_x = float(np.mean([g[0] for g in gaze_list])) if gaze_list else 0.5
     mouth_mean = float(np.mean(mouth_ratio_list)) if mouth_ratio_list else 0.0
@@ -144,6 +235,7 @@ def analyze_video_features(video_path: str, max_frames: int = 150, frame_interva
         "expression_correction": expression_correction,
         "gaze_score_value": gaze_score_value,
         "expression_score_value": expression_score_value,
+        "previews": preview_manifest,
     }
 
 
@@ -155,51 +247,81 @@ def count_korean_syllables(text: str) -> int:
     return len(re.findall(r"[가-힣]", text))
 
 
-def calc_speech_score(wpm: float) -> float:
-    if wpm <= 40.0:
-        return 50.0 + (wpm / 40.0) * 30.0
-    elif 40.0 < wpm <= 60.0:
-        return 80.0 + (wpm - 40.0) * 0.5
-    elif 60.0 < wpm <= 100.0:
-        return 90.0 + (1.0 - abs(80.0 - wpm) / 40.0) * 10.0
-    elif 100.0 < wpm <= 130.0:
-        return 95.0 - (wpm - 100.0) * 0.5
-    else:
-        return max(60.0, 80.0 - (wpm - 130.0) * 0.4)
-
-
-def calc_pitch_score(f0_std: float) -> float:
-    if f0_std < 10.0:
-        return 30.0
-    elif 10.0 <= f0_std < 30.0:
-        return 50.0 + (f0_std - 10.0)
-    elif 30.0 <= f0_std <= 70.0:
-        return 80.0 + (1.0 - abs(50.0 - f0_std) / 40.0) * 15.0
-    elif 70.0 < f0_std <= 100.0:
-        return 80.0 - (f0_std - 70.0) * 0.6
-    else:
-        return 60.0
-
+def segment_metrics(segments: list, f0: Optional[np.ndarray], sr: int, hop_length: int = PYIN_HOP_LENGTH) -> None:
+    """
+    세그먼트별 seg_wpm(분당 음절) / f0_std / 점수를 segments 에 기록
+    - F0 구간 통계는 누적합 차이로 한 번에 계산 (세그먼트마다 배열을 자르지 않음)
+    """
+    if not segments:
+        return
+    starts = np.array([float(seg.get("start", 0.0)) for seg in segments])
+    ends = np.array([float(seg.get("end", 0.0)) for seg in segments])
+    syllables = np.array([count_korean_syllables(seg.get("text", "")) for seg in segments], dtype=float)
+    wpm = syllables / np.maximum(ends - starts, 1e-6) * 60.0
+
+    f0_std = np.zeros(len(segments))
+    if f0 is not None and f0.size > 0:
+        valid = ~np.isnan(f0)
+        voiced = np.where(valid, f0, 0.0)
+        cn = np.concatenate(([0], np.cumsum(valid)))
+        cs = np.concatenate(([0.0], np.cumsum(voiced)))
+        cs2 = np.concatenate(([0.0], np.cumsum(voiced * voiced)))
+        s_idx = np.clip((starts * sr / hop_length).astype(int), 0, f0.size)
+        e_idx = np.clip(np.ceil(ends * sr / hop_length).astype(int), 0, f0.size)
+        n = cn[e_idx] - cn[s_idx]
+        safe_n = np.maximum(n, 1)
+        mean = (cs[e_idx] - cs[s_idx]) / safe_n
+        var = (cs2[e_idx] - cs2[s_idx]) / safe_n - mean * mean
+        f0_std = np.where(n > 1, np.sqrt(np.maximum(var, 0.0)), 0.0)
+
+    speech, pitch = speech_scores(wpm), pitch_scores(f0_std)
+    for i, seg in enumerate(segments):
+        seg["seg_wpm"] = round(float(wpm[i]), 2)
+        seg["f0_std"] = round(float(f0_std[i]), 2)
+        seg["speech_score"] = float(speech[i])
+        seg["pitch_score"] = float(pitch[i])
+
+
+def analyze_speech(
+    audio_path: str,
+    model_name: Optional[str] = None,
+    on_stage: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Whisper를 이용한 발화 + 억양 분석
+    - model_name: 작업별로 고른 모델 (없으면 WHISPER_MODEL)
+    - on_stage(stage, fields): 전사(transcript) / 억양(pitch) 값이 나오는 즉시 호출 (부분 결과 전송용)
+    """
+    import librosa
+    import soundfile as sf
 
-def analyze_speech(audio_path: str) -> Dict[str, Any]:
-    """Whisper를 이용한 발화 + 억양 분석"""
     try:
-        y, sr = librosa.load(audio_path, sr=16000)
-        rms = float(np.mean(librosa.feature.rms(y=y)))
-        duration = float(librosa.get_duration(y=y, sr=sr))
+        with stage_timer("audio_load"):
+            y, sr = librosa.load(audio_path, sr=16000)
+            rms = float(np.mean(librosa.feature.rms(y=y)))
+            duration = float(librosa.get_duration(y=y, sr=sr))
 
-        if rms < 0.01:
-            gain = 0.02 / max(rms, 1e-6)
-            y = y * gain
-            print(f"[INFO] 볼륨이 낮아 {gain:.1f}배 증폭 적용 (rms={rms:.4f})")
+            if rms < 0.01:
+                gain = 0.02 / max(rms, 1e-6)
+                y = y * gain
+                print(f"[INFO] 볼륨이 낮아 {gain:.1f}배 증폭 적용 (rms={rms:.4f})")
 
-        norm_path = "/tmp/normalized_input.wav"
-        sf.write(norm_path, y, sr)
+            # 동시 분석 시 서로 덮어쓰지 않도록 작업별 파일
+            norm_path = f"{os.path.splitext(audio_path)[0]}_normalized.wav"
+            sf.write(norm_path, y, sr)
+            annotate(media_duration_sec=round(duration, 2), rms=round(rms, 4))
 
-        model = get_whisper_model()
-        print(f"[ANALYSIS] Whisper 분석 중... (audio={norm_path})")
+        model_name = model_name or default_whisper_model_name()
+        model = get_whisper_model(model_name)
+        print(f"[ANALYSIS] Whisper 분석 중... (audio={norm_path}, model={model_name})")
 
-        result = model.transcribe(norm_path, fp16=False, language="ko")
+        try:
+            with stage_timer("whisper", model=model_name):
+                result = model.transcribe(norm_path, fp16=False, language="ko")
+                annotate(segments=len(result.get("segments", [])))
+        finally:
+            if os.path.exists(norm_path):
+                os.remove(norm_path)
         text = result.get("text", "").strip()
         segments = result.get("segments", [])
 
@@ -213,14 +335,27 @@ def analyze_speech(audio_path: str) -> Dict[str, Any]:
 
         syllables_total = count_korean_syllables(text)
         wpm_total = (syllables_total / speech_time) * 60.0 if speech_time > 0 else 0.0
-
+        speech_score_value = speech_score(wpm_total)
+        if on_stage is not None:
+            on_stage("transcript", {
+                "text": text,
+                "duration": round(duration, 2),
+                "speech_time": round(speech_time, 2),
+                "syllables_total": int(syllables_total),
+                "wpm_total": round(wpm_total, 2),
+                "speech_score_value": speech_score_value,
+            })
+
+        f0 = None
         try:
-            f0, _, _ = librosa.pyin(
-                y,
-                fmin=librosa.note_to_hz("C2"),
-                fmax=librosa.note_to_hz("C7"),
-            )
-            valid = f0[~np.isnan(f0)] if f0 is not None else []
+            with stage_timer("pyin"):
+                f0, _, _ = librosa.pyin(
+                    y,
+                    fmin=librosa.note_to_hz("C2"),
+                    fmax=librosa.note_to_hz("C7"),
+                    hop_length=PYIN_HOP_LENGTH,
+                )
+            valid = f0[~np.isnan(f0)] if f0 is not None else np.array([])
             if valid.size > 0:
                 f0_mean = float(np.mean(valid))
                 f0_std = float(np.std(valid))
@@ -232,8 +367,15 @@ def analyze_speech(audio_path: str) -> Dict[str, Any]:
             f0_mean = 0.0
             f0_std = 0.0
 
-        speech_score_value = calc_speech_score(wpm_total)
-        pitch_score_value = calc_pitch_score(f0_std)
+        # 전체 / 세그먼트 점수 모두 scoring 모듈 곡선 (세그먼트는 배열 1회 계산)
+        pitch_score_value = pitch_score(f0_std)
+        segment_metrics(segments, f0, sr)
+        if on_stage is not None:
+            on_stage("pitch", {
+                "f0_mean_total": round(f0_mean, 2),
+                "f0_std_total": round(f0_std, 2),
+                "pitch_score_value": pitch_score_value,
+            })
 
         feedback = {"speech": [], "pitch": []}
 
@@ -261,8 +403,9 @@ def analyze_speech(audio_path: str) -> Dict[str, Any]:
             "wpm_total": round(wpm_total, 2),
             "f0_mean_total": round(f0_mean, 2),
             "f0_std_total": round(f0_std, 2),
-            "speech_score_value": round(speech_score_value, 1),
-            "pitch_score_value": round(pitch_score_value, 1),
+            "speech_score_value": speech_score_value,
+            "pitch_score_value": pitch_score_value,
+            "scoring_version": SCORING_VERSION,
             "feedback": feedback,
             "segments": segments,
         }
@@ -0,0 +1,370 @@
+import math
+import os
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy.orm import Session
+from app.models import AnalysisResult, AnalysisResultDetail, User, Video
+from app.services.result_codec import split_analysis, merge_analysis, encode_detail, decode_detail, to_plain
+from app.services.report_service import build_result_document
+from app.services.storage import blob_store
+from app.services.scoring import SCORING_VERSION, rescore_summaries, score_segments
+
+# ----------------------------------------
+# 저장된 녹화본 일괄 재분석 (python backfill.py)
+# - 워커 프로세스: 파일 → 분석 결과 dict (DB 접근 없음)
+# - 부모 프로세스: 결과를 배치 단위 트랜잭션으로 기록 + 체크포인트
+# ----------------------------------------
+DEFAULT_TIERS = ("original", "compact")
+PAGE_SIZE = 500
+
+
+# =========================================
+# ✅ 체크포인트 (재시작 시 이어서)
+# =========================================
+class BackfillCheckpoint:
+    """
+    {"filters": ..., "last_video_id": N, "done": n, "failed": {id: error}, "users": [...], ...}
+    - 배치 커밋이 끝난 뒤에만 저장 → 재시작 시 커밋 안 된 배치는 다시 처리
+    - 임시 파일에 쓴 뒤 os.replace 로 교체 (쓰는 도중 죽어도 이전 체크포인트 유지)
+    """
+
+    def __init__(self, path: str, filters: Dict[str, Any]):
+        self.path = path
+        self.filters = filters
+        self.last_video_id = 0
+        self.done = 0
+        self.failed: Dict[str, str] = {}
+        self.users: List[int] = []          # 결과가 바뀐 사용자 (추이 재집계 대상, 재시작해도 유지)
+        self.started_at = datetime.now().isoformat()
+
+    @classmethod
+    def load(cls, path: str, filters: Dict[str, Any]) -> "BackfillCheckpoint":
+        cp = cls(path, filters)
+        if not os.path.exists(path):
+            return cp
+        with open(path, encoding="utf-8") as f:
+            doc = json.load(f)
+        if doc.get("filters") != filters:
+            raise ValueError(
+                f"체크포인트({path})의 선택 조건이 다릅니다: {doc.get('filters')} → --restart 또는 다른 --checkpoint 사용"
+            )
+        cp.last_video_id = int(doc.get("last_video_id", 0))
+        cp.done = int(doc.get("done", 0))
+        cp.failed = dict(doc.get("failed", {}))
+        cp.users = list(doc.get("users", []))
+        cp.started_at = doc.get("started_at", cp.started_at)
+        return cp
+
+    def save(self) -> None:
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "filters": self.filters,
+                "last_video_id": self.last_video_id,
+                "done": self.done,
+                "failed": self.failed,
+                "users": sorted(self.users),
+                "started_at": self.started_at,
+                "updated_at": datetime.now().isoformat(),
+            }, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+
+# =========================================
+# ✅ 대상 선택 (id 순 keyset 페이지)
+# =========================================
+def _filtered(db: Session, filters: Dict[str, Any]):
+    query = db.query(Video.id, Video.filename, Video.owner_id, Video.created_at).filter(
+        Video.storage_tier.in_(filters.get("tiers") or DEFAULT_TIERS)
+    )
+    if filters.get("user"):
+        query = query.join(User, User.id == Video.owner_id).filter(User.username == filters["user"])
+    if filters.get("since"):
+        query = query.filter(Video.created_at >= filters["since"])
+    if filters.get("until"):
+        query = query.filter(Video.created_at < filters["until"])
+    if filters.get("ids"):
+        query = query.filter(Video.id.in_(filters["ids"]))
+    return query
+
+
+def count_targets(db: Session, filters: Dict[str, Any], after_id: int = 0) -> int:
+    return _filtered(db, filters).filter(Video.id > after_id).count()
+
+
+def iter_target_pages(db: Session, filters: Dict[str, Any], after_id: int = 0) -> Iterator[List[Tuple]]:
+    while True:
+        page = (
+            _filtered(db, filters)
+            .filter(Video.id > after_id)
+            .order_by(Video.id)
+            .limit(PAGE_SIZE)
+            .all()
+        )
+        if not page:
+            return
+        yield [tuple(row) for row in page]
+        after_id = page[-1][0]
+
+
+# =========================================
+# ✅ 워커 프로세스
+# =========================================
+def init_worker(torch_threads: int) -> None:
+    """프로세스 시작 시 1회: 모델 로드 (작업마다 다시 로드하지 않음)"""
+    from app.services.analysis import get_whisper_model
+
+    torch_threads = max(1, torch_threads)
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+    get_whisper_model()
+
+
+def analyze_recording(job: Tuple[int, str]) -> Dict[str, Any]:
+    """
+    (video_id, 저장소 key) → {"video_id", "ok", "whisper", "report", "scores", "seconds"} (pickle 가능한 기본형)
+    - 업로드 파이프라인과 같은 분석 순서, 미리보기 생성은 생략
+    """
+    from app.services.analysis import analyze_speech, analyze_video_features
+    from app.services.feedback_service import generate_feedback_with_segments
+    from app.services.pipeline import process_video
+    from app.services.score_history import extract_scores
+    from app.services.storage import blob_store
+
+    video_id, key = job
+    started = time.perf_counter()
+    audio = None
+    try:
+        with blob_store.open_local(key) as path:
+            audio = process_video(path)
+            if not audio:
+                raise RuntimeError("오디오 추출 실패")
+            whisper_result = analyze_speech(audio)
+            whisper_result["feedback"] = generate_feedback_with_segments(whisper_result)
+            report_result = analyze_video_features(path)
+        return {
+            "video_id": video_id,
+            "ok": True,
+            "whisper": to_plain(whisper_result),
+            "report": to_plain({k: v for k, v in report_result.items() if k != "previews"}),
+            "scores": extract_scores(report_result, whisper_result),
+            "media_sec": float(whisper_result.get("duration") or 0.0),
+            "seconds": time.perf_counter() - started,
+        }
+    except Exception as e:
+        return {"video_id": video_id, "ok": False, "error": f"{type(e).__name__}: {e}"[:500]}
+    finally:
+        if audio and os.path.exists(audio):
+            os.remove(audio)
+
+
+# =========================================
+# ✅ 결과 기록 (커밋은 호출자 - 배치 단위)
+# =========================================
+def _find_result(db: Session, video_id: int, key: str, owner_id: Optional[int]) -> Optional[AnalysisResult]:
+    """
+    영상의 최신 analysis_result
+    - video_id 컬럼 이전 행은 같은 회원 + video_file(저장소 key 또는 재생 URL)로 찾아 연결
+    - video_file 이 남지 않은 행("unknown_video.mp4" 등)은 연결할 수 없음 → 새 행
+    """
+    record = (
+        db.query(AnalysisResult)
+        .filter(AnalysisResult.video_id == video_id)
+        .order_by(AnalysisResult.id.desc())
+        .first()
+    )
+    if record is not None or owner_id is None:
+        return record
+
+    record = (
+        db.query(AnalysisResult)
+        .filter(
+            AnalysisResult.video_id.is_(None),
+            AnalysisResult.user_id == owner_id,
+            AnalysisResult.video_file.in_([key, blob_store.url(key)]),
+        )
+        .order_by(AnalysisResult.id.desc())
+        .first()
+    )
+    if record is not None:
+        record.video_id = video_id
+    return record
+
+
+def _stored_document(db: Session, record: AnalysisResult) -> Dict[str, Any]:
+    """기존 행의 요약 + 상세 문서 (분리 저장 이전 행은 result_data 그대로)"""
+    data = dict(record.result_data or {}) if isinstance(record.result_data, dict) else {}
+    detail = db.query(AnalysisResultDetail).filter(AnalysisResultDetail.result_id == record.id).first()
+    if detail is None:
+        return data
+    return merge_analysis(data, decode_detail(detail.codec, detail.payload, detail.schema_version))
+
+
+def upsert_result(
+    db: Session,
+    video: Tuple[int, str, Optional[int], Optional[datetime]],
+    whisper_result: Dict[str, Any],
+    scores: Dict[str, float],
+    report: Optional[Dict[str, Any]] = None,
+) -> AnalysisResult:
+    """
+    영상에 연결된 최신 analysis_result 를 새 분석으로 교체 (없으면 생성)
+    - 업로드 파이프라인과 같은 문서 형태 (Whisper 키 + "report")
+    - 백필은 미리보기를 만들지 않으므로 기존 결과의 미리보기 / job_id 는 유지
+    - 새 행의 created_at 은 영상 업로드 시각 → 추이 순서 유지
+    - 점수 집계는 여기서 건드리지 않음 (백필 후 rebuild_user_aggregates)
+    """
+    video_id, key, owner_id, created_at = video
+
+    record = _find_result(db, video_id, key, owner_id)
+    previous: Dict[str, Any] = {}
+    if record is None:
+        record = AnalysisResult(
+            user_id=owner_id,
+            video_id=video_id,
+            video_file=blob_store.url(key),
+            created_at=created_at or datetime.now(),
+        )
+        db.add(record)
+    else:
+        previous = _stored_document(db, record)
+
+    report = dict(report or previous.get("report") or {})
+    previews = (previous.get("report") or {}).get("previews")
+    if previews and "previews" not in report:
+        report["previews"] = previews
+    extra = {"job_id": previous["job_id"]} if previous.get("job_id") else None
+
+    summary, detail = split_analysis(build_result_document(whisper_result, report or None, extra))
+    summary["scores"] = scores
+
+    record.transcript = whisper_result.get("text", "")
+    record.duration_sec = float(whisper_result.get("duration") or 0.0)
+    record.result_data = summary
+    db.flush()
+
+    db.query(AnalysisResultDetail).filter(AnalysisResultDetail.result_id == record.id).delete(
+        synchronize_session=False
+    )
+    if detail:
+        db.add(AnalysisResultDetail(result_id=record.id, **encode_detail(detail)))
+    return record
+
+
+def write_batch(db: Session, videos: Dict[int, Tuple], results: Sequence[Dict[str, Any]]) -> Dict[int, str]:
+    """
+    성공 결과를 한 트랜잭션으로 기록 → 실패한 video_id: 오류 메시지
+    - 배치 커밋이 실패하면 행 단위로 다시 시도해 문제 행만 실패 처리
+    """
+    failed = {r["video_id"]: r["error"] for r in results if not r["ok"]}
+    ok = [r for r in results if r["ok"]]
+    try:
+        for r in ok:
+            upsert_result(db, videos[r["video_id"]], r["whisper"], r["scores"], r.get("report"))
+        db.commit()
+        return failed
+    except Exception as e:
+        db.rollback()
+        print(f"[BACKFILL] 배치 커밋 실패 → 행 단위 재시도: {e}")
+
+    for r in ok:
+        try:
+            upsert_result(db, videos[r["video_id"]], r["whisper"], r["scores"], r.get("report"))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            failed[r["video_id"]] = f"DB: {type(e).__name__}: {e}"[:500]
+    return failed
+
+
+# =========================================
+# ✅ 점수만 재계산 (곡선 변경 시, 미디어 재분석 없음)
+# =========================================
+def _finite(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _rescore_segments(segments: Any) -> Any:
+    """세그먼트별 speech_score / pitch_score 를 현재 곡선으로 (seg_wpm / f0_std 가 없는 세그먼트는 기존 값 유지)"""
+    if not isinstance(segments, list) or not segments:
+        return segments
+    segments = [dict(seg) if isinstance(seg, dict) else seg for seg in segments]
+    scored = [seg for seg in segments if isinstance(seg, dict)]
+    speech, pitch = score_segments(scored)
+    for seg, s_score, p_score in zip(scored, speech.tolist(), pitch.tolist()):
+        if _finite(seg.get("seg_wpm")) and math.isfinite(s_score):
+            seg["speech_score"] = s_score
+        if _finite(seg.get("f0_std")) and math.isfinite(p_score):
+            seg["pitch_score"] = p_score
+    return segments
+
+
+def rescore_page(db: Session, after_id: int, force: bool = False) -> Tuple[int, int, List[int]]:
+    """
+    analysis_result 한 페이지의 발화/억양 점수를 현재 곡선으로 다시 계산해 한 트랜잭션으로 기록
+    - 저장된 wpm_total / f0_std_total 로 배열 1회 계산 (둘 중 하나라도 숫자가 아니면 그 행은 그대로 둠)
+    - 상세 문서(또는 분리 저장 이전 행의 result_data)의 세그먼트 점수도 같은 곡선으로 갱신
+      → scoring_version 은 요약 / 세그먼트가 모두 새 곡선일 때만 기록
+    - 이미 현재 SCORING_VERSION 인 행은 건너뜀 (force 면 전부)
+    - 반환: (페이지 마지막 id, 갱신 행 수, 영향받은 user_id) / 더 없으면 마지막 id = -1
+    """
+    rows = (
+        db.query(AnalysisResult.id, AnalysisResult.user_id, AnalysisResult.result_data)
+        .filter(AnalysisResult.id > after_id)
+        .order_by(AnalysisResult.id)
+        .limit(PAGE_SIZE)
+        .all()
+    )
+    if not rows:
+        return -1, 0, []
+
+    targets = [
+        row for row in rows
+        if isinstance(row.result_data, dict)
+        and _finite(row.result_data.get("wpm_total"))
+        and _finite(row.result_data.get("f0_std_total"))
+        and (force or row.result_data.get("scoring_version") != SCORING_VERSION)
+    ]
+    if targets:
+        details = {
+            d.result_id: d for d in (
+                db.query(AnalysisResultDetail)
+                .filter(AnalysisResultDetail.result_id.in_([row.id for row in targets]))
+                .all()
+            )
+        }
+        speech, pitch = rescore_summaries([row.result_data for row in targets])
+        updates, detail_updates = [], []
+        for row, s_score, p_score in zip(targets, speech.tolist(), pitch.tolist()):
+            data = dict(row.result_data)
+            data["speech_score_value"] = s_score
+            data["pitch_score_value"] = p_score
+            data["scoring_version"] = SCORING_VERSION
+            data["scores"] = {**(data.get("scores") or {}), "speech": s_score, "pitch": p_score}
+            if isinstance(data.get("feedback"), dict):
+                data["feedback"] = {
+                    **data["feedback"],
+                    "speech_score_value": s_score,
+                    "pitch_score_value": p_score,
+                    "scoring_version": SCORING_VERSION,
+                }
+            if "segments" in data:
+                data["segments"] = _rescore_segments(data["segments"])
+            detail_row = details.get(row.id)
+            if detail_row is not None:
+                detail = decode_detail(detail_row.codec, detail_row.payload, detail_row.schema_version)
+                if "segments" in detail:
+                    detail["segments"] = _rescore_segments(detail["segments"])
+                    detail_updates.append({"result_id": row.id, **encode_detail(detail)})
+            updates.append({"id": row.id, "result_data": data})
+        db.bulk_update_mappings(AnalysisResult, updates)
+        if detail_updates:
+            db.bulk_update_mappings(AnalysisResultDetail, detail_updates)
+        db.commit()
+    users = sorted({row.user_id for row in targets if row.user_id is not None})
+    return rows[-1].id, len(targets), users
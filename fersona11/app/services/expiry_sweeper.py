@@ -0,0 +1,153 @@
+import threading
+from datetime import datetime
+from typing import Callable, Optional
+from sqlalchemy.orm import Session
+from app import models
+from app.config import settings
+from app.services.storage import blob_store
+from app.services.progress import purge_old_jobs
+
+# ----------------------------------------
+# 스케줄러 상태 (프로세스당 1개)
+# ----------------------------------------
+_thread: Optional[threading.Thread] = None
+_stop_event = threading.Event()
+
+
+# ----------------------------------------
+# 만료된 비회원 세션 일괄 삭제 (1 배치)
+# ----------------------------------------
+def sweep_expired_guests(db: Session, batch_size: int) -> int:
+    """
+    expires_at 이 지난 guest_sessions 를 최대 batch_size 개 삭제
+    - expires_at 인덱스로 오래된 것부터 조회
+    - 딸린 videos 행과, 다른 행이 참조하지 않는 blob 파일도 함께 삭제
+    - 파일을 먼저 지우고 DB 를 커밋 → 중간에 죽어도 다음 스윕에서 이어서 처리
+    반환값: 삭제한 세션 수
+    """
+    now = datetime.utcnow()
+    query = (
+        db.query(models.GuestSession.id, models.GuestSession.token)
+        .filter(models.GuestSession.expires_at < now)
+        .order_by(models.GuestSession.expires_at.asc())
+        .limit(batch_size)
+    )
+    if db.get_bind().dialect.name == "mysql":
+        # 여러 프로세스가 동시에 스윕해도 같은 행을 두고 대기하지 않음
+        query = query.with_for_update(skip_locked=True)
+    expired = query.all()
+    if not expired:
+        db.rollback()
+        return 0
+
+    session_ids = [row.id for row in expired]
+    tokens = [row.token for row in expired]
+
+    videos = (
+        db.query(models.Video.id, models.Video.filename, models.Video.content_hash)
+        .filter(models.Video.guest_token.in_(tokens))
+        .all()
+    )
+    video_ids = [v.id for v in videos]
+    for video in videos:
+        try:
+            # 이번 배치 밖에서 같은 blob 을 참조하는 행이 없을 때만 파일 삭제
+            blob_store.release(db, video, exclude_video_ids=video_ids)
+        except OSError as e:
+            print(f"[SWEEP] 파일 삭제 실패 video_id={video.id}: {e}")
+
+    if video_ids:
+        db.query(models.Video).filter(
+            models.Video.id.in_(video_ids)
+        ).delete(synchronize_session=False)
+    db.query(models.GuestSession).filter(
+        models.GuestSession.id.in_(session_ids)
+    ).delete(synchronize_session=False)
+    db.commit()
+
+    print(f"[SWEEP] 만료 세션 {len(session_ids)}개, 영상 {len(videos)}개 삭제")
+    return len(session_ids)
+
+
+def run_sweep(session_factory: Callable[[], Session], batch_size: int, max_batches: int) -> int:
+    """배치가 가득 찬 동안 반복하되, 1회 스윕당 max_batches 배치로 작업량 제한"""
+    total = 0
+    for _ in range(max_batches):
+        db = session_factory()
+        try:
+            deleted = sweep_expired_guests(db, batch_size)
+        except Exception as e:
+            db.rollback()
+            print(f"[SWEEP] 스윕 실패: {e}")
+            break
+        finally:
+            db.close()
+        total += deleted
+        if deleted < batch_size:
+            break
+    return total
+
+
+# ----------------------------------------
+# 보관 기간이 지난 분석 진행 문서(analysis_jobs) 삭제
+# ----------------------------------------
+def purge_progress_documents(session_factory: Callable[[], Session], batch_size: int) -> int:
+    db = session_factory()
+    try:
+        deleted = purge_old_jobs(db, settings.PROGRESS_RETENTION_HOURS, batch_size)
+        if deleted:
+            print(f"[SWEEP] 오래된 진행 문서 {deleted}개 삭제")
+        return deleted
+    except Exception as e:
+        db.rollback()
+        print(f"[SWEEP] 진행 문서 정리 실패: {e}")
+        return 0
+    finally:
+        db.close()
+
+
+# ----------------------------------------
+# 완료되지 않은 직접 업로드(incoming/) / 남은 임시 파일 삭제
+# ----------------------------------------
+def purge_stale_uploads() -> int:
+    try:
+        deleted = blob_store.sweep_stale(settings.STORAGE_STALE_SEC)
+        if deleted:
+            print(f"[SWEEP] 버려진 업로드 / 임시 파일 {deleted}개 삭제")
+        return deleted
+    except Exception as e:
+        print(f"[SWEEP] 업로드 임시 파일 정리 실패: {e}")
+        return 0
+
+
+# ----------------------------------------
+# 주기 실행 스레드 시작/종료
+# ----------------------------------------
+def start_expiry_sweeper(session_factory: Callable[[], Session]) -> None:
+    """
+    단일 백그라운드 스레드로 주기적 스윕 시작
+    - 삭제 대상은 DB 의 expires_at 으로 판단하므로 재시작해도 유실 없음
+    """
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+
+    interval = settings.GUEST_SWEEP_INTERVAL_SEC
+    batch_size = settings.GUEST_SWEEP_BATCH_SIZE
+    max_batches = settings.GUEST_SWEEP_MAX_BATCHES
+
+    def worker():
+        while not _stop_event.is_set():
+            run_sweep(session_factory, batch_size, max_batches)
+            purge_progress_documents(session_factory, batch_size)
+            purge_stale_uploads()
+            _stop_event.wait(interval)
+
+    _stop_event.clear()
+    _thread = threading.Thread(target=worker, name="expiry-sweeper", daemon=True)
+    _thread.start()
+    print(f"[SWEEP] 만료 스위퍼 시작 (interval={interval}s, batch={batch_size})")
+
+
+def stop_expiry_sweeper() -> None:
+    _stop_event.set()
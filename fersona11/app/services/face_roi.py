@@ -0,0 +1,173 @@
+import numpy as np
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# ----------------------------------------
+# FaceMesh 입력 준비
+# - 프레임을 작업 해상도(긴 변 max_side)로 축소 → 1080p 웹캠도 480p 와 비슷한 비용
+# - 얼굴을 찾은 뒤에는 직전 랜드마크 주변(여백 포함)만 원본에서 잘라 같은 배율로 축소해 처리
+#   FaceMesh 는 얼굴을 192x192 로 다시 맞추므로, 크롭이 작아질수록 얼굴이 입력에서 차지하는 비율이 커짐
+# - 크롭에서 얼굴을 놓치면 같은 프레임을 전체 화면으로 다시 검출
+# - 반환 좌표는 항상 "원본 프레임 기준 정규화 좌표" (크롭 / 축소와 무관하게 기존 점수 계산 그대로)
+# - FaceMesh 추적 모드는 직전 입력과 같은 화면을 전제로 함
+#   → 같은 ROI 크롭이 이어지는 동안만 추적 인스턴스를 쓰고, ROI 가 바뀌면 새로 만듦
+#   → ROI 를 잃은 프레임의 전체 화면 재검출은 정지 영상 모드 인스턴스로 (추적 상태와 섞이지 않게)
+# ----------------------------------------
+Roi = Tuple[int, int, int, int]     # 원본 해상도 기준 (x0, y0, x1, y1)
+MeshFactory = Callable[[bool], Any]  # static_image_mode → FaceMesh (analysis.create_face_mesh)
+
+
+class FaceMeshInput:
+    """
+    mesh_factory: FaceMesh 생성 함수 - 분석 1건(영상 1개)마다 이 객체를 새로 만들고 끝나면 close()
+    max_side: 작업 해상도 긴 변 (0 이면 축소 안 함) - 전체 프레임 / ROI 크롭 모두 같은 배율로 축소
+    padding: 랜드마크 bbox 에 더하는 여백 (bbox 한 변 대비 비율, 양쪽 각각)
+    min_side: ROI 최소 한 변(작업 해상도 px) - 너무 작은 크롭은 FaceMesh 가 확대해야 해서 오히려 부정확
+    use_roi: False 면 축소만 하고 매 프레임 전체 화면을 추적 모드로 처리
+    """
+
+    def __init__(
+        self,
+        mesh_factory: MeshFactory,
+        max_side: int = 640,
+        padding: float = 0.35,
+        min_side: int = 192,
+        use_roi: bool = True,
+    ):
+        self.mesh_factory = mesh_factory
+        self.max_side = max_side
+        self.padding = padding
+        self.min_side = min_side
+        self.use_roi = use_roi
+        self.roi: Optional[Roi] = None
+        self.stats = {"roi_frames": 0, "full_frames": 0, "roi_lost": 0, "tracker_resets": 0}
+        self.work_size: Optional[Tuple[int, int]] = None
+        self._tracker = None                    # 추적 모드 (_tracker_roi 크롭 전용, use_roi=False 면 전체 화면)
+        self._tracker_roi: Optional[Roi] = None
+        self._detector = None                   # 정지 영상 모드 (ROI 사용 시 전체 화면 재검출)
+
+    # ---------------------------
+    # 입력 화면별 FaceMesh 인스턴스
+    # ---------------------------
+    def _mesh_for(self, roi: Optional[Roi]):
+        if roi is None and self.use_roi:
+            if self._detector is None:
+                self._detector = self.mesh_factory(True)
+            return self._detector
+        if self._tracker is None or roi != self._tracker_roi:
+            if self._tracker is not None:
+                self._tracker.close()
+                self.stats["tracker_resets"] += 1
+            self._tracker = self.mesh_factory(False)
+            self._tracker_roi = roi
+        return self._tracker
+
+    def close(self) -> None:
+        for mesh in (self._tracker, self._detector):
+            if mesh is not None:
+                mesh.close()
+        self._tracker = self._detector = None
+        self._tracker_roi = None
+
+    # ---------------------------
+    # 축소 (ROI 크롭은 원본에서 자른 뒤 크롭만 축소 → 전체 프레임 리사이즈 비용 없음)
+    # ---------------------------
+    def _scale(self, w: int, h: int) -> float:
+        if self.max_side <= 0 or max(w, h) <= self.max_side:
+            return 1.0
+        return self.max_side / float(max(w, h))
+
+    @staticmethod
+    def _resize(image_bgr: np.ndarray, scale: float) -> np.ndarray:
+        if scale >= 1.0:
+            return image_bgr
+        import cv2
+
+        h, w = image_bgr.shape[:2]
+        size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+        return cv2.resize(image_bgr, size, interpolation=cv2.INTER_AREA)
+
+    # ---------------------------
+    # FaceMesh 1회 (image 기준 정규화 좌표 (N, 2) 또는 None)
+    # ---------------------------
+    def _detect(self, image_bgr: np.ndarray, roi: Optional[Roi]) -> Optional[np.ndarray]:
+        import cv2
+
+        results = self._mesh_for(roi).process(cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB))
+        multi = getattr(results, "multi_face_landmarks", None)
+        if not multi:
+            return None
+        return np.array([(p.x, p.y) for p in multi[0].landmark], dtype=np.float64)
+
+    # ---------------------------
+    # ROI 갱신
+    # ---------------------------
+    def _roi_from(self, points: np.ndarray, w: int, h: int, scale: float) -> Roi:
+        """원본 정규화 좌표 → 여백 포함 정사각형 ROI (원본 px, 화면 안으로 자름)"""
+        xs, ys = points[:, 0] * w, points[:, 1] * h
+        cx, cy = (xs.min() + xs.max()) / 2.0, (ys.min() + ys.max()) / 2.0
+        side = max(xs.max() - xs.min(), ys.max() - ys.min()) * (1.0 + 2.0 * self.padding)
+        side = min(max(side, self.min_side / scale), float(max(w, h)))
+        x0 = int(np.clip(cx - side / 2.0, 0, max(0, w - side)))
+        y0 = int(np.clip(cy - side / 2.0, 0, max(0, h - side)))
+        return x0, y0, min(w, int(x0 + side)), min(h, int(y0 + side))
+
+    def _inside(self, points: np.ndarray, w: int, h: int) -> bool:
+        """
+        랜드마크가 현재 ROI 안쪽(여백 절반 이내)에 머무는지
+        - 머무는 동안 ROI 를 고정 → FaceMesh 내부 추적이 매 프레임 흔들리지 않음
+        """
+        x0, y0, x1, y1 = self.roi
+        margin = (x1 - x0) * self.padding / (2.0 * (1.0 + 2.0 * self.padding))
+        xs, ys = points[:, 0] * w, points[:, 1] * h
+        return (
+            xs.min() >= x0 + margin and xs.max() <= x1 - margin
+            and ys.min() >= y0 + margin and ys.max() <= y1 - margin
+        )
+
+    def _touches_edge(self, local: np.ndarray, w: int, h: int, edge: float = 0.01) -> bool:
+        """
+        크롭 기준 정규화 랜드마크가 크롭 가장자리에 닿았는지 (얼굴이 크롭 밖으로 나가는 중)
+        - 화면 끝과 겹치는 가장자리는 제외 (원래 화면 끝에 걸친 얼굴은 전체 검출해도 같음)
+        """
+        x0, y0, x1, y1 = self.roi
+        return bool(
+            (x0 > 0 and local[:, 0].min() <= edge) or (x1 < w and local[:, 0].max() >= 1.0 - edge)
+            or (y0 > 0 and local[:, 1].min() <= edge) or (y1 < h and local[:, 1].max() >= 1.0 - edge)
+        )
+
+    # ---------------------------
+    # 프레임 1장 → 원본 기준 정규화 랜드마크
+    # ---------------------------
+    def landmarks(self, frame_bgr: np.ndarray) -> Optional[np.ndarray]:
+        h, w = frame_bgr.shape[:2]
+        scale = self._scale(w, h)
+        self.work_size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+
+        points = None
+        if self.use_roi and self.roi is not None:
+            x0, y0, x1, y1 = self.roi
+            local = self._detect(self._resize(frame_bgr[y0:y1, x0:x1], scale), self.roi)
+            if local is not None and self._touches_edge(local, w, h):
+                local = None
+            if local is not None:
+                self.stats["roi_frames"] += 1
+                points = np.empty_like(local)
+                points[:, 0] = (x0 + local[:, 0] * (x1 - x0)) / w
+                points[:, 1] = (y0 + local[:, 1] * (y1 - y0)) / h
+            else:
+                # 추적 실패 → 같은 프레임을 전체 화면에서 다시 검출
+                self.stats["roi_lost"] += 1
+                self.roi = None
+
+        if points is None:
+            points = self._detect(self._resize(frame_bgr, scale), None)
+            self.stats["full_frames"] += 1
+            if points is None:
+                return None
+
+        if self.use_roi and (self.roi is None or not self._inside(points, w, h)):
+            self.roi = self._roi_from(points, w, h, scale)
+        return points
+
+    def summary(self) -> Dict[str, Any]:
+        return {**self.stats, "work_size": list(self.work_size) if self.work_size else None}
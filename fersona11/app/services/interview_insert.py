@@ -1,17 +1,13 @@
 from fastapi import APIRouter, UploadFile, Form, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.database import get_db
-import shutil
-import os
+from app.services.storage import blob_store
 from typing import Optional
+from contextlib import ExitStack
 
 # 라우터 선언
 router = APIRouter(prefix="/interview", tags=["Interview"])
 
-# 업로드 경로 설정
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
 @router.post("/upload-media")
 async def upload_media(
     video: UploadFile,
@@ -21,25 +17,21 @@ async def upload_media(
     db: Session = Depends(get_db)
 ):
     try:
-        # 파일 저장
-        video_path = os.path.join(UPLOAD_DIR, video.filename)
-        with open(video_path, "wb") as buffer:
-            shutil.copyfileobj(video.file, buffer)
-
-        audio_path = None
-        if audio:
-            audio_path = os.path.join(UPLOAD_DIR, audio.filename)
-            with open(audio_path, "wb") as buffer:
-                shutil.copyfileobj(audio.file, buffer)
-
-        # 분석 후 RDS 저장
-        result = analyze_and_insert_interview(
-            db=db,
-            video_path=video_path,
-            audio_path=audio_path,
-            user_id=user_id,
-            guest_token=guest_token
-        )
+        # 파일 저장 (내용 해시 기반 blob 저장소)
+        video_key = blob_store.put_stream(video.file, video.filename).key
+        audio_key = blob_store.put_stream(audio.file, audio.filename).key if audio else None
+
+        # 분석 후 RDS 저장 (원격 저장소면 임시 로컬 사본으로 분석)
+        with ExitStack() as stack:
+            video_path = stack.enter_context(blob_store.open_local(video_key))
+            audio_path = stack.enter_context(blob_store.open_local(audio_key)) if audio_key else None
+            result = analyze_and_insert_interview(
+                db=db,
+                video_path=video_path,
+                audio_path=audio_path,
+                user_id=user_id,
+                guest_token=guest_token
+            )
 
         return {"status": "success", "result": result}
 
@@ -0,0 +1,154 @@
+import wave
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+from app.config import settings
+from app.services.analysis import default_whisper_model_name
+from app.utils.metrics import counter, gauge
+
+# ----------------------------------------
+# 작업별 분석 설정(ASR 모델 크기 / 시선 샘플링 밀도) 선택
+# - 대기열 길이 + 영상 길이 + 목표 완료 시간으로 결정
+# - 몰리는 시간대에는 가벼운 설정으로 내려가 대기열이 쌓이지 않게 함
+# - ANALYSIS_TARGET_COMPLETION_SEC = 0 이면 항상 첫 번째(full) 설정
+# ----------------------------------------
+
+
+@dataclass(frozen=True)
+class AnalysisProfile:
+    name: str
+    whisper_model: str
+    frame_interval: int          # analyze_video_features: N 프레임마다 1장
+    max_frames: int              # analyze_video_features: 최대 처리 프레임 수
+    initial_rtf: float           # 측정 전 처리 시간 / 영상 길이 추정값
+
+
+def build_profiles() -> Tuple[AnalysisProfile, ...]:
+    """품질 높은 순 → 가벼운 순"""
+    return (
+        AnalysisProfile("full", default_whisper_model_name(), frame_interval=5, max_frames=150, initial_rtf=1.0),
+        AnalysisProfile("reduced", "tiny", frame_interval=10, max_frames=100, initial_rtf=0.45),
+        AnalysisProfile("minimal", "tiny", frame_interval=15, max_frames=50, initial_rtf=0.3),
+    )
+
+
+def media_duration_sec(audio_path: str) -> float:
+    """추출한 wav(pcm) 헤더로 길이 계산 (디코딩 없음), 실패 시 0"""
+    try:
+        with wave.open(audio_path, "rb") as wav:
+            rate = wav.getframerate()
+            return wav.getnframes() / float(rate) if rate else 0.0
+    except (OSError, EOFError, wave.Error):
+        return 0.0
+
+
+# =========================================
+# ✅ 선택 정책 (프로세스당 1개, 분석 스레드에서 호출)
+# =========================================
+class AnalysisPolicy:
+    """
+    설정별 처리 시간 / 영상 길이(RTF) 를 작업 완료 때마다 EWMA 로 갱신하고,
+    새 작업마다 목표 시간 안에 끝날 것으로 예상되는 가장 좋은 설정을 고름
+      - 이 작업: 이미 기다린 시간 + RTF x 영상 길이 ≤ 목표
+      - 뒤에서 기다리는 작업: 같은 설정으로 처리된다고 볼 때 대기열이 목표 안에 비워질 것
+      - 어느 설정도 맞지 않으면 가장 가벼운 설정
+    """
+
+    def __init__(self, target_sec: float, alpha: float = 0.2, profiles: Optional[Tuple[AnalysisProfile, ...]] = None):
+        self.target_sec = target_sec
+        self.alpha = alpha
+        self.profiles = profiles or build_profiles()
+        self._rtf: Dict[str, float] = {p.name: p.initial_rtf for p in self.profiles}
+        self._lock = threading.Lock()
+        for name, value in self._rtf.items():
+            PROFILE_RTF.set(value, profile=name)
+
+    @property
+    def enabled(self) -> bool:
+        return self.target_sec > 0
+
+    def profile(self, name: str) -> AnalysisProfile:
+        return next((p for p in self.profiles if p.name == name), self.profiles[0])
+
+    def whisper_models(self) -> Tuple[str, ...]:
+        """이 정책으로 쓰일 수 있는 Whisper 모델 (serve.py 사전 로드용)"""
+        profiles = self.profiles if self.enabled else self.profiles[:1]
+        return tuple(dict.fromkeys(p.whisper_model for p in profiles))
+
+    def choose(
+        self,
+        media_sec: float,
+        waited_sec: float = 0.0,
+        queue_waiting: int = 0,
+        queue_limit: int = 1,
+    ) -> Tuple[AnalysisProfile, Dict[str, Any]]:
+        decision: Dict[str, Any] = {
+            "media_sec": round(media_sec, 2),
+            "waited_sec": round(waited_sec, 2),
+            "queue_waiting": queue_waiting,
+            "target_sec": self.target_sec,
+        }
+        if not self.enabled:
+            chosen, reason = self.profiles[0], "policy_disabled"
+        else:
+            with self._lock:
+                rtf = dict(self._rtf)
+            budget = self.target_sec - waited_sec
+            backlog = 1.0 + queue_waiting / max(1, queue_limit)
+            chosen, reason = self.profiles[-1], "over_budget"
+            for profile in self.profiles:
+                own = rtf[profile.name] * media_sec
+                if own <= budget and own * backlog <= self.target_sec:
+                    chosen, reason = profile, "within_target"
+                    break
+            decision["predicted_sec"] = round(rtf[chosen.name] * media_sec, 2)
+
+        decision.update({
+            "profile": chosen.name,
+            "reason": reason,
+            "whisper_model": chosen.whisper_model,
+            "frame_interval": chosen.frame_interval,
+            "max_frames": chosen.max_frames,
+        })
+        PROFILE_CHOICES.inc(profile=chosen.name, reason=reason)
+        return chosen, decision
+
+    def record(self, profile: AnalysisProfile, media_sec: float, elapsed_sec: float) -> None:
+        """성공한 작업의 처리 시간 반영 (길이를 모르는 영상은 제외)"""
+        if media_sec <= 0:
+            return
+        with self._lock:
+            prev = self._rtf[profile.name]
+            value = self._rtf[profile.name] = self.alpha * (elapsed_sec / media_sec) + (1.0 - self.alpha) * prev
+        PROFILE_RTF.set(value, profile=profile.name)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            rtf = dict(self._rtf)
+        return {
+            "enabled": self.enabled,
+            "target_sec": self.target_sec,
+            "profiles": [
+                {
+                    "name": p.name,
+                    "whisper_model": p.whisper_model,
+                    "frame_interval": p.frame_interval,
+                    "max_frames": p.max_frames,
+                    "rtf": round(rtf[p.name], 3),
+                }
+                for p in self.profiles
+            ],
+        }
+
+
+PROFILE_CHOICES = counter(
+    "fersona_analysis_profile_total", "Analysis profile chosen per job", ("profile", "reason")
+)
+PROFILE_RTF = gauge(
+    "fersona_analysis_profile_rtf", "EWMA of processing seconds per media second by profile", ("profile",)
+)
+
+analysis_policy = AnalysisPolicy(
+    target_sec=settings.ANALYSIS_TARGET_COMPLETION_SEC,
+    alpha=settings.ANALYSIS_DURATION_EWMA_ALPHA,
+)
@@ -0,0 +1,342 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from app.config import settings
+from app.database import SessionLocal
+from app.services.feedback_service import resolve_message
+from app.services.report_service import load_result_payload
+
+# ----------------------------------------
+# 템플릿 버전 - 레이아웃/문구를 바꾸면 올려서 캐시 무효화
+# ----------------------------------------
+REPORT_TEMPLATE_VERSION = 2    # 2: result_id = analysis_result.id (구 analysis.id 캐시 무효화)
+
+METRICS = (
+    ("gaze", "시선", ("report", "gaze_score_value")),
+    ("expression", "표정", ("report", "expression_score_value")),
+    ("speech", "발화 속도", ("whisper", "speech_score_value")),
+    ("pitch", "억양", ("whisper", "pitch_score_value")),
+)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_inflight: Dict[str, Future] = {}
+_errors: "OrderedDict[str, str]" = OrderedDict()    # 최근 실패 (경로 → 오류), 오래된 것부터 밀려남
+_MAX_ERRORS = 256
+_lock = threading.Lock()
+
+
+# =========================================
+# ✅ 캐시 키 (결과 id + 설정 버전)
+# =========================================
+def report_config_version() -> str:
+    """템플릿 버전 + 렌더링에 영향을 주는 설정의 해시"""
+    raw = json.dumps(
+        [REPORT_TEMPLATE_VERSION, settings.REPORT_FONT_PATH, settings.REPORT_LOGO_PATH],
+        ensure_ascii=False,
+    )
+    return hashlib.sha1(raw.encode()).hexdigest()[:10]
+
+
+def report_path(result_id: int) -> str:
+    return os.path.join(settings.REPORT_DIR, f"result_{result_id}_{report_config_version()}.pdf")
+
+
+def report_filename(result_id: int) -> str:
+    return f"fersona_report_{result_id}.pdf"
+
+
+# =========================================
+# ✅ 분석 결과 조회 (analysis_result 요약 + 상세 문서)
+# =========================================
+def load_result(result_id: int) -> Optional[Dict[str, Any]]:
+    db = SessionLocal()
+    try:
+        return load_result_payload(db, result_id=result_id)
+    finally:
+        db.close()
+
+
+# =========================================
+# ✅ 템플릿 (폰트 등록 / 스타일 / 로고) - 프로세스당 1회만 준비
+# =========================================
+@lru_cache(maxsize=1)
+def _template() -> Dict[str, Any]:
+    try:
+        from reportlab.lib import colors
+        from reportlab.lib.styles import ParagraphStyle
+        from reportlab.lib.units import mm
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+        from reportlab.pdfbase.ttfonts import TTFont
+        from reportlab.platypus import Image
+    except ImportError as e:
+        raise RuntimeError("PDF 리포트 생성에는 reportlab 설치가 필요합니다.") from e
+
+    # 한글 폰트: 지정한 TTF 가 있으면 사용, 없으면 reportlab 내장 CID 폰트
+    font = "HYSMyeongJo-Medium"
+    if settings.REPORT_FONT_PATH and os.path.exists(settings.REPORT_FONT_PATH):
+        font = "ReportFont"
+        pdfmetrics.registerFont(TTFont(font, settings.REPORT_FONT_PATH))
+    else:
+        pdfmetrics.registerFont(UnicodeCIDFont(font))
+
+    logo = None
+    if settings.REPORT_LOGO_PATH and os.path.exists(settings.REPORT_LOGO_PATH):
+        with open(settings.REPORT_LOGO_PATH, "rb") as f:
+            logo = f.read()
+
+    base = ParagraphStyle("base", fontName=font, fontSize=10, leading=15)
+    return {
+        "font": font,
+        "logo": logo,
+        "mm": mm,
+        "colors": colors,
+        "Image": Image,
+        "styles": {
+            "title": ParagraphStyle("title", parent=base, fontSize=20, leading=26, spaceAfter=4 * mm),
+            "meta": ParagraphStyle("meta", parent=base, fontSize=9, textColor=colors.grey),
+            "h2": ParagraphStyle("h2", parent=base, fontSize=13, leading=18, spaceBefore=6 * mm, spaceAfter=2 * mm),
+            "body": base,
+            "small": ParagraphStyle("small", parent=base, fontSize=8.5, leading=12, textColor=colors.HexColor("#555555")),
+        },
+    }
+
+
+def _score(result: Dict[str, Any], path: Tuple[str, str]) -> float:
+    try:
+        return float((result.get(path[0]) or {}).get(path[1]) or 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _feedback_items(items: Any) -> List[Dict[str, Any]]:
+    out = []
+    for item in items or []:
+        if isinstance(item, dict):
+            out.append(item)
+        elif item:
+            out.append({"feedback": str(item)})
+    return out
+
+
+def _escape(text: Any) -> str:
+    return str(text or "").replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _score_chart(tpl: Dict[str, Any], labels: List[str], values: List[float]):
+    from reportlab.graphics.shapes import Drawing
+    from reportlab.graphics.charts.barcharts import VerticalBarChart
+
+    mm = tpl["mm"]
+    drawing = Drawing(170 * mm, 60 * mm)
+    chart = VerticalBarChart()
+    chart.x, chart.y = 12 * mm, 8 * mm
+    chart.width, chart.height = 150 * mm, 48 * mm
+    chart.data = [values]
+    chart.valueAxis.valueMin = 0
+    chart.valueAxis.valueMax = 100
+    chart.valueAxis.valueStep = 20
+    chart.valueAxis.labels.fontName = tpl["font"]
+    chart.categoryAxis.categoryNames = labels
+    chart.categoryAxis.labels.fontName = tpl["font"]
+    chart.bars[0].fillColor = tpl["colors"].HexColor("#4C7EF3")
+    chart.barLabelFormat = "%.1f"
+    chart.barLabels.fontName = tpl["font"]
+    chart.barLabels.nudge = 6
+    drawing.add(chart)
+    return drawing
+
+
+def _wpm_chart(tpl: Dict[str, Any], segments: List[Dict[str, Any]]):
+    """구간별 발화 속도(음절/분) 추이"""
+    import re
+    from reportlab.graphics.shapes import Drawing
+    from reportlab.graphics.charts.lineplots import LinePlot
+
+    points = []
+    for seg in segments:
+        start, end = float(seg.get("start", 0.0)), float(seg.get("end", 0.0))
+        if end <= start:
+            continue
+        syllables = len(re.findall(r"[가-힣]", seg.get("text", "")))
+        points.append((round(start, 1), round(syllables / (end - start) * 60.0, 1)))
+    if len(points) < 2:
+        return None
+
+    mm = tpl["mm"]
+    drawing = Drawing(170 * mm, 50 * mm)
+    plot = LinePlot()
+    plot.x, plot.y = 12 * mm, 8 * mm
+    plot.width, plot.height = 150 * mm, 38 * mm
+    plot.data = [points]
+    plot.lines[0].strokeColor = tpl["colors"].HexColor("#F39C4C")
+    plot.xValueAxis.labels.fontName = tpl["font"]
+    plot.yValueAxis.labels.fontName = tpl["font"]
+    plot.yValueAxis.valueMin = 0
+    drawing.add(plot)
+    return drawing
+
+
+# =========================================
+# ✅ PDF 렌더링 (임시 파일에 쓰고 원자적으로 교체)
+# =========================================
+def render_report_pdf(result: Dict[str, Any], out_path: str) -> str:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+    import io
+
+    tpl = _template()
+    st, mm, colors = tpl["styles"], tpl["mm"], tpl["colors"]
+    report = result.get("report") or {}
+    whisper = result.get("whisper") or {}
+
+    story = []
+    if tpl["logo"]:
+        story.append(tpl["Image"](io.BytesIO(tpl["logo"]), width=30 * mm, height=10 * mm, hAlign="LEFT"))
+    story.append(Paragraph("FERSONA 면접 분석 리포트", st["title"]))
+    story.append(Paragraph(
+        f"사용자 {_escape(result.get('user_id'))} · 결과 #{result.get('id')} · {_escape(result.get('timestamp'))}",
+        st["meta"],
+    ))
+
+    # 1) 점수 요약 + 차트
+    labels = [label for _, label, _ in METRICS]
+    values = [round(_score(result, path), 1) for _, _, path in METRICS]
+    story.append(Paragraph("종합 점수", st["h2"]))
+    table = Table([labels, [f"{v:.1f}" for v in values]], colWidths=[40 * mm] * len(labels))
+    table.setStyle(TableStyle([
+        ("FONTNAME", (0, 0), (-1, -1), tpl["font"]),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#EEF2FB")),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#C8D1E6")),
+        ("FONTSIZE", (0, 1), (-1, 1), 14),
+        ("TOPPADDING", (0, 0), (-1, -1), 5),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 5),
+    ]))
+    story.append(table)
+    story.append(Spacer(1, 4 * mm))
+    story.append(_score_chart(tpl, labels, values))
+
+    # 2) 시선 / 표정
+    story.append(Paragraph("시선 · 표정", st["h2"]))
+    for key in ("gaze", "expression"):
+        if report.get(f"{key}_feedback"):
+            story.append(Paragraph(_escape(report[f"{key}_feedback"]), st["body"]))
+        if report.get(f"{key}_correction"):
+            story.append(Paragraph("→ " + _escape(report[f"{key}_correction"]), st["small"]))
+        story.append(Spacer(1, 2 * mm))
+
+    # 3) 발화 / 억양
+    story.append(Paragraph("발화 · 억양", st["h2"]))
+    story.append(Paragraph(
+        f"발화 속도 {whisper.get('wpm_total', 0)} 음절/분 · 피치 표준편차 {whisper.get('f0_std_total', 0)} Hz",
+        st["body"],
+    ))
+    wpm_chart = _wpm_chart(tpl, whisper.get("segments") or [])
+    if wpm_chart is not None:
+        story.append(wpm_chart)
+
+    feedback = whisper.get("feedback") or {}
+    for key, label in (("speech", "발화 속도"), ("pitch", "억양")):
+        items = [resolve_message(feedback, item) for item in _feedback_items(feedback.get(key))]
+        if not items:
+            continue
+        story.append(Paragraph(label, st["body"]))
+        for item in items:
+            span = ""
+            if "start_time" in item and "end_time" in item:
+                span = f"[{float(item['start_time']):.1f}s~{float(item['end_time']):.1f}s] "
+            story.append(Paragraph("• " + span + _escape(item.get("feedback")), st["body"]))
+            if item.get("correction"):
+                story.append(Paragraph("→ " + _escape(item["correction"]), st["small"]))
+        story.append(Spacer(1, 2 * mm))
+
+    # 4) 전사문
+    if whisper.get("text"):
+        story.append(Paragraph("답변 전사", st["h2"]))
+        story.append(Paragraph(_escape(whisper["text"]), st["small"]))
+
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    tmp_path = f"{out_path}.{threading.get_ident()}.tmp"
+    try:
+        doc = SimpleDocTemplate(
+            tmp_path, pagesize=A4,
+            leftMargin=18 * mm, rightMargin=18 * mm, topMargin=16 * mm, bottomMargin=16 * mm,
+            title=f"FERSONA report #{result.get('id')}",
+        )
+        doc.build(story)
+        os.replace(tmp_path, out_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return out_path
+
+
+# =========================================
+# ✅ 백그라운드 렌더링 요청 (같은 결과는 1번만 렌더링)
+# =========================================
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.REPORT_RENDER_WORKERS, thread_name_prefix="pdf-report"
+        )
+    return _executor
+
+
+def _render_job(result_id: int, out_path: str) -> str:
+    started = datetime.now()
+    result = load_result(result_id)
+    if result is None:
+        raise LookupError(f"결과 #{result_id} 없음")
+    render_report_pdf(result, out_path)
+    elapsed = (datetime.now() - started).total_seconds()
+    print(f"[REPORT PDF] 생성 완료 result_id={result_id} ({elapsed:.2f}s) → {out_path}")
+    return out_path
+
+
+def _on_done(path: str, future: Future) -> None:
+    with _lock:
+        _inflight.pop(path, None)
+        error = future.exception()
+        if error is not None:
+            _errors[path] = str(error)
+            _errors.move_to_end(path)
+            while len(_errors) > _MAX_ERRORS:
+                _errors.popitem(last=False)
+            print(f"[REPORT PDF] 생성 실패 {path}: {error}")
+
+
+def request_report(result_id: int, retry: bool = False) -> Dict[str, Any]:
+    """
+    리포트 상태 반환 + 없으면 렌더링 예약
+    status: ready(캐시 있음) | pending(생성 중) | failed(직전 시도 실패, retry=True 로 재시도)
+    """
+    path = report_path(result_id)
+    if os.path.exists(path):
+        return {"status": "ready", "path": path}
+
+    with _lock:
+        if path in _inflight:
+            return {"status": "pending", "path": path}
+        if path in _errors and not retry:
+            return {"status": "failed", "path": path, "error": _errors[path]}
+        _errors.pop(path, None)
+        future = _get_executor().submit(_render_job, result_id, path)
+        _inflight[path] = future
+    future.add_done_callback(lambda f: _on_done(path, f))
+    return {"status": "pending", "path": path}
+
+
+def shutdown_report_workers() -> None:
+    """앱 종료 훅에서 호출 - 대기 중인 렌더링 취소"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,287 @@
+import shutil
+import tempfile
+import time
+import uuid
+import subprocess
+from contextlib import ExitStack
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Video, AnalysisResult
+from app.services.analysis import analyze_speech, analyze_video_features
+from app.services.feedback_service import generate_feedback_with_segments
+from app.services.report_service import analyze_and_insert_with_feedback
+from app.services.user_identity import resolve_user_id
+from app.services.score_history import extract_scores
+from app.services.previews import with_url_prefix
+from app.services.storage import blob_store, StoredBlob
+from app.services.remux import remux_for_playback
+from app.services.retention import enforce_user_quota
+from app.services.admission import analysis_admission
+from app.services.model_policy import analysis_policy, media_duration_sec
+from app.services.progress import ProgressPublisher
+from app.utils.metrics import (
+    stage_timer, JOBS, JOB_SECONDS, MEDIA_SECONDS, REALTIME_FACTOR,
+)
+from app.utils.tracing import JobTrace, use_trace, maybe_profile, annotate
+
+
+# =========================================
+# ✅ 비디오 처리 함수 (오디오 추출)
+# =========================================
+def process_video(video_path: str):
+    """비디오에서 오디오 추출"""
+    try:
+        tmp_audio = tempfile.NamedTemporaryFile(delete=False, suffix=".wav").name
+        cmd = [
+            "ffmpeg", "-y", "-i", video_path,
+            "-vn", "-acodec", "pcm_s16le", "-ar", "16000", "-ac", "1",
+            tmp_audio
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+
+        if result.returncode != 0:
+            print(f"[FFMPEG ERROR] {result.stderr}")
+            return None
+
+        print(f"[FFMPEG] 오디오 추출 완료 → {tmp_audio}")
+        return tmp_audio
+    except Exception as e:
+        print(f"[ERROR] ffmpeg 추출 실패: {e}")
+        return None
+
+
+# =========================================
+# ✅ 업로드 저장 + 영상 행 등록 (blob 참조 카운트)
+# - 기존 blob 을 재사용(dedup)해도 분석이 끝나기 전에 행을 먼저 넣어
+#   만료 스윕 / 쿼터 / 보관 작업이 ref_count == 0 으로 보고 파일을 지우지 않게 함
+# =========================================
+def register_video(user_id: str, blob: StoredBlob, original_name: Optional[str]) -> int:
+    db = SessionLocal()
+    try:
+        video_row = Video(
+            filename=blob.key,
+            original_name=original_name,
+            owner_id=resolve_user_id(db, user_id),
+            content_hash=blob.digest,
+            size_bytes=blob.size,
+        )
+        db.add(video_row)
+        db.commit()
+        return video_row.id
+    finally:
+        db.close()
+
+
+def store_upload(src: BinaryIO, filename: Optional[str], user_id: str) -> Tuple[StoredBlob, int]:
+    """폼 업로드 스트림 → (blob, videos.id)"""
+    claimed: Dict[str, int] = {}
+    blob = blob_store.put_stream(
+        src, filename, remux_for_playback,
+        claim=lambda b: claimed.setdefault("video_id", register_video(user_id, b, filename)),
+    )
+    return blob, claimed["video_id"]
+
+
+def adopt_upload(incoming_key: str, filename: Optional[str], user_id: str) -> Tuple[StoredBlob, int]:
+    """직접 업로드(incoming/) → (blob, videos.id)"""
+    claimed: Dict[str, int] = {}
+    blob = blob_store.adopt_incoming(
+        incoming_key, filename, remux_for_playback,
+        claim=lambda b: claimed.setdefault("video_id", register_video(user_id, b, filename or incoming_key)),
+    )
+    return blob, claimed["video_id"]
+
+
+def discard_video(video_id: int) -> None:
+    """분석 실패 → 먼저 등록한 영상 행 삭제 (다른 참조가 없으면 파일도)"""
+    db = SessionLocal()
+    try:
+        video = db.query(Video).filter(Video.id == video_id).first()
+        if video is None:
+            return
+        db.delete(video)
+        db.flush()
+        blob_store.release(db, video, exclude_video_ids=[video_id])
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"[UPLOAD] 실패한 업로드 영상 정리 실패 video_id={video_id}: {e}")
+    finally:
+        db.close()
+
+
+# =========================================
+# ✅ 저장된 blob 1개 분석 → DB 반영 → 결과 JSON
+# (폼 업로드 / 직접 업로드 완료 공통)
+# =========================================
+def run_upload_pipeline(
+    user_id: str,
+    blob: StoredBlob,
+    original_name: str,
+    trace: Optional[JobTrace] = None,
+    progress: Optional[ProgressPublisher] = None,
+    video_id: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    trace: 요청 쪽에서 만든 작업 트레이스 (스레드풀로 넘어오므로 여기서 다시 연결)
+    → 단계별 span 을 모아 analysis_result.trace_json 에 결과와 함께 저장
+    progress: 단계가 끝날 때마다 부분 결과를 진행 문서에 기록 (SSE 로 전송)
+    video_id: store_upload / adopt_upload 에서 먼저 등록한 영상 행 (분석 실패 시 삭제)
+    """
+    progress = progress or ProgressPublisher(None)
+    with use_trace(trace), maybe_profile(trace, settings.TRACE_PROFILE_SAMPLE_RATE):
+        return _run_upload_pipeline(user_id, blob, original_name, trace, progress, video_id)
+
+
+def _run_upload_pipeline(
+    user_id: str,
+    blob: StoredBlob,
+    original_name: str,
+    trace: Optional[JobTrace],
+    progress: ProgressPublisher,
+    video_id: Optional[int],
+) -> Dict[str, Any]:
+    progress.running()
+    db = SessionLocal()
+    preview_tmp = tempfile.mkdtemp(dir=blob_store.staging_dir)
+    started = time.perf_counter()
+    annotate(blob_size=blob.size, digest=blob.digest[:12])
+    inserted = None
+    try:
+        with ExitStack() as local:
+            # 로컬 사본 준비(S3 다운로드 등)만 측정 - 분석 시간은 각 단계 타이머에서
+            with stage_timer("fetch_local"):
+                save_path = local.enter_context(blob_store.open_local(blob.key))
+
+            # 2️⃣ 오디오 추출
+            with stage_timer("ffmpeg_extract"):
+                temp_audio = process_video(save_path)
+            if not temp_audio:
+                raise RuntimeError("오디오 추출 실패")
+
+            # ✅ 작업별 분석 설정 선택 (대기열 / 영상 길이 / 목표 완료 시간)
+            media_sec = media_duration_sec(temp_audio)
+            profile, decision = analysis_policy.choose(
+                media_sec,
+                waited_sec=time.time() - trace.started_wall if trace is not None else 0.0,
+                queue_waiting=analysis_admission.waiting,
+                queue_limit=analysis_admission.limit,
+            )
+            annotate(analysis_profile=profile.name, profile_reason=decision["reason"])
+            print(f"[ANALYSIS] 분석 설정 {profile.name} ({decision['reason']}, 영상 {media_sec:.1f}s)")
+
+            # 3️⃣ 비디오 → Whisper 분석 (세부 단계는 analysis 모듈에서 측정)
+            # 시선/표정이 Whisper 보다 훨씬 빨리 끝나므로 먼저 실행 → 결과 화면 카드가 먼저 채워짐
+            print("[ANALYSIS] 비디오(시선/표정) 분석 시작...")
+            with stage_timer("video_analysis"):
+                report_result = analyze_video_features(
+                    save_path,
+                    max_frames=profile.max_frames,
+                    frame_interval=profile.frame_interval,
+                    preview_dir=preview_tmp,
+                )
+            progress.publish("vision", {"report": {k: v for k, v in report_result.items() if k != "previews"}})
+
+            print("[ANALYSIS] Whisper 음성 분석 시작...")
+            with stage_timer("speech_analysis"):
+                whisper_result = analyze_speech(
+                    temp_audio,
+                    model_name=profile.whisper_model,
+                    on_stage=lambda stage, fields: progress.publish(stage, {"whisper": fields}),
+                )
+            whisper_result["analysis_profile"] = decision
+
+            print("[ANALYSIS] Whisper 세그먼트 피드백 생성...")
+            with stage_timer("segment_feedback"):
+                whisper_feedback = generate_feedback_with_segments(whisper_result)
+            whisper_result["feedback"] = whisper_feedback
+            progress.publish("feedback", {"whisper": {"feedback": whisper_feedback}})
+
+        # ✅ 미리보기는 저장소에 올리고 URL 로 변환
+        # 같은 영상을 다시 분석하면 샘플링이 달라질 수 있음 → 분석마다 새 경로 (nginx 에서 immutable 캐시)
+        run_id = trace.job_id if trace is not None else uuid.uuid4().hex
+        preview_prefix = f"previews/{blob.digest}/{run_id}"
+        with stage_timer("storage_publish"):
+            blob_store.publish_dir(preview_tmp, preview_prefix)
+        report_result["previews"] = with_url_prefix(
+            report_result.get("previews"), blob_store.url(preview_prefix)
+        )
+
+        with stage_timer("db_write"):
+            # ✅ 사용자 정보 확인/생성 (캐시 + 원자적 upsert)
+            user_pk = resolve_user_id(db, user_id)
+
+            # ✅ 영상 행 (저장 직후 등록하지 않은 호출이면 여기서 등록)
+            if video_id is None:
+                video_id = register_video(user_id, blob, original_name)
+
+            # ✅ 회원 용량 쿼터 초과 시 오래 안 본 영상부터 정리 (방금 올린 영상 제외)
+            enforce_user_quota(db, user_pk, keep_video_id=video_id)
+
+            # ✅ 결과 통합 및 DB 반영
+            with stage_timer("scoring"):
+                scores = extract_scores(report_result, whisper_result)
+            # 요약 행 + 압축 상세 문서로 저장 (결과 조회 / PDF 도 이 행을 읽음)
+            inserted = analyze_and_insert_with_feedback(
+                db=db,
+                analysis_result=whisper_result,
+                user_id=user_pk,
+                scores=scores,
+                video_id=video_id,
+                report=report_result,
+                video_file=blob_store.url(blob.key),
+                audio_file=temp_audio,
+                extra={"job_id": trace.job_id} if trace is not None else None,
+            )
+        record = (inserted or {}).get("record")
+
+        # ✅ 결과 JSON 통합 (업로드 응답)
+        result_data = {
+            "id": record.id if record is not None else None,
+            "user_id": user_id,
+            "video_file": blob_store.url(blob.key),
+            "audio_file": temp_audio,
+            "report": report_result,
+            "whisper": whisper_result,
+            "analysis_profile": decision,
+        }
+        if trace is not None:
+            result_data["job_id"] = trace.job_id
+
+        # ✅ 작업 지표 (처리 시간 / 영상 길이 = 실시간 배수)
+        elapsed = time.perf_counter() - started
+        _save_trace(db, trace, inserted)
+        progress.finish(record.id if record is not None else None)
+        JOBS.inc(outcome="success")
+        JOB_SECONDS.observe(elapsed)
+        media_sec = float(whisper_result.get("duration") or media_sec)
+        if media_sec > 0:
+            MEDIA_SECONDS.observe(media_sec)
+            REALTIME_FACTOR.observe(elapsed / media_sec)
+        analysis_policy.record(profile, media_sec, elapsed)
+        return result_data
+    except Exception as e:
+        JOBS.inc(outcome="error")
+        progress.fail(f"{type(e).__name__}: {e}")
+        if video_id is not None and inserted is None:
+            discard_video(video_id)
+        raise
+    finally:
+        db.close()
+        shutil.rmtree(preview_tmp, ignore_errors=True)
+
+
+def _save_trace(db, trace: Optional[JobTrace], inserted: Optional[Dict[str, Any]]) -> None:
+    """결과 행에 작업 트레이스 기록 (실패해도 분석 결과에는 영향 없음)"""
+    record = (inserted or {}).get("record")
+    if trace is None or record is None:
+        return
+    try:
+        db.query(AnalysisResult).filter(AnalysisResult.id == record.id).update(
+            {AnalysisResult.trace_json: trace.to_dict()}, synchronize_session=False
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"[TRACE] 트레이스 저장 실패: {e}")
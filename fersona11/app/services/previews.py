@@ -0,0 +1,149 @@
+import os
+import math
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+
+# ----------------------------------------
+# 미리보기 설정
+# ----------------------------------------
+THUMB_WIDTH = 160            # 썸네일 가로 (세로는 비율 유지)
+PREVIEW_INTERVAL_SEC = 1.0   # 썸네일 최소 간격
+SPRITE_COLUMNS = 10          # 스프라이트 시트 열 수
+MAX_THUMBNAILS = 200         # 긴 영상은 간격을 넓혀 이 개수 안으로 (스프라이트 크기 제한)
+JPEG_QUALITY = 70
+
+SPRITE_NAME = "sprite.jpg"
+VTT_NAME = "sprite.vtt"
+
+
+def _vtt_time(t: float) -> str:
+    ms = int(round(t * 1000))
+    h, ms = divmod(ms, 3_600_000)
+    m, ms = divmod(ms, 60_000)
+    s, ms = divmod(ms, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d}.{ms:03d}"
+
+
+# ----------------------------------------
+# 분석 루프에서 이미 디코딩한 프레임으로 미리보기 생성
+# ----------------------------------------
+class PreviewCollector:
+    """
+    analyze_video_features 의 샘플링 프레임을 받아
+    축소 썸네일 + 타일 스프라이트 + WebVTT 인덱스를 만든다 (추가 디코딩 없음)
+    """
+
+    def __init__(self, interval_sec: float = PREVIEW_INTERVAL_SEC, width: int = THUMB_WIDTH):
+        self.interval_sec = interval_sec
+        self.width = width
+        self.height: Optional[int] = None
+        self.frames: List[Tuple[float, np.ndarray]] = []
+        self._next_t = 0.0
+
+    def add(self, timestamp: float, frame_bgr: np.ndarray) -> None:
+        if timestamp < self._next_t:
+            return
+        import cv2  # 분석 프로세스에서만 로드 (with_url_prefix 만 쓰는 API 쪽은 불필요)
+
+        if self.height is None:
+            h, w = frame_bgr.shape[:2]
+            self.height = max(2, int(round(h * self.width / w)) // 2 * 2)
+        thumb = cv2.resize(frame_bgr, (self.width, self.height), interpolation=cv2.INTER_AREA)
+        self.frames.append((timestamp, thumb))
+        self._next_t = timestamp + self.interval_sec
+
+    @property
+    def next_time(self) -> float:
+        return self._next_t
+
+    def write(self, out_dir: str, end_time: Optional[float] = None, partial: bool = False) -> Dict[str, Any]:
+        """
+        썸네일 / sprite.jpg / sprite.vtt 저장 후 파일 목록 반환 (out_dir 기준 상대 경로)
+        - partial: 영상 끝까지 채우지 못함 → VTT 는 마지막 썸네일 구간에서 끝남 (manifest 에 표시)
+        """
+        if not self.frames:
+            return {}
+        import cv2
+
+        os.makedirs(out_dir, exist_ok=True)
+        params = [int(cv2.IMWRITE_JPEG_QUALITY), JPEG_QUALITY]
+
+        thumbnails = []
+        for i, (t, thumb) in enumerate(self.frames):
+            name = f"thumb_{i:04d}.jpg"
+            cv2.imwrite(os.path.join(out_dir, name), thumb, params)
+            thumbnails.append({"time": round(t, 3), "file": name})
+
+        w, h = self.width, self.height
+        cols = min(SPRITE_COLUMNS, len(self.frames))
+        rows = math.ceil(len(self.frames) / cols)
+        sprite = np.zeros((rows * h, cols * w, 3), dtype=np.uint8)
+        cues = ["WEBVTT", ""]
+        for i, (t, thumb) in enumerate(self.frames):
+            r, c = divmod(i, cols)
+            sprite[r * h:(r + 1) * h, c * w:(c + 1) * w] = thumb
+            if i + 1 < len(self.frames):
+                t_end = self.frames[i + 1][0]
+            else:
+                t_end = t + self.interval_sec if partial else max(end_time or 0.0, t + self.interval_sec)
+            cues.append(f"{_vtt_time(t)} --> {_vtt_time(t_end)}")
+            cues.append(f"{SPRITE_NAME}#xywh={c * w},{r * h},{w},{h}")
+            cues.append("")
+        cv2.imwrite(os.path.join(out_dir, SPRITE_NAME), sprite, params)
+        with open(os.path.join(out_dir, VTT_NAME), "w", encoding="utf-8") as f:
+            f.write("\n".join(cues))
+
+        return {
+            "thumbnails": thumbnails,
+            "sprite": SPRITE_NAME,
+            "vtt": VTT_NAME,
+            "tile_width": w,
+            "tile_height": h,
+            "columns": cols,
+            "end_time": round(t_end, 3),
+            "partial": partial,
+        }
+
+
+# ----------------------------------------
+# 분석 샘플링이 영상 끝 전에 멈춘 경우 → 나머지 구간을 시간 탐색으로 채움
+# ----------------------------------------
+def fill_previews(cap, previews: PreviewCollector, duration: float) -> Tuple[float, bool]:
+    """
+    cap: 분석 루프에서 쓰던 cv2.VideoCapture (remux 된 업로드는 탐색 가능)
+    duration: 영상 길이(초), 모르면 0 → 읽기 실패할 때까지
+    반환: (마지막 썸네일 시각, 끝까지 채웠는지)
+    """
+    import cv2
+
+    t = previews.next_time
+    step = previews.interval_sec
+    if duration > 0:
+        step = max(step, (duration - t) / max(1, MAX_THUMBNAILS - len(previews.frames)))
+    last_t = previews.frames[-1][0] if previews.frames else 0.0
+    while duration <= 0 or t < duration:
+        if len(previews.frames) >= MAX_THUMBNAILS:
+            return last_t, False
+        if not cap.set(cv2.CAP_PROP_POS_MSEC, t * 1000.0):
+            return last_t, False
+        ok, frame = cap.read()
+        if not ok:
+            # 길이를 모를 때는 읽기 실패 = 영상 끝
+            return last_t, duration <= 0
+        previews.add(t, frame)
+        last_t = t
+        t += step
+    return last_t, True
+
+
+def with_url_prefix(manifest: Dict[str, Any], base_url: str) -> Dict[str, Any]:
+    """write() 결과의 파일명을 정적 서빙 URL 로 변환"""
+    if not manifest:
+        return {}
+    base = base_url.rstrip("/")
+    return {
+        **manifest,
+        "thumbnails": [{**t, "file": f"{base}/{t['file']}"} for t in manifest["thumbnails"]],
+        "sprite": f"{base}/{manifest['sprite']}",
+        "vtt": f"{base}/{manifest['vtt']}",
+    }
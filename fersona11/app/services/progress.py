@@ -0,0 +1,170 @@
+import re
+import uuid
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+from app.models import AnalysisJob
+
+# ----------------------------------------
+# 단계별 부분 결과 (analysis_jobs 진행 문서)
+# - 파이프라인이 단계가 끝날 때마다 patch(최종 결과 dict 에 덮어쓸 부분)를 기록
+#     vision     → {"report": 시선/표정 점수·피드백}
+#     transcript → {"whisper": 전사문 / 발화 속도 / 발화 점수}
+#     pitch      → {"whisper": F0 통계 / 억양 점수}
+#     feedback   → {"whisper": {"feedback": 구간 피드백}}
+# - 각 단계에 seq(1, 2, ...) → SSE 이벤트 id (재연결 시 Last-Event-ID 이후만 전송)
+# - 기록 실패는 로그만 남기고 분석은 계속 (진행 표시는 부가 기능)
+# ----------------------------------------
+JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+FINAL_STATUSES = ("done", "error")
+
+
+class JobIdInUse(Exception):
+    """클라이언트가 보낸 job_id 로 이미 진행 문서가 있음 → 409"""
+
+
+def new_job_id(requested: Optional[str] = None) -> str:
+    """
+    클라이언트가 SSE 를 먼저 열 수 있도록 job_id 를 직접 정해 보낼 수 있음 (uuid4 hex 32자)
+    - 없으면 서버에서 생성, 형식이 틀리면 ValueError
+    """
+    if not requested:
+        return uuid.uuid4().hex
+    job_id = requested.strip().lower().replace("-", "")
+    if not JOB_ID_PATTERN.match(job_id):
+        raise ValueError("job_id 는 32자리 16진수(uuid4)여야 합니다.")
+    return job_id
+
+
+# =========================================
+# ✅ 쓰기 (파이프라인 쪽, 작업당 1개)
+# =========================================
+class ProgressPublisher:
+    """
+    job_id 가 None 이면 아무것도 기록하지 않음 (백필 등 진행 표시가 필요 없는 호출)
+    - 작업 1개에 쓰는 쪽은 이 객체 하나뿐 → 문서를 메모리에 두고 바뀔 때마다 행 전체 갱신
+    """
+
+    def __init__(self, job_id: Optional[str], session_factory: Callable[[], Session] = SessionLocal):
+        self.job_id = job_id
+        self.session_factory = session_factory
+        self.status = "queued"
+        self.version = 0
+        self.document: Dict[str, Any] = {"stages": {}}
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, job_id: str, user_id: Optional[str] = None) -> "ProgressPublisher":
+        publisher = cls(job_id)
+        db = publisher.session_factory()
+        try:
+            now = datetime.now()
+            db.add(AnalysisJob(
+                job_id=job_id, user_id=user_id, status="queued", version=0,
+                document=publisher.document, created_at=now, updated_at=now,
+            ))
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            raise JobIdInUse(job_id)
+        finally:
+            db.close()
+        return publisher
+
+    @property
+    def enabled(self) -> bool:
+        return self.job_id is not None
+
+    def _write(self, result_id: Optional[int] = None) -> None:
+        if not self.enabled:
+            return
+        self.version += 1
+        values = {
+            AnalysisJob.status: self.status,
+            AnalysisJob.version: self.version,
+            AnalysisJob.document: dict(self.document),
+            AnalysisJob.updated_at: datetime.now(),
+        }
+        if result_id is not None:
+            values[AnalysisJob.result_id] = result_id
+        db = self.session_factory()
+        try:
+            db.query(AnalysisJob).filter(AnalysisJob.job_id == self.job_id).update(
+                values, synchronize_session=False
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"[PROGRESS] 진행 문서 기록 실패 job_id={self.job_id}: {e}")
+        finally:
+            db.close()
+
+    def running(self) -> None:
+        with self._lock:
+            self.status = "running"
+            self._write()
+
+    def publish(self, stage: str, patch: Dict[str, Any]) -> None:
+        """단계 완료 → patch 기록 (같은 단계를 다시 보내면 덮어쓰고 seq 도 새로)"""
+        with self._lock:
+            self._seq += 1
+            self.document["stages"] = {**self.document["stages"], stage: {"seq": self._seq, "patch": patch}}
+            self._write()
+
+    def finish(self, result_id: Optional[int] = None) -> None:
+        with self._lock:
+            self.status = "done"
+            self.document["result_id"] = result_id
+            self._write(result_id=result_id)
+
+    def fail(self, error: str) -> None:
+        with self._lock:
+            if self.status in FINAL_STATUSES:
+                return
+            self.status = "error"
+            self.document["error"] = str(error)[:500]
+            self._write()
+
+
+# =========================================
+# ✅ 읽기 (SSE / 조회 엔드포인트)
+# =========================================
+def load_job(db: Session, job_id: str) -> Optional[Dict[str, Any]]:
+    row = db.query(AnalysisJob).filter(AnalysisJob.job_id == job_id).first()
+    if row is None:
+        return None
+    document = row.document or {}
+    return {
+        "job_id": row.job_id,
+        "status": row.status,
+        "version": row.version,
+        "result_id": row.result_id,
+        "error": document.get("error"),
+        "stages": document.get("stages") or {},
+    }
+
+
+# =========================================
+# ✅ 오래된 진행 문서 정리 (만료 스위퍼에서 호출)
+# =========================================
+def purge_old_jobs(db: Session, retention_hours: int, batch_size: int = 500) -> int:
+    cutoff = datetime.now() - timedelta(hours=retention_hours)
+    ids = [
+        row.job_id for row in (
+            db.query(AnalysisJob.job_id)
+            .filter(AnalysisJob.updated_at < cutoff)
+            .order_by(AnalysisJob.updated_at.asc())
+            .limit(batch_size)
+            .all()
+        )
+    ]
+    if not ids:
+        db.rollback()
+        return 0
+    db.query(AnalysisJob).filter(AnalysisJob.job_id.in_(ids)).delete(synchronize_session=False)
+    db.commit()
+    return len(ids)
@@ -0,0 +1,44 @@
+import os
+import subprocess
+
+# ----------------------------------------
+# 재생용 remux (재인코딩 없음)
+# ----------------------------------------
+def remux_for_playback(src_path: str) -> str:
+    """
+    MediaRecorder webm 은 Cues(탐색 인덱스)와 길이 정보가 없어
+    브라우저가 탐색할 때마다 처음부터 다시 받음
+    → 스트림 복사(-c copy)로 컨테이너만 다시 써서 인덱스를 앞쪽에 배치
+    - webm/mkv: Cues 를 파일 앞쪽에 기록 (-cues_to_front)
+    - mp4/mov: moov atom 을 앞으로 이동 (+faststart)
+    성공 시 원본 경로를 그대로 교체하고, 실패하면 원본 유지
+    """
+    root, ext = os.path.splitext(src_path)
+    ext = ext.lower()
+    if ext in (".webm", ".mkv"):
+        mux_args = ["-cues_to_front", "1"]
+    elif ext in (".mp4", ".mov", ".m4v"):
+        mux_args = ["-movflags", "+faststart"]
+    else:
+        return src_path
+
+    tmp_path = f"{root}.remux{ext}"
+    cmd = [
+        "ffmpeg", "-y", "-i", src_path,
+        "-map", "0", "-c", "copy",
+        *mux_args,
+        tmp_path,
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0 or not os.path.exists(tmp_path):
+            print(f"[REMUX] 실패 → 원본 유지: {result.stderr[-500:]}")
+            return src_path
+        os.replace(tmp_path, src_path)
+        print(f"[REMUX] 탐색 인덱스 기록 완료 → {src_path}")
+    except Exception as e:
+        print(f"[REMUX] 실패 → 원본 유지: {e}")
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return src_path
@@ -1,36 +1,11 @@
-import time
-import librosa
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
-from app.models import AnalysisResult, User
-
-
-# =========================================
-# ✅ numpy → JSON 변환 안전 처리 함수
-# =========================================
-def _to_plain_json(o: Any):
-    """numpy, datetime 등 직렬화 불가 객체를 파이썬 기본형으로 변환"""
-    try:
-        import numpy as np
-    except Exception:
-        np = None
-
-    if isinstance(o, dict):
-        return {str(k): _to_plain_json(v) for k, v in o.items()}
-    if isinstance(o, list):
-        return [_to_plain_json(v) for v in o]
-    if np is not None:
-        if isinstance(o, (np.integer,)):
-            return int(o)
-        if isinstance(o, (np.floating,)):
-            return float(o)
-        if isinstance(o, (np.ndarray,)):
-            return [_to_plain_json(v) for v in o.tolist()]
-    if isinstance(o, datetime):
-        return o.isoformat()
-    return o
+from app.models import AnalysisResult, AnalysisResultDetail, User, Video
+from app.services.user_identity import resolve_user_id
+from app.services.score_history import extract_scores, record_scores
+from app.services.result_codec import split_analysis, merge_analysis, encode_detail, decode_detail
+from app.services.storage import blob_store
 
 
 # =========================================
@@ -55,32 +30,29 @@ def analyze_and_insert_with_feedback(
     db: Session,
     analysis_result: Dict,
     user_id: int | str = None,
-    guest_token: str = None
+    guest_token: str = None,
+    scores: Optional[Dict[str, float]] = None,
+    video_id: Optional[int] = None,
+    report: Optional[Dict[str, Any]] = None,
+    video_file: Optional[str] = None,
+    audio_file: Optional[str] = None,
+    extra: Optional[Dict[str, Any]] = None,
 ) -> Dict:
     """
     시선/표정 분석 결과를 DB에 저장하고,
     - 시선: 중앙 응시율 + 깜빡임 분리
     - 각 항목별로 원인(cause) + 개선(correction) 메시지 생성
     + 프런트에서 바로 쓰는 *_score_value(소수 1자리) 포함
+    + 사용자별 점수 추이 집계(user_score_aggregates) 를 같은 트랜잭션에서 갱신
+      (scores 미지정 시 analysis_result 의 *_score_value 사용)
+    + report(시선/표정 결과) / extra(job_id 등) 도 같은 문서에 저장 → 결과 조회 / PDF 가 이 행만 읽음
     """
 
     # ------------------------------------------
     # 0️⃣ user_id 문자열이면 users.id로 변환 (없으면 자동 생성)
     # ------------------------------------------
     if isinstance(user_id, str):
-        user_obj = db.query(User).filter(User.username == user_id).first()
-        if user_obj is None:
-            try:
-                new_user = User(username=user_id)
-                db.add(new_user)
-                db.commit()
-                db.refresh(new_user)
-                user_obj = new_user
-                print(f"[REPORT] 새 사용자 생성: username={user_obj.username}, id={user_obj.id}")
-            except IntegrityError:
-                db.rollback()
-                user_obj = db.query(User).filter(User.username == user_id).first()
-        user_id = user_obj.id if user_obj else None
+        user_id = resolve_user_id(db, user_id)
 
     # ------------------------------------------
     # 1️⃣ 시선 분석: 중앙 응시율 + 깜빡임 분리
@@ -185,25 +157,34 @@ def analyze_and_insert_with_feedback(
     # ------------------------------------------
     # 3️⃣ DB 저장 데이터 구성 (NOT NULL 보호)
     # ------------------------------------------
-    video_path = analysis_result.get("video_path") or analysis_result.get("video_file") or "unknown_video.mp4"
-    audio_path = analysis_result.get("audio_path") or analysis_result.get("audio_file") or "unknown_audio.wav"
+    video_path = video_file or analysis_result.get("video_path") or analysis_result.get("video_file") or "unknown_video.mp4"
+    audio_path = audio_file or analysis_result.get("audio_path") or analysis_result.get("audio_file") or "unknown_audio.wav"
     duration_sec = analysis_result.get("duration_sec", analysis_result.get("duration", 0.0))
 
-    safe_result_data = _to_plain_json(analysis_result)
+    # 요약(점수/피드백)은 JSON 컬럼, segments 등 큰 값은 압축 상세 문서로 분리 저장
+    summary_data, detail_data = split_analysis(build_result_document(analysis_result, report, extra))
+    if scores is None:
+        scores = extract_scores(analysis_result)
+    summary_data["scores"] = scores   # 추이 재집계(rebuild_user_aggregates)용
 
     record_data = {
         "user_id": user_id,
+        "video_id": video_id,
         "video_file": video_path,
         "audio_file": audio_path,
         "transcript": analysis_result.get("transcript", ""),
         "duration_sec": float(duration_sec) if duration_sec else 0.0,
-        "result_data": safe_result_data,
+        "result_data": summary_data,
         "created_at": datetime.now(),
     }
 
     try:
         record = AnalysisResult(**record_data)
         db.add(record)
+        db.flush()
+        if detail_data:
+            db.add(AnalysisResultDetail(result_id=record.id, **encode_detail(detail_data)))
+        record_scores(db, user_id, scores, result_id=record.id)
         db.commit()
         db.refresh(record)
         print(f"[REPORT] DB 저장 완료 → id={record.id}, user_id={user_id}")
@@ -243,3 +224,90 @@ def analyze_and_insert_with_feedback(
 
     return {"record": record, "feedback": feedback}
 
+
+
+# =========================================
+# ✅ 저장 문서 구성 (Whisper 결과 최상위 + "report" 하위 dict)
+# - 최상위 wpm_total / f0_std_total 등은 점수 재계산(rescore_page)이 그대로 읽음
+# =========================================
+def build_result_document(
+    whisper_result: Dict[str, Any],
+    report: Optional[Dict[str, Any]] = None,
+    extra: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    document = dict(whisper_result)
+    if report is not None:
+        document["report"] = report
+    document.update(extra or {})
+    return document
+
+
+# =========================================
+# ✅ 저장된 분석 결과 조회 (요약 + 상세 병합)
+# =========================================
+def _merge_detail(db: Session, record: AnalysisResult) -> Dict[str, Any]:
+    data = dict(record.result_data or {})
+    detail = db.query(AnalysisResultDetail).filter(AnalysisResultDetail.result_id == record.id).first()
+    if detail is None:
+        # 분리 저장 이전 행은 result_data 에 전체가 들어 있음
+        return data
+    return merge_analysis(data, decode_detail(detail.codec, detail.payload, detail.schema_version))
+
+
+def load_analysis_result(db: Session, result_id: int, with_detail: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    analysis_result 1건의 result_data 반환
+    - with_detail=False 면 요약 행만 읽음 (목록/추이 화면용)
+    """
+    record = db.query(AnalysisResult).filter(AnalysisResult.id == result_id).first()
+    if record is None:
+        return None
+    if not with_detail:
+        return dict(record.result_data or {})
+    return _merge_detail(db, record)
+
+
+def load_result_payload(
+    db: Session,
+    result_id: Optional[int] = None,
+    username: Optional[str] = None,
+    with_detail: bool = True,
+) -> Optional[Dict[str, Any]]:
+    """
+    결과 조회 API / PDF 리포트용: 업로드 응답과 같은 모양
+    {id, user_id, video_file, audio_file, report, whisper, timestamp}
+    - result_id 로 1건, 또는 username 의 최근 결과 1건
+    - video_file 은 videos 행의 현재 키로 만듦 (보관 작업이 원본을 변환본으로 바꿔도 재생 가능)
+    """
+    query = (
+        db.query(AnalysisResult, User.username, Video.filename, Video.storage_tier)
+        .outerjoin(User, User.id == AnalysisResult.user_id)
+        .outerjoin(Video, Video.id == AnalysisResult.video_id)
+    )
+    if result_id is not None:
+        query = query.filter(AnalysisResult.id == result_id)
+    if username is not None:
+        query = query.filter(User.username == username).order_by(
+            AnalysisResult.created_at.desc(), AnalysisResult.id.desc()
+        )
+    row = query.first()
+    if row is None:
+        return None
+
+    record, name, video_key, video_tier = row
+    video_file = record.video_file
+    if video_key and video_tier != "evicted":
+        video_file = blob_store.url(video_key)
+    whisper = _merge_detail(db, record) if with_detail else dict(record.result_data or {})
+    report = whisper.pop("report", None) or {}
+    return {
+        "id": record.id,
+        "user_id": name,
+        "video_file": video_file,
+        "audio_file": record.audio_file,
+        "report": report,
+        "whisper": whisper,
+        "analysis_profile": whisper.get("analysis_profile"),
+        "job_id": whisper.pop("job_id", None),
+        "timestamp": record.created_at,
+    }
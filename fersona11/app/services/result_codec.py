@@ -0,0 +1,128 @@
+import json
+import zlib
+import threading
+from typing import Any, Dict, Tuple
+from app.utils.json_response import dumps
+
+# 선택 의존성: zstandard (없으면 zlib)
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ----------------------------------------
+# 상세 문서 스키마 버전 - 분리 기준/구조를 바꾸면 올리고 decode 에서 분기
+# ----------------------------------------
+DETAIL_SCHEMA_VERSION = 1
+
+DETAIL_KEYS = ("segments",)     # 항상 상세 문서로 보내는 키
+SUMMARY_LIST_MAX = 32           # 이보다 긴 리스트/배열(프레임별 시계열 등)은 상세 문서로
+ZSTD_LEVEL = 6
+ZLIB_LEVEL = 6
+
+# zstd 압축/해제 컨텍스트는 스레드 간 공유 불가 → 스레드마다 1쌍 (업로드 분석은 스레드풀에서 동시 실행)
+_zstd_local = threading.local()
+
+
+def _zstd_compressor():
+    if not hasattr(_zstd_local, "compressor"):
+        _zstd_local.compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+    return _zstd_local.compressor
+
+
+def _zstd_decompressor():
+    if not hasattr(_zstd_local, "decompressor"):
+        _zstd_local.decompressor = zstandard.ZstdDecompressor()
+    return _zstd_local.decompressor
+
+
+def _is_bulky(key: str, value: Any) -> bool:
+    if key in DETAIL_KEYS:
+        return True
+    if hasattr(value, "shape") and getattr(value, "size", 0) > SUMMARY_LIST_MAX:
+        return True
+    return isinstance(value, (list, tuple)) and len(value) > SUMMARY_LIST_MAX
+
+
+def to_plain(o: Any) -> Any:
+    """numpy/datetime 등을 포함한 값을 JSON 기본형으로 (C 직렬화 1회 왕복, 요소별 파이썬 순회 없음)"""
+    raw = dumps(o)
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+# =========================================
+# ✅ 요약 / 상세 분리
+# =========================================
+def split_analysis(result: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    분석 dict → (요약, 상세)
+    - 요약: 점수/피드백 등 작은 값 (result_data JSON 컬럼, 목록 조회용)
+    - 상세: segments 와 긴 리스트/배열 (최상위 + 1단계 하위 dict 까지 분리)
+    """
+    summary: Dict[str, Any] = {}
+    detail: Dict[str, Any] = {}
+    for key, value in result.items():
+        if _is_bulky(key, value):
+            detail[key] = value
+        elif isinstance(value, dict):
+            small = {k: v for k, v in value.items() if not _is_bulky(k, v)}
+            bulky = {k: v for k, v in value.items() if k not in small}
+            summary[key] = small
+            if bulky:
+                detail[key] = bulky
+        else:
+            summary[key] = value
+    return to_plain(summary), detail
+
+
+def merge_analysis(summary: Dict[str, Any], detail: Dict[str, Any]) -> Dict[str, Any]:
+    """split_analysis 의 역연산"""
+    merged = dict(summary or {})
+    for key, value in (detail or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = {**merged[key], **value}
+        else:
+            merged[key] = value
+    return merged
+
+
+# =========================================
+# ✅ 상세 문서 인코딩 / 디코딩
+# =========================================
+def encode_detail(detail: Dict[str, Any]) -> Dict[str, Any]:
+    """AnalysisResultDetail 컬럼 값(dict) 반환"""
+    raw = dumps({"v": DETAIL_SCHEMA_VERSION, "data": detail})
+    serializer = "orjson" if orjson is not None else "json"
+    if zstandard is not None:
+        payload, compression = _zstd_compressor().compress(raw), "zstd"
+    else:
+        payload, compression = zlib.compress(raw, ZLIB_LEVEL), "zlib"
+    return {
+        "schema_version": DETAIL_SCHEMA_VERSION,
+        "codec": f"{compression}+{serializer}",
+        "raw_size": len(raw),
+        "payload": payload,
+    }
+
+
+def decode_detail(codec: str, payload: bytes, schema_version: int) -> Dict[str, Any]:
+    compression = codec.split("+", 1)[0]
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd 로 저장된 상세 문서를 읽으려면 zstandard 설치가 필요합니다.")
+        raw = _zstd_decompressor().decompress(payload)
+    elif compression == "zlib":
+        raw = zlib.decompress(payload)
+    else:
+        raise ValueError(f"알 수 없는 codec: {codec}")
+
+    # orjson/json 모두 JSON 바이트이므로 어느 쪽으로든 읽을 수 있음
+    doc = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    if schema_version > DETAIL_SCHEMA_VERSION:
+        raise ValueError(f"지원하지 않는 상세 문서 버전: {schema_version}")
+    return doc.get("data", {})
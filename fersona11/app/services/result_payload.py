@@ -0,0 +1,37 @@
+from typing import Any, Dict, Iterable, Optional, Set
+
+# ----------------------------------------
+# 응답 경량화
+# - Whisper segments(토큰 id 배열, avg_logprob, compression_ratio ...)가 응답 대부분을 차지하지만
+#   화면에서는 쓰지 않음 → 기본 응답에서 제외하고 ?include= 로만 제공
+# ----------------------------------------
+RESULT_INCLUDE_OPTIONS = ("segments", "raw_segments")
+SEGMENT_FIELDS = ("id", "start", "end", "text", "seg_wpm", "f0_std", "speech_score", "pitch_score")
+
+
+def parse_include(include: Optional[str]) -> Set[str]:
+    """?include=segments,raw_segments → {"segments", "raw_segments"} (모르는 값은 무시)"""
+    if not include:
+        return set()
+    return {part.strip() for part in include.split(",") if part.strip() in RESULT_INCLUDE_OPTIONS}
+
+
+def _trim_segments(segments: Iterable[Dict[str, Any]]) -> list:
+    return [{k: seg.get(k) for k in SEGMENT_FIELDS if k in seg} for seg in segments or []]
+
+
+def slim_result(result: Dict[str, Any], include: Set[str] = frozenset()) -> Dict[str, Any]:
+    """
+    분석 결과 dict 에서 화면에 필요한 필드만 남긴 사본 반환 (원본은 수정하지 않음)
+    - include 에 segments      → 구간별 시작/끝/텍스트만
+    - include 에 raw_segments  → Whisper 원본 segments 그대로
+    """
+    slim = dict(result)
+    whisper = dict(result.get("whisper") or {})
+    segments = whisper.pop("segments", None)
+    if "raw_segments" in include:
+        whisper["segments"] = segments or []
+    elif "segments" in include:
+        whisper["segments"] = _trim_segments(segments)
+    slim["whisper"] = whisper
+    return slim
@@ -0,0 +1,301 @@
+import os
+import re
+import tempfile
+import threading
+import subprocess
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+from app import models
+from app.config import settings
+from app.services.storage import blob_store
+
+# ----------------------------------------
+# 스케줄러 상태 (프로세스당 1개)
+# ----------------------------------------
+_thread: Optional[threading.Thread] = None
+_stop_event = threading.Event()
+
+_DIGEST_RE = re.compile(r"[0-9a-f]{64}")
+ACCESS_TOUCH_INTERVAL = timedelta(hours=1)   # 마지막 접근 시각 갱신 최소 간격 (쓰기 부하 제한)
+
+
+# ----------------------------------------
+# 리뷰용 저용량 변환 (VP9 + Opus, 해상도 상한)
+# ----------------------------------------
+def transcode_compact(src_path: str, dst_path: str) -> bool:
+    """원본 webm 을 리뷰 화질로 재인코딩 (인코딩 성공 여부 반환)"""
+    max_h = settings.TRANSCODE_MAX_HEIGHT
+    # 분석/요청 처리보다 낮은 우선순위로 실행 (nice 명령 - 다중 스레드 프로세스에서 preexec_fn 은 안전하지 않음)
+    cmd = [
+        "nice", "-n", "10",
+        "ffmpeg", "-y", "-i", src_path,
+        "-map", "0:v:0?", "-map", "0:a:0?",
+        "-vf", f"scale=-2:'min({max_h},ih)'",
+        "-c:v", "libvpx-vp9", "-b:v", "0", "-crf", str(settings.TRANSCODE_CRF),
+        "-deadline", "good", "-cpu-used", "4", "-row-mt", "1",
+        "-c:a", "libopus", "-b:a", settings.TRANSCODE_AUDIO_BITRATE,
+        "-cues_to_front", "1",
+        dst_path,
+    ]
+    # ffmpeg 실행 자체가 안 되면 예외 → 호출부에서 원본 상태로 되돌려 다음 주기에 재시도
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0 or not os.path.exists(dst_path):
+        print(f"[RETENTION] 변환 실패: {result.stderr[-500:]}")
+        return False
+    return True
+
+
+def _set_tier(db: Session, digest: str, key: str, from_tier: str, **values) -> int:
+    values.setdefault("tier_changed_at", datetime.utcnow())
+    return (
+        db.query(models.Video)
+        .filter(
+            models.Video.content_hash == digest,
+            models.Video.filename == key,
+            models.Video.storage_tier == from_tier,
+        )
+        .update(values, synchronize_session=False)
+    )
+
+
+def _repoint_results(db: Session, digest: str, new_key: str) -> int:
+    """new_key 로 옮겨진 영상 행에 연결된 analysis_result.video_file 갱신 (커밋은 호출자)"""
+    video_ids = db.query(models.Video.id).filter(
+        models.Video.content_hash == digest,
+        models.Video.filename == new_key,
+    )
+    return (
+        db.query(models.AnalysisResult)
+        .filter(models.AnalysisResult.video_id.in_(video_ids.scalar_subquery()))
+        .update({"video_file": blob_store.url(new_key)}, synchronize_session=False)
+    )
+
+
+# ----------------------------------------
+# 1) 보관 기간이 지난 원본 → 저용량 변환본으로 교체
+# ----------------------------------------
+def transcode_due_originals(db: Session, batch_size: int) -> int:
+    """
+    created_at 이 RETENTION_ORIGINAL_HOURS 보다 오래된 회원 원본을 변환
+    - 같은 파일(content_hash + key)을 가리키는 행들을 한 번에 처리
+    - storage_tier 조건부 UPDATE 로 선점 → 여러 프로세스가 돌아도 중복 변환 없음
+    - 변환본이 원본보다 크면 원본을 그대로 유지
+    반환값: 처리한 파일 수
+    """
+    now = datetime.utcnow()
+
+    # 변환 중에 죽은 작업은 일정 시간 후 다시 대상에 포함
+    db.query(models.Video).filter(
+        models.Video.storage_tier == "transcoding",
+        models.Video.tier_changed_at < now - timedelta(seconds=settings.TRANSCODE_CLAIM_TIMEOUT_SEC),
+    ).update({"storage_tier": "original", "tier_changed_at": now}, synchronize_session=False)
+    db.commit()
+
+    due = (
+        db.query(models.Video.content_hash, models.Video.filename)
+        .filter(
+            models.Video.storage_tier == "original",
+            models.Video.created_at < now - timedelta(hours=settings.RETENTION_ORIGINAL_HOURS),
+            models.Video.content_hash.isnot(None),
+            models.Video.guest_token.is_(None),   # 비회원 영상은 만료 스윕에서 삭제
+        )
+        .distinct()
+        .limit(batch_size)
+        .all()
+    )
+
+    done = 0
+    for digest, key in due:
+        if not _set_tier(db, digest, key, "original", storage_tier="transcoding"):
+            db.rollback()
+            continue
+        db.commit()
+
+        fd, out_path = tempfile.mkstemp(dir=blob_store.staging_dir, suffix=".webm")
+        os.close(fd)
+        try:
+            with blob_store.open_local(key) as src_path:
+                ok = transcode_compact(src_path, out_path)
+                src_size = os.path.getsize(src_path) if ok else 0
+
+            if not ok:
+                _set_tier(db, digest, key, "transcoding", storage_tier="failed")
+                db.commit()
+                continue
+
+            new_size = os.path.getsize(out_path)
+            if new_size >= src_size:
+                # 이미 충분히 작은 원본 → 파일은 그대로 두고 단계만 표시
+                _set_tier(db, digest, key, "transcoding", storage_tier="compact")
+                db.commit()
+                done += 1
+                continue
+
+            new_key = blob_store.rendition_key(digest)
+            blob_store.backend.put_file(out_path, new_key, move=True)
+            _set_tier(
+                db, digest, key, "transcoding",
+                storage_tier="compact", filename=new_key, size_bytes=new_size,
+            )
+            # 결과 행에 저장된 재생 URL 도 같은 트랜잭션에서 변환본으로 교체
+            _repoint_results(db, digest, new_key)
+            db.commit()
+
+            # 그 사이 같은 내용이 새로 업로드돼 원본을 참조하는 행이 없을 때만 원본 삭제
+            if blob_store.ref_count(db, digest, key=key) == 0:
+                blob_store.delete(key)
+            db.rollback()
+            done += 1
+            print(f"[RETENTION] 변환 완료 {key} → {new_key} ({src_size} → {new_size} bytes)")
+        except Exception as e:
+            db.rollback()
+            _set_tier(db, digest, key, "transcoding", storage_tier="original")
+            db.commit()
+            print(f"[RETENTION] 변환 처리 실패 {key}: {e}")
+        finally:
+            if os.path.exists(out_path):
+                os.remove(out_path)
+    return done
+
+
+# ----------------------------------------
+# 2) 회원별 용량 쿼터 (오래 안 본 영상부터 파일 삭제)
+# ----------------------------------------
+def _used_bytes_query(db: Session):
+    return db.query(func.coalesce(func.sum(models.Video.size_bytes), 0)).filter(
+        models.Video.storage_tier != "evicted"
+    )
+
+
+def enforce_user_quota(db: Session, owner_id: int, keep_video_id: Optional[int] = None) -> int:
+    """
+    owner_id 의 영상 용량 합계가 USER_STORAGE_QUOTA_MB 를 넘으면
+    마지막 접근(없으면 업로드) 시각이 오래된 순으로 파일을 비움 (LRU)
+    - 행은 남기고 storage_tier='evicted' 로 표시 → 피드백/구간 기록은 보존
+    - keep_video_id (방금 올린 영상 등)는 제외
+    반환값: 비운 영상 수
+    """
+    quota = settings.USER_STORAGE_QUOTA_MB * 1024 * 1024
+    if quota <= 0:
+        return 0
+
+    used = int(_used_bytes_query(db).filter(models.Video.owner_id == owner_id).scalar() or 0)
+    if used <= quota:
+        return 0
+
+    lru_key = func.coalesce(models.Video.last_accessed_at, models.Video.created_at)
+    query = (
+        db.query(models.Video)
+        .filter(
+            models.Video.owner_id == owner_id,
+            models.Video.storage_tier.in_(("original", "compact", "failed")),
+        )
+        .order_by(lru_key.asc(), models.Video.id.asc())
+    )
+    if keep_video_id is not None:
+        query = query.filter(models.Video.id != keep_video_id)
+
+    evicted = 0
+    for video in query.limit(500).all():
+        if used <= quota:
+            break
+        size = int(video.size_bytes or 0)
+        video.storage_tier = "evicted"
+        video.tier_changed_at = datetime.utcnow()
+        db.flush()
+        try:
+            blob_store.release(db, video)
+        except OSError as e:
+            print(f"[QUOTA] 파일 삭제 실패 video_id={video.id}: {e}")
+        used -= size
+        evicted += 1
+    db.commit()
+
+    if evicted:
+        print(f"[QUOTA] user_id={owner_id} 영상 {evicted}개 파일 정리 (사용량 {used}/{quota} bytes)")
+    return evicted
+
+
+def enforce_quotas(db: Session, max_users: int) -> int:
+    """쿼터를 넘은 회원을 찾아 정리 (owner_id 인덱스로 그룹 집계)"""
+    quota = settings.USER_STORAGE_QUOTA_MB * 1024 * 1024
+    if quota <= 0:
+        return 0
+    over = (
+        db.query(models.Video.owner_id)
+        .filter(models.Video.owner_id.isnot(None), models.Video.storage_tier != "evicted")
+        .group_by(models.Video.owner_id)
+        .having(func.sum(models.Video.size_bytes) > quota)
+        .limit(max_users)
+        .all()
+    )
+    db.rollback()
+    return sum(enforce_user_quota(db, row.owner_id) for row in over)
+
+
+# ----------------------------------------
+# 재생 시 마지막 접근 시각 갱신 (LRU 기준)
+# ----------------------------------------
+def touch_video_access(db: Session, key: str) -> None:
+    """
+    blobs/.../<sha256>.<ext> 형태의 키면 content_hash 인덱스로 해당 행만 갱신
+    - ACCESS_TOUCH_INTERVAL 안에 이미 갱신된 행은 건드리지 않음
+    """
+    digest = os.path.splitext(os.path.basename(key))[0]
+    if not _DIGEST_RE.fullmatch(digest):
+        return
+    now = datetime.utcnow()
+    db.query(models.Video).filter(
+        models.Video.content_hash == digest,
+        models.Video.filename == key,
+        or_(
+            models.Video.last_accessed_at.is_(None),
+            models.Video.last_accessed_at < now - ACCESS_TOUCH_INTERVAL,
+        ),
+    ).update({"last_accessed_at": now}, synchronize_session=False)
+    db.commit()
+
+
+# ----------------------------------------
+# 주기 실행 스레드 시작/종료
+# ----------------------------------------
+def run_retention(session_factory: Callable[[], Session]) -> None:
+    for step in (
+        lambda db: transcode_due_originals(db, settings.RETENTION_TRANSCODE_BATCH),
+        lambda db: enforce_quotas(db, settings.QUOTA_SWEEP_USERS),
+    ):
+        db = session_factory()
+        try:
+            step(db)
+        except Exception as e:
+            db.rollback()
+            print(f"[RETENTION] 작업 실패: {e}")
+        finally:
+            db.close()
+
+
+def start_retention_worker(session_factory: Callable[[], Session]) -> None:
+    """
+    단일 백그라운드 스레드로 변환/쿼터 작업 주기 실행
+    - 대상은 DB 의 storage_tier / created_at 으로 판단하므로 재시작해도 유실 없음
+    """
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+
+    interval = settings.RETENTION_INTERVAL_SEC
+
+    def worker():
+        while not _stop_event.wait(interval):
+            run_retention(session_factory)
+
+    _stop_event.clear()
+    _thread = threading.Thread(target=worker, name="retention-worker", daemon=True)
+    _thread.start()
+    print(f"[RETENTION] 보관 작업 스레드 시작 (interval={interval}s)")
+
+
+def stop_retention_worker() -> None:
+    _stop_event.set()
@@ -0,0 +1,133 @@
+from datetime import datetime
+from typing import Dict, Optional
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models import AnalysisResult, UserScoreAggregate
+from app.config import settings
+
+# =========================================
+# ✅ 추이를 집계하는 지표 (프론트 카드와 동일)
+# =========================================
+TREND_METRICS = ("gaze", "expression", "speech", "pitch")
+
+
+def extract_scores(*sources: Dict) -> Dict[str, float]:
+    """분석 결과 dict 들에서 *_score_value 를 지표별 점수로 추출"""
+    scores: Dict[str, float] = {}
+    for source in sources:
+        for metric in TREND_METRICS:
+            value = (source or {}).get(f"{metric}_score_value")
+            if value is not None and metric not in scores:
+                scores[metric] = float(value)
+    return scores
+
+
+def _lock_aggregate(db: Session, user_id: int, metric: str) -> UserScoreAggregate:
+    """
+    (user_id, metric) 집계 행을 잠그고 반환 (없으면 생성)
+    - MySQL: 행을 먼저 만든 뒤(INSERT ... ON DUPLICATE KEY UPDATE) 잠금
+      없는 행에 SELECT ... FOR UPDATE 를 하면 갭 락끼리 INSERT 가 교착(1213)되므로 순서를 바꿈
+    """
+    query = db.query(UserScoreAggregate).filter(
+        UserScoreAggregate.user_id == user_id,
+        UserScoreAggregate.metric == metric,
+    ).with_for_update().populate_existing()     # 잠근 시점의 값으로 (세션에 남은 이전 값 무시)
+
+    if db.get_bind().dialect.name == "mysql":
+        table = UserScoreAggregate.__table__
+        stmt = mysql_insert(table).values(user_id=user_id, metric=metric, count=0, mean=0.0, recent=[])
+        db.execute(stmt.on_duplicate_key_update(id=table.c.id))
+        return query.one()
+
+    # MySQL 외 DB(로컬 SQLite 등)용 폴백
+    agg = query.first()
+    if agg is not None:
+        return agg
+
+    try:
+        with db.begin_nested():
+            agg = UserScoreAggregate(user_id=user_id, metric=metric, count=0, mean=0.0, recent=[])
+            db.add(agg)
+    except IntegrityError:
+        # 동시에 다른 요청이 먼저 생성한 경우 → 그 행을 잠금
+        agg = query.first()
+    return agg
+
+
+# =========================================
+# ✅ 결과 1건 반영 (증분 갱신, 커밋은 호출자)
+# =========================================
+def record_scores(
+    db: Session,
+    user_id: Optional[int],
+    scores: Dict[str, float],
+    result_id: Optional[int] = None,
+) -> None:
+    """
+    지표별 count / 이동 평균 / 최고점 / 최근 N개를 O(1)로 갱신
+    - 호출자의 트랜잭션 안에서 실행 (분석 결과 저장과 함께 커밋)
+    """
+    if user_id is None or not scores:
+        return
+
+    window = settings.SCORE_HISTORY_WINDOW
+    now = datetime.now()
+
+    for metric in TREND_METRICS:
+        if metric not in scores:
+            continue
+        score = float(scores[metric])
+        agg = _lock_aggregate(db, user_id, metric)
+
+        agg.count = (agg.count or 0) + 1
+        agg.mean = (agg.mean or 0.0) + (score - (agg.mean or 0.0)) / agg.count
+        agg.best = score if agg.best is None else max(agg.best, score)
+        agg.last = score
+
+        point = {"result_id": result_id, "score": score, "at": now.isoformat()}
+        agg.recent = (list(agg.recent or []) + [point])[-window:]
+
+
+# =========================================
+# ✅ 사용자 추이 재집계 (재분석 백필 후)
+# =========================================
+def rebuild_user_aggregates(db: Session, user_id: int) -> int:
+    """
+    결과 행 전체로 지표별 집계를 처음부터 다시 계산 (커밋은 호출자)
+    - result_data["scores"] 가 없는 이전 행은 저장된 *_score_value (Whisper 키 + "report") 에서 추출
+    - 점수를 바꾸는 재분석 뒤에는 증분 평균을 고칠 수 없으므로 전체 재계산
+    - 반환: 반영한 결과 행 수
+    """
+    rows = (
+        db.query(AnalysisResult.id, AnalysisResult.created_at, AnalysisResult.result_data)
+        .filter(AnalysisResult.user_id == user_id)
+        .order_by(AnalysisResult.created_at, AnalysisResult.id)
+        .all()
+    )
+    window = settings.SCORE_HISTORY_WINDOW
+    points: Dict[str, list] = {metric: [] for metric in TREND_METRICS}
+    used = 0
+    for row in rows:
+        data = row.result_data if isinstance(row.result_data, dict) else {}
+        scores = data.get("scores") or extract_scores(data, data.get("report") or {})
+        if not scores:
+            continue
+        used += 1
+        for metric in TREND_METRICS:
+            if scores.get(metric) is not None:
+                points[metric].append({
+                    "result_id": row.id,
+                    "score": float(scores[metric]),
+                    "at": row.created_at.isoformat() if row.created_at else None,
+                })
+
+    for metric, series in points.items():
+        agg = _lock_aggregate(db, user_id, metric)
+        values = [p["score"] for p in series]
+        agg.count = len(values)
+        agg.mean = sum(values) / len(values) if values else 0.0
+        agg.best = max(values) if values else None
+        agg.last = values[-1] if values else None
+        agg.recent = series[-window:]
+    return used
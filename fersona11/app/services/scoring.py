@@ -0,0 +1,106 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Sequence, Tuple, Union
+
+# ----------------------------------------
+# 발화속도 / 억양 점수 곡선 (단일 정의)
+# - 구간별 1차식 표 → NumPy 배열 한 번에 계산 (구간/세그먼트/과거 결과 일괄 재계산 공통)
+# - 곡선을 바꾸면 SCORING_VERSION 을 올림 → 저장된 점수가 어느 곡선인지 result_data["scoring_version"] 으로 추적
+# ----------------------------------------
+SCORING_VERSION = 1
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+
+@dataclass(frozen=True)
+class PiecewiseCurve:
+    """
+    segments: (상한, 상한 포함 여부, 기준 x, 기준 y, 기울기) 를 x 오름차순으로
+      - x 가 (이전 상한, 상한] (또는 [이전 상한, 상한)) 에 있으면 y = 기준 y + 기울기 * (x - 기준 x)
+      - 마지막 상한은 inf
+    """
+
+    name: str
+    segments: Tuple[Tuple[float, bool, float, float, float], ...]
+
+    def __post_init__(self):
+        table = np.array([(hi, inc, x0, y0, k) for hi, inc, x0, y0, k in self.segments], dtype=float)
+        object.__setattr__(self, "_upper", table[:-1, 0])
+        object.__setattr__(self, "_inclusive", table[:-1, 1].astype(bool))
+        object.__setattr__(self, "_x0", table[:, 2])
+        object.__setattr__(self, "_y0", table[:, 3])
+        object.__setattr__(self, "_slope", table[:, 4])
+
+    def __call__(self, x: ArrayLike) -> np.ndarray:
+        x = np.asarray(x, dtype=float)
+        xe = x[..., None]
+        # 상한을 넘은 개수 = 구간 번호 (상한 포함이면 x == 상한 은 아래 구간)
+        passed = np.where(self._inclusive, xe > self._upper, xe >= self._upper)
+        idx = passed.sum(axis=-1)
+        y = self._y0[idx] + self._slope[idx] * (x - self._x0[idx])
+        return np.where(np.isnan(x), np.nan, y)
+
+
+INF = float("inf")
+
+# WPM → 점수 (60~100 최적, 80 에서 100점)
+SPEECH_CURVE = PiecewiseCurve("speech_wpm", (
+    (40.0, True, 0.0, 50.0, 0.75),
+    (60.0, True, 40.0, 80.0, 0.5),
+    (80.0, True, 60.0, 95.0, 0.25),
+    (100.0, True, 80.0, 100.0, -0.25),
+    (130.0, True, 100.0, 95.0, -0.5),
+    (180.0, True, 130.0, 80.0, -0.4),
+    (INF, True, 180.0, 60.0, 0.0),
+))
+
+# F0 표준편차(Hz) → 점수 (30~70 자연스러운 억양, 50 에서 95점)
+PITCH_CURVE = PiecewiseCurve("pitch_f0_std", (
+    (10.0, False, 0.0, 30.0, 0.0),
+    (30.0, False, 10.0, 50.0, 1.0),
+    (50.0, True, 30.0, 87.5, 0.375),
+    (70.0, True, 50.0, 95.0, -0.375),
+    (100.0, True, 70.0, 80.0, -0.6),
+    (INF, True, 100.0, 60.0, 0.0),
+))
+
+
+def _round1(values: np.ndarray) -> np.ndarray:
+    return np.round(values, 1)
+
+
+def speech_scores(wpm: ArrayLike) -> np.ndarray:
+    return _round1(SPEECH_CURVE(wpm))
+
+
+def pitch_scores(f0_std: ArrayLike) -> np.ndarray:
+    return _round1(PITCH_CURVE(f0_std))
+
+
+def speech_score(wpm: float) -> float:
+    return float(speech_scores(wpm))
+
+
+def pitch_score(f0_std: float) -> float:
+    return float(pitch_scores(f0_std))
+
+
+# =========================================
+# ✅ 세그먼트 단위 (배열 1회)
+# =========================================
+def score_segments(segments: Iterable[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """segments 의 seg_wpm / f0_std → (발화 점수 배열, 억양 점수 배열)"""
+    segments = list(segments)
+    wpm = np.fromiter((seg.get("seg_wpm", np.nan) for seg in segments), dtype=float, count=len(segments))
+    f0 = np.fromiter((seg.get("f0_std", np.nan) for seg in segments), dtype=float, count=len(segments))
+    return speech_scores(wpm), pitch_scores(f0)
+
+
+# =========================================
+# ✅ 저장된 결과 일괄 재계산
+# =========================================
+def rescore_summaries(summaries: Sequence[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """result_data 요약들의 wpm_total / f0_std_total → (발화 점수 배열, 억양 점수 배열)"""
+    wpm = np.array([s.get("wpm_total", np.nan) for s in summaries], dtype=float)
+    f0 = np.array([s.get("f0_std_total", np.nan) for s in summaries], dtype=float)
+    return speech_scores(wpm), pitch_scores(f0)
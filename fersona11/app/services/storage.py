@@ -0,0 +1,453 @@
+import os
+import re
+import abc
+import hmac
+import time
+import uuid
+import shutil
+import hashlib
+import tempfile
+import mimetypes
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app import models
+from app.config import settings
+
+# ----------------------------------------
+# 저장소 레이아웃
+# blobs/<h[0:2]>/<h[2:4]>/<sha256><ext>
+# → 2단계 x 256 샤드 = 65,536 디렉토리, 수백만 개여도 디렉토리당 수십 개
+# ----------------------------------------
+BLOB_PREFIX = "blobs"
+RENDITION_PREFIX = "renditions"  # 보관 기간이 지난 원본의 저용량 변환본
+INCOMING_PREFIX = "incoming"     # 브라우저 직접 업로드 대기 영역
+SHARD_LEVELS = 2
+SHARD_WIDTH = 2
+CHUNK_SIZE = 1024 * 1024
+UPLOAD_URL_PREFIX = "/fersona/api/uploads"
+DIRECT_UPLOAD_URL_PREFIX = "/fersona/api/storage"
+
+_EXT_RE = re.compile(r"\.[a-z0-9]{1,8}")
+
+
+@dataclass
+class StoredBlob:
+    key: str        # 저장소 기준 키 (videos.filename 에 저장)
+    digest: str     # 업로드 원본 바이트의 sha256 (videos.content_hash)
+    size: int
+    created: bool   # False 면 동일 내용이 이미 있어 추가 저장 없음
+
+
+def _safe_ext(filename: Optional[str]) -> str:
+    ext = os.path.splitext(filename or "")[1].lower()
+    return ext if _EXT_RE.fullmatch(ext) else ""
+
+
+def _content_type(key: str) -> str:
+    return mimetypes.guess_type(key)[0] or ("video/webm" if key.endswith(".webm") else "application/octet-stream")
+
+
+# =========================================
+# ✅ 저장소 백엔드 인터페이스
+# =========================================
+class StorageBackend(abc.ABC):
+    """키 기반 객체 저장소 (로컬 디스크 / S3 호환)"""
+
+    name = "base"
+
+    @abc.abstractmethod
+    def exists(self, key: str) -> bool:
+        ...
+
+    @abc.abstractmethod
+    def put_file(self, local_path: str, key: str, move: bool = False) -> None:
+        ...
+
+    @abc.abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abc.abstractmethod
+    def open_local(self, key: str):
+        """분석 등 로컬 파일 경로가 필요한 작업용 컨텍스트 매니저 (원격이면 임시 다운로드)"""
+
+    @abc.abstractmethod
+    def url(self, key: str) -> str:
+        ...
+
+    @abc.abstractmethod
+    def presign_upload(self, key: str, content_type: str, expires_sec: int, max_bytes: int) -> Dict[str, Any]:
+        """
+        브라우저가 서버를 거치지 않고 바로 올릴 수 있는 업로드 URL
+        → {"method", "url", "headers", "fields"} (max_bytes 를 넘는 본문은 저장소 / 수신 엔드포인트에서 거부)
+        """
+
+    @abc.abstractmethod
+    def delete_stale(self, prefix: str, max_age_sec: int) -> int:
+        """prefix 아래에서 max_age_sec 보다 오래된 객체 삭제 (완료되지 않은 직접 업로드 정리) → 삭제 수"""
+
+
+# ----------------------------------------
+# 로컬 디스크 (UPLOAD_DIR)
+# - incoming/ 은 공개 마운트 밖(private_root) → 올리는 중 / 버려진 파일이 정적 경로로 노출되지 않음
+# ----------------------------------------
+class LocalStorageBackend(StorageBackend):
+    name = "local"
+
+    def __init__(self, root: str, private_root: str, url_prefix: str = UPLOAD_URL_PREFIX):
+        self.root = root
+        self.private_root = private_root
+        self.url_prefix = url_prefix
+        os.makedirs(root, exist_ok=True)
+        os.makedirs(private_root, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        # 이전 방식으로 저장된 절대 경로도 그대로 동작
+        if key.startswith(INCOMING_PREFIX + "/"):
+            return os.path.join(self.private_root, key)
+        return os.path.join(self.root, key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def put_file(self, local_path: str, key: str, move: bool = False) -> None:
+        dest = self.path(key)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        if move:
+            # 임시 영역과 UPLOAD_DIR 이 다른 파일시스템이면 복사 후 삭제
+            shutil.move(local_path, dest)
+        else:
+            shutil.copyfile(local_path, dest)
+
+    def delete(self, key: str) -> None:
+        path = self.path(key)
+        if os.path.exists(path):
+            os.remove(path)
+
+    @contextmanager
+    def open_local(self, key: str) -> Iterator[str]:
+        yield self.path(key)
+
+    def url(self, key: str) -> str:
+        return f"{self.url_prefix}/{key}"
+
+    def delete_stale(self, prefix: str, max_age_sec: int) -> int:
+        return remove_stale_files(self.path(prefix.rstrip("/") + "/"), max_age_sec)
+
+    # 로컬 백엔드의 "직접 업로드"는 앱의 서명된 PUT 엔드포인트로 대신함
+    def _signature(self, key: str, expires: int) -> str:
+        msg = f"{key}:{expires}".encode()
+        return hmac.new(settings.SECRET_KEY.encode(), msg, hashlib.sha256).hexdigest()
+
+    def verify_upload_signature(self, key: str, expires: int, signature: str) -> bool:
+        if expires < time.time():
+            return False
+        return hmac.compare_digest(self._signature(key, expires), signature)
+
+    def presign_upload(self, key: str, content_type: str, expires_sec: int, max_bytes: int) -> Dict[str, Any]:
+        # 크기 제한은 PUT 수신 엔드포인트에서 DIRECT_UPLOAD_MAX_MB 로 검사
+        expires = int(time.time()) + expires_sec
+        signature = self._signature(key, expires)
+        return {
+            "method": "PUT",
+            "url": f"{DIRECT_UPLOAD_URL_PREFIX}/{key}?expires={expires}&signature={signature}",
+            "headers": {"Content-Type": content_type},
+        }
+
+
+# ----------------------------------------
+# S3 호환 (AWS S3 / 로컬 MinIO)
+# ----------------------------------------
+class S3StorageBackend(StorageBackend):
+    name = "s3"
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        public_url: Optional[str] = None,
+    ):
+        try:
+            import boto3
+            from botocore.config import Config
+            from botocore.exceptions import ClientError
+        except ImportError as e:
+            raise RuntimeError("STORAGE_BACKEND=s3 사용 시 boto3 설치가 필요합니다.") from e
+
+        self._client_error = ClientError
+        self.bucket = bucket
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url or None,
+            region_name=region or None,
+            aws_access_key_id=access_key_id or None,
+            aws_secret_access_key=secret_access_key or None,
+            config=Config(signature_version="s3v4", s3={"addressing_style": "path"}),
+        )
+        if public_url:
+            self.public_url = public_url.rstrip("/")
+        elif endpoint_url:
+            self.public_url = f"{endpoint_url.rstrip('/')}/{bucket}"
+        else:
+            self.public_url = f"https://{bucket}.s3.amazonaws.com"
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except self._client_error as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def put_file(self, local_path: str, key: str, move: bool = False) -> None:
+        self.client.upload_file(
+            local_path, self.bucket, key,
+            ExtraArgs={"ContentType": _content_type(key)},
+        )
+        if move:
+            os.remove(local_path)
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    @contextmanager
+    def open_local(self, key: str) -> Iterator[str]:
+        fd, tmp_path = tempfile.mkstemp(suffix=_safe_ext(key))
+        os.close(fd)
+        try:
+            self.client.download_file(self.bucket, key, tmp_path)
+            yield tmp_path
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def url(self, key: str) -> str:
+        return f"{self.public_url}/{key}"
+
+    def presign_upload(self, key: str, content_type: str, expires_sec: int, max_bytes: int) -> Dict[str, Any]:
+        """
+        presigned PUT 은 본문 크기를 제한할 수 없음 → presigned POST 정책 (content-length-range)
+        브라우저는 fields 를 폼 필드로 먼저 넣고 마지막에 file 필드로 영상을 보냄
+        """
+        post = self.client.generate_presigned_post(
+            Bucket=self.bucket,
+            Key=key,
+            Fields={"Content-Type": content_type},
+            Conditions=[
+                {"Content-Type": content_type},
+                ["content-length-range", 1, max_bytes],
+            ],
+            ExpiresIn=expires_sec,
+        )
+        return {"method": "POST", "url": post["url"], "headers": {}, "fields": post["fields"]}
+
+    def delete_stale(self, prefix: str, max_age_sec: int) -> int:
+        cutoff = time.time() - max_age_sec
+        deleted = 0
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix.rstrip("/") + "/"):
+            stale = [
+                {"Key": obj["Key"]} for obj in page.get("Contents", [])
+                if obj["LastModified"].timestamp() < cutoff
+            ]
+            if stale:
+                self.client.delete_objects(Bucket=self.bucket, Delete={"Objects": stale, "Quiet": True})
+                deleted += len(stale)
+        return deleted
+
+
+def remove_stale_files(directory: str, max_age_sec: int) -> int:
+    """directory 아래에서 max_age_sec 동안 수정되지 않은 파일 / 빈 하위 디렉토리 삭제 → 삭제한 파일 수"""
+    if not os.path.isdir(directory):
+        return 0
+    cutoff = time.time() - max_age_sec
+    deleted = 0
+    for dirpath, dirnames, filenames in os.walk(directory, topdown=False):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    deleted += 1
+            except OSError:
+                pass
+        if dirpath != directory:
+            try:
+                if not os.listdir(dirpath) and os.path.getmtime(dirpath) < cutoff:
+                    os.rmdir(dirpath)
+            except OSError:
+                pass
+    return deleted
+
+
+def create_backend() -> StorageBackend:
+    if settings.STORAGE_BACKEND == "s3":
+        return S3StorageBackend(
+            bucket=settings.S3_BUCKET,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region=settings.S3_REGION,
+            access_key_id=settings.S3_ACCESS_KEY_ID,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+            public_url=settings.S3_PUBLIC_URL,
+        )
+    return LocalStorageBackend(settings.UPLOAD_DIR, settings.STORAGE_PRIVATE_DIR)
+
+
+# =========================================
+# ✅ 내용 주소 기반(content-addressed) 저장소
+# =========================================
+class BlobStore:
+    def __init__(self, backend: StorageBackend, staging_dir: str):
+        self.backend = backend
+        self.staging_dir = staging_dir
+        os.makedirs(staging_dir, exist_ok=True)
+
+    def key_for(self, digest: str, ext: str = "", prefix: str = BLOB_PREFIX) -> str:
+        shards = [digest[i * SHARD_WIDTH:(i + 1) * SHARD_WIDTH] for i in range(SHARD_LEVELS)]
+        return "/".join([prefix, *shards, f"{digest}{ext}"])
+
+    def rendition_key(self, digest: str, ext: str = ".webm") -> str:
+        return self.key_for(digest, ext, prefix=RENDITION_PREFIX)
+
+    def url(self, key: str) -> str:
+        return self.backend.url(key)
+
+    def new_incoming_key(self, filename: Optional[str] = None) -> str:
+        """직접 업로드용 임시 키 (incoming/<uuid><ext>)"""
+        return f"{INCOMING_PREFIX}/{uuid.uuid4().hex}{_safe_ext(filename)}"
+
+    def open_local(self, key: str):
+        return self.backend.open_local(key)
+
+    def delete(self, key: str) -> None:
+        self.backend.delete(key)
+
+    def put_stream(
+        self,
+        src: BinaryIO,
+        filename: Optional[str] = None,
+        prepare: Optional[Callable[[str], object]] = None,
+        claim: Optional[Callable[[StoredBlob], object]] = None,
+    ) -> StoredBlob:
+        """
+        스트림을 임시 파일로 복사하면서 sha256 계산 → blobs/ 샤드 키로 저장
+        - 같은 내용이 이미 있으면 임시 파일만 지우고 기존 blob 재사용 (추가 용량 0)
+        - prepare: 새 blob 일 때만 저장 전 임시 파일에 적용 (예: remux)
+        - claim: 키가 정해지면 바로 호출 (videos 행 등록 = 참조 카운트)
+          기존 blob 재사용 시 등록 전에 다른 행 정리로 파일이 지워졌으면 받은 내용으로 다시 저장
+        """
+        ext = _safe_ext(filename)
+        fd, tmp_path = tempfile.mkstemp(dir=self.staging_dir, suffix=ext)
+        try:
+            hasher = hashlib.sha256()
+            size = 0
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    chunk = src.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    hasher.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+
+            digest = hasher.hexdigest()
+            key = self.key_for(digest, ext)
+            claimed = False
+            if self.backend.exists(key):
+                blob = StoredBlob(key=key, digest=digest, size=size, created=False)
+                if claim is None:
+                    return blob
+                claim(blob)
+                claimed = True
+                if self.backend.exists(key):
+                    return blob
+                print(f"[STORAGE] 참조 등록 중 blob 이 정리됨 → 다시 저장 {key}")
+
+            if prepare is not None:
+                prepare(tmp_path)
+            self.backend.put_file(tmp_path, key, move=True)
+            blob = StoredBlob(key=key, digest=digest, size=size, created=True)
+            if claim is not None and not claimed:
+                claim(blob)
+            return blob
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def adopt_incoming(
+        self,
+        incoming_key: str,
+        filename: Optional[str] = None,
+        prepare: Optional[Callable[[str], object]] = None,
+        claim: Optional[Callable[[StoredBlob], object]] = None,
+    ) -> StoredBlob:
+        """직접 업로드된 incoming/ 객체를 내용 주소 blob 으로 편입하고 원본 키 삭제"""
+        with self.backend.open_local(incoming_key) as local_path:
+            with open(local_path, "rb") as f:
+                blob = self.put_stream(f, filename or incoming_key, prepare=prepare, claim=claim)
+        self.backend.delete(incoming_key)
+        return blob
+
+    def sweep_stale(self, max_age_sec: int) -> int:
+        """
+        완료되지 않은 직접 업로드(incoming/) + 프로세스가 죽어 남은 임시 파일(staging) 정리
+        - 만료 스위퍼에서 주기 호출, 반환: 삭제 수
+        """
+        return self.backend.delete_stale(INCOMING_PREFIX, max_age_sec) + remove_stale_files(
+            self.staging_dir, max_age_sec
+        )
+
+    def publish_dir(self, local_dir: str, prefix: str) -> None:
+        """로컬에서 만든 파일들(미리보기 등)을 prefix/ 아래로 이동 저장"""
+        for name in os.listdir(local_dir):
+            path = os.path.join(local_dir, name)
+            if os.path.isfile(path):
+                self.backend.put_file(path, f"{prefix}/{name}", move=True)
+
+    # ------------------------------------
+    # 참조 카운트 = 같은 content_hash + 같은 키를 가리키는 videos 행 수 (인덱스 조회)
+    # - 원본(blobs/)과 변환본(renditions/)이 잠시 공존할 수 있어 키까지 비교
+    # - 쿼터로 파일을 비운(evicted) 행은 제외
+    # ------------------------------------
+    def ref_count(
+        self,
+        db: Session,
+        digest: str,
+        exclude_video_ids: Iterable[int] = (),
+        key: Optional[str] = None,
+    ) -> int:
+        query = db.query(func.count(models.Video.id)).filter(
+            models.Video.content_hash == digest,
+            models.Video.storage_tier != "evicted",
+        )
+        if key is not None:
+            query = query.filter(models.Video.filename == key)
+        exclude = list(exclude_video_ids)
+        if exclude:
+            query = query.filter(~models.Video.id.in_(exclude))
+        return int(query.scalar() or 0)
+
+    def release(self, db: Session, video: models.Video, exclude_video_ids: Iterable[int] = ()) -> bool:
+        """
+        영상 행 삭제 시 호출: 해당 파일을 참조하는 다른 행이 없으면 파일 삭제
+        - content_hash 가 없는 이전 방식 행은 파일을 바로 삭제
+        반환값: 파일 삭제 여부
+        """
+        if not video.filename:
+            return False
+        if video.content_hash and self.ref_count(
+            db, video.content_hash, exclude_video_ids, key=video.filename
+        ) > 0:
+            return False
+        self.backend.delete(video.filename)
+        return True
+
+
+blob_store = BlobStore(create_backend(), os.path.join(settings.STORAGE_PRIVATE_DIR, ".tmp"))
@@ -0,0 +1,70 @@
+import threading
+from collections import OrderedDict
+from typing import Optional
+from sqlalchemy import func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.orm import Session
+from app.models import User
+
+# =========================================
+# ✅ username → users.id 캐시 설정
+# =========================================
+USER_ID_CACHE_SIZE = 10000
+
+_cache: "OrderedDict[str, int]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _cache_get(username: str) -> Optional[int]:
+    with _lock:
+        user_id = _cache.get(username)
+        if user_id is not None:
+            _cache.move_to_end(username)
+        return user_id
+
+
+def _cache_put(username: str, user_id: int) -> None:
+    with _lock:
+        _cache[username] = user_id
+        _cache.move_to_end(username)
+        while len(_cache) > USER_ID_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+# =========================================
+# ✅ username → users.id 변환 (없으면 생성)
+# =========================================
+def resolve_user_id(db: Session, username: str) -> int:
+    """
+    username 으로 users.id 조회 (없으면 생성)
+    - 캐시 적중 시 DB 왕복 없음
+    - 미스 시 INSERT ... ON DUPLICATE KEY UPDATE 한 번으로 조회+생성 (경합 안전)
+      id = LAST_INSERT_ID(id) 로 기존 행이어도 lastrowid 에 id 가 담김
+    - 호출자의 트랜잭션은 건드리지 않음 (커밋은 호출자)
+      MySQL: 별도 커넥션에서 바로 커밋 → 호출자가 롤백해도 캐시된 id 는 유효
+      그 외: 호출자 세션에서 flush 만, 새로 만든 행은 커밋 전이라 캐시하지 않음
+    - users 행은 삭제/이름 변경 경로가 없으므로 캐시 무효화는 하지 않음
+    """
+    cached = _cache_get(username)
+    if cached is not None:
+        return cached
+
+    users = User.__table__
+    bind = db.get_bind()
+    if bind.dialect.name == "mysql":
+        stmt = mysql_insert(users).values(username=username)
+        stmt = stmt.on_duplicate_key_update(id=func.LAST_INSERT_ID(users.c.id))
+        with bind.begin() as conn:
+            user_id = int(conn.execute(stmt).lastrowid)
+    else:
+        # MySQL 외 DB(로컬 SQLite 등)용 폴백: 조회 후 없으면 생성
+        user_obj = db.query(User).filter(User.username == username).first()
+        if user_obj is None:
+            user_obj = User(username=username)
+            db.add(user_obj)
+            db.flush()
+            return user_obj.id
+        user_id = user_obj.id
+
+    _cache_put(username, user_id)
+    return user_id
@@ -0,0 +1,86 @@
+import gzip
+from typing import List
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# brotli 는 선택 설치 (없으면 gzip 만 사용)
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript")
+STREAMING_TYPES = ("text/event-stream",)
+
+
+class JSONCompressionMiddleware:
+    """
+    JSON/텍스트 응답만 압축 (br 우선, 없으면 gzip)
+    - 영상/이미지/PDF, 206 부분 응답, 이미 인코딩된 응답, SSE 스트림, HEAD 요청은 그대로 통과
+      → Range 재생 / X-Accel-Redirect 응답에 영향 없음
+    - minimum_size 미만은 압축하지 않음
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope.get("method") == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        accept = Headers(scope=scope).get("accept-encoding", "")
+        if brotli is not None and "br" in accept:
+            encoding = "br"
+        elif "gzip" in accept:
+            encoding = "gzip"
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message = {}
+        chunks: List[bytes] = []
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                passthrough = (
+                    message["status"] in (204, 206, 304)
+                    or content_type.startswith(STREAMING_TYPES)
+                    or "content-encoding" in headers
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    start = message
+                return
+
+            if passthrough:
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            headers = MutableHeaders(raw=start["headers"])
+            if len(body) >= self.minimum_size:
+                if encoding == "br":
+                    body = brotli.compress(body, quality=self.brotli_quality)
+                else:
+                    body = gzip.compress(body, compresslevel=self.gzip_level)
+                headers["Content-Encoding"] = encoding
+                headers.append("Vary", "Accept-Encoding")
+            headers["Content-Length"] = str(len(body))
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,110 @@
+import os
+import re
+from email.utils import formatdate
+from typing import Optional, Tuple
+import anyio
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+CHUNK_SIZE = 256 * 1024
+_RANGE_RE = re.compile(r"bytes=(\d*)-(\d*)$")
+
+
+def _file_etag(st: os.stat_result) -> str:
+    return f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    단일 바이트 범위 파싱 → (start, end) (end 포함)
+    - 형식이 다르거나 다중 범위면 None (전체 전송)
+    - 만족할 수 없는 범위면 ValueError (416)
+    """
+    m = _RANGE_RE.match(header.strip())
+    if not m:
+        return None
+    start_s, end_s = m.groups()
+    if not start_s and not end_s:
+        return None
+
+    if not start_s:
+        # bytes=-N : 마지막 N 바이트
+        length = int(end_s)
+        if length == 0:
+            raise ValueError("empty suffix range")
+        return max(0, size - length), size - 1
+
+    start = int(start_s)
+    end = min(int(end_s), size - 1) if end_s else size - 1
+    if start >= size or start > end:
+        raise ValueError("range not satisfiable")
+    return start, end
+
+
+async def _iter_file_range(path: str, start: int, length: int):
+    async with await anyio.open_file(path, "rb") as f:
+        await f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = await f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+# =========================================
+# ✅ Range / ETag 지원 파일 응답
+# =========================================
+def ranged_file_response(
+    request: Request,
+    path: str,
+    media_type: str,
+    accel_redirect: Optional[str] = None,
+) -> Response:
+    """
+    영상 재생용 파일 응답
+    - ETag / If-None-Match → 304 (브라우저 캐시 재사용)
+    - Range: bytes=a-b → 206 부분 응답 (탐색 시 필요한 구간만 전송)
+    - accel_redirect 지정 시 X-Accel-Redirect 로 nginx 에 sendfile 전송 위임
+    - 범위 없는 전체 요청은 FileResponse (서버가 지원하면 zero-copy 전송)
+    """
+    st = os.stat(path)
+    etag = _file_etag(st)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Last-Modified": formatdate(st.st_mtime, usegmt=True),
+        "Cache-Control": "public, max-age=86400",
+    }
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    if accel_redirect:
+        headers["X-Accel-Redirect"] = accel_redirect
+        return Response(media_type=media_type, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range == etag):
+        try:
+            byte_range = _parse_range(range_header, st.st_size)
+        except ValueError:
+            return Response(
+                status_code=416,
+                headers={**headers, "Content-Range": f"bytes */{st.st_size}"},
+            )
+        if byte_range is not None:
+            start, end = byte_range
+            length = end - start + 1
+            headers["Content-Range"] = f"bytes {start}-{end}/{st.st_size}"
+            headers["Content-Length"] = str(length)
+            return StreamingResponse(
+                _iter_file_range(path, start, length),
+                status_code=206,
+                media_type=media_type,
+                headers=headers,
+            )
+
+    return FileResponse(path, media_type=media_type, headers=headers)
@@ -0,0 +1,73 @@
+import json
+import math
+from datetime import date, datetime
+from typing import Any
+from fastapi.responses import JSONResponse
+
+# orjson 이 있으면 사용 (numpy 배열/스칼라를 변환 없이 바로 직렬화)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _default(o: Any):
+    """기본 직렬화가 못 다루는 타입 처리 (orjson/json 공통)"""
+    if np is not None:
+        if isinstance(o, np.ndarray):
+            return o.tolist()
+        if isinstance(o, np.generic):
+            return o.item()
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    if isinstance(o, (set, tuple)):
+        return list(o)
+    if isinstance(o, bytes):
+        return o.decode("utf-8", errors="replace")
+    raise TypeError(f"JSON 직렬화 불가 타입: {type(o).__name__}")
+
+
+if orjson is not None:
+    _ORJSON_OPTS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTS)
+else:
+    def _finite(o: Any) -> Any:
+        """NaN/Inf → None (orjson 과 같은 결과), 컨테이너는 재귀"""
+        if isinstance(o, float):
+            return o if math.isfinite(o) else None
+        if isinstance(o, dict):
+            return {k: _finite(v) for k, v in o.items()}
+        if isinstance(o, (list, tuple, set)):
+            return [_finite(v) for v in o]
+        if np is not None and isinstance(o, (np.ndarray, np.generic)):
+            return _finite(o.tolist())
+        return o
+
+    def _json(content: Any) -> bytes:
+        return json.dumps(
+            content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+
+    def dumps(content: Any) -> bytes:
+        # 대부분은 NaN 이 없으므로 그대로 시도하고, 실패할 때만 한 번 정리 후 재시도
+        try:
+            return _json(content)
+        except ValueError:
+            return _json(_finite(content))
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    분석 결과처럼 큰 dict 를 jsonable_encoder 없이 바로 직렬화
+    - 엔드포인트에서 FastJSONResponse(content) 로 직접 반환해야 효과가 있음
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
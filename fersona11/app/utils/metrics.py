@@ -0,0 +1,215 @@
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from app.utils.tracing import span
+
+# ----------------------------------------
+# Prometheus 텍스트 형식(0.0.4) 경량 레지스트리
+# - 외부 패키지 없이 카운터 / 게이지 / 히스토그램만 지원
+# - 프로세스 단위 값 (워커가 여러 개면 워커별로 수집)
+# ----------------------------------------
+LabelKey = Tuple[str, ...]
+
+# 초 단위 구간 (ffmpeg 수백 ms ~ Whisper 수 분)
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _fmt_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_fmt_labels(self.labelnames, k)} {_fmt_value(v)}" for k, v in items
+        ]
+
+
+class Gauge(_Metric):
+    """set() 으로 값을 넣거나, callback 으로 수집 시점에 값을 읽음"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 callback: Optional[Callable[[], float]] = None):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+        self._callback = callback
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def render(self) -> List[str]:
+        if self._callback is not None:
+            return self.header() + [f"{self.name} {_fmt_value(self._callback())}"]
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_fmt_labels(self.labelnames, k)} {_fmt_value(v)}" for k, v in items
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label → [구간별 개수..., 합계, 전체 개수]
+        self._values: Dict[LabelKey, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            if idx < len(self.buckets):
+                row[idx] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        lines = self.header()
+        for key, row in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, row):
+                cumulative += count
+                labels = _fmt_labels(self.labelnames, key, ("le", _fmt_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {_fmt_value(cumulative)}")
+            labels = _fmt_labels(self.labelnames, key, ("le", "+Inf"))
+            lines.append(f"{self.name}_bucket{labels} {_fmt_value(row[-1])}")
+            lines.append(f"{self.name}_sum{_fmt_labels(self.labelnames, key)} {_fmt_value(row[-2])}")
+            lines.append(f"{self.name}_count{_fmt_labels(self.labelnames, key)} {_fmt_value(row[-1])}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            # 모듈 재로딩 시 같은 이름은 기존 객체 재사용
+            return self._metrics.setdefault(metric.name, metric)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def counter(name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, help_text, labelnames))
+
+
+def gauge(name: str, help_text: str, labelnames: Sequence[str] = (),
+          callback: Optional[Callable[[], float]] = None) -> Gauge:
+    return REGISTRY.register(Gauge(name, help_text, labelnames, callback))
+
+
+def histogram(name: str, help_text: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, help_text, labelnames, buckets))
+
+
+# =========================================
+# ✅ 파이프라인 공통 지표
+# =========================================
+STAGE_SECONDS = histogram(
+    "fersona_stage_duration_seconds", "Latency of each analysis pipeline stage", ("stage",)
+)
+STAGE_ERRORS = counter(
+    "fersona_stage_errors_total", "Exceptions raised inside a pipeline stage", ("stage",)
+)
+JOBS = counter("fersona_jobs_total", "Analysis jobs by outcome", ("outcome",))
+JOB_SECONDS = histogram("fersona_job_duration_seconds", "End-to-end analysis job latency")
+MEDIA_SECONDS = histogram(
+    "fersona_media_duration_seconds", "Duration of analysed recordings",
+    buckets=(5, 15, 30, 60, 120, 300, 600, 1200),
+)
+REALTIME_FACTOR = histogram(
+    "fersona_realtime_factor", "Processing time divided by media duration",
+    buckets=(0.1, 0.25, 0.5, 1, 1.5, 2, 3, 5, 10),
+)
+MODEL_LOAD_SECONDS = gauge(
+    "fersona_model_load_seconds", "Time taken to load each model in this process", ("model",)
+)
+
+
+@contextmanager
+def stage_timer(stage: str, **attrs: Any) -> Iterator[None]:
+    """
+    with stage_timer("whisper"): ... → 지연시간 히스토그램 + 예외 카운터
+    + 진행 중인 작업 트레이스가 있으면 같은 이름의 span 도 기록 (attrs 는 span 속성)
+    """
+    started = time.perf_counter()
+    try:
+        with span(stage, **attrs):
+            yield
+    except Exception:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage=stage)
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
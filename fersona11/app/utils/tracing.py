@@ -0,0 +1,163 @@
+import sys
+import time
+import uuid
+import random
+import threading
+import contextvars
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+# ----------------------------------------
+# 작업(job) 단위 트레이스
+# - 현재 작업의 트레이스/열린 span 은 contextvar 로 전달 (스레드풀에서는 use_trace 로 연결)
+# - 트레이스가 없으면 span() 은 아무것도 기록하지 않음
+# ----------------------------------------
+_current_trace: contextvars.ContextVar[Optional["JobTrace"]] = contextvars.ContextVar("job_trace", default=None)
+_current_span: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar("job_span", default=None)
+
+PROFILE_INTERVAL_SEC = 0.01     # 샘플링 간격
+PROFILE_TOP_STACKS = 40         # 결과에 남길 상위 스택 수
+PROFILE_MAX_DEPTH = 40
+
+
+class JobTrace:
+    def __init__(self, name: str, job_id: Optional[str] = None, **attrs: Any):
+        self.job_id = job_id or uuid.uuid4().hex
+        self.name = name
+        self.attrs: Dict[str, Any] = dict(attrs)
+        self.spans: List[Dict[str, Any]] = []
+        self.started_wall = time.time()
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self.profile: Optional[Dict[str, Any]] = None
+
+    def _offset_ms(self) -> float:
+        return round((time.perf_counter() - self._t0) * 1000.0, 2)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = sorted((dict(s) for s in self.spans), key=lambda s: s["start_ms"])
+        doc = {
+            "job_id": self.job_id,
+            "name": self.name,
+            "started_at": self.started_wall,
+            "duration_ms": self._offset_ms(),
+            "attrs": self.attrs,
+            "spans": spans,
+        }
+        if self.profile is not None:
+            doc["profile"] = self.profile
+        return doc
+
+
+def current_trace() -> Optional[JobTrace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def use_trace(trace: Optional[JobTrace]) -> Iterator[Optional[JobTrace]]:
+    """다른 스레드/작업에서 같은 트레이스에 span 을 이어서 기록"""
+    token = _current_trace.set(trace)
+    span_token = _current_span.set(None)
+    try:
+        yield trace
+    finally:
+        _current_span.reset(span_token)
+        _current_trace.reset(token)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Optional[Dict[str, Any]]]:
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    parent = _current_span.get()
+    record: Dict[str, Any] = {
+        "name": name,
+        "parent": parent["name"] if parent else None,
+        "start_ms": trace._offset_ms(),
+        "attrs": dict(attrs),
+    }
+    token = _current_span.set(record)
+    started = time.perf_counter()
+    try:
+        yield record
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"[:300]
+        raise
+    finally:
+        record["duration_ms"] = round((time.perf_counter() - started) * 1000.0, 2)
+        _current_span.reset(token)
+        with trace._lock:
+            trace.spans.append(record)
+
+
+def annotate(**attrs: Any) -> None:
+    """현재 열린 span (없으면 트레이스 자체)에 속성 추가"""
+    record = _current_span.get()
+    if record is not None:
+        record["attrs"].update(attrs)
+        return
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.attrs.update(attrs)
+
+
+# =========================================
+# ✅ 선택적 샘플링 프로파일러 (표준 라이브러리만 사용)
+# =========================================
+class StackSampler:
+    """
+    대상 스레드의 스택을 일정 간격으로 샘플링 → "a;b;c" 형태 collapsed stack 개수
+    (flamegraph.pl / speedscope 에 그대로 넣을 수 있는 형식)
+    """
+
+    def __init__(self, thread_id: int, interval: float = PROFILE_INTERVAL_SEC):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="job-profiler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and len(stack) < PROFILE_MAX_DEPTH:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.counts[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Dict[str, Any]:
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        return {
+            "interval_ms": self.interval * 1000.0,
+            "samples": self.samples,
+            "stacks": [{"stack": s, "count": c} for s, c in self.counts.most_common(PROFILE_TOP_STACKS)],
+        }
+
+
+@contextmanager
+def maybe_profile(trace: Optional[JobTrace], sample_rate: float) -> Iterator[None]:
+    """sample_rate 확률로 현재 스레드를 프로파일링해 trace.profile 에 저장"""
+    if trace is None or sample_rate <= 0 or random.random() >= sample_rate:
+        yield
+        return
+    sampler = StackSampler(threading.get_ident())
+    sampler.start()
+    try:
+        yield
+    finally:
+        trace.profile = sampler.stop()
@@ -0,0 +1,203 @@
+"""
+저장된 녹화본 일괄 재분석 (점수 기준 / 모델 변경 후)
+
+    python backfill.py                                   # 전체 (original, compact 보관 단계)
+    python backfill.py --since 2025-01-01 --user demo_user_123 --workers 4
+    python backfill.py --retry-failed                    # 체크포인트의 실패 건만 다시
+    python backfill.py --restart                         # 체크포인트 무시하고 처음부터
+    python backfill.py --rescore-only                    # 점수 곡선만 바뀐 경우: 저장된 지표로 점수만 재계산
+
+- 분석은 프로세스 풀(워커당 모델 1회 로드), DB 기록은 부모 프로세스에서 배치 트랜잭션
+- 배치 커밋마다 체크포인트 저장 → 중단/크래시 후 같은 명령으로 이어서 실행
+- 끝나면 영향받은 사용자의 점수 추이를 재집계 (--no-rebuild-trends 로 생략)
+"""
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+from typing import Any, Dict, List, Optional
+
+from app.database import SessionLocal
+from app.services.backfill import (
+    DEFAULT_TIERS, BackfillCheckpoint, count_targets, iter_target_pages,
+    init_worker, analyze_recording, write_batch, rescore_page,
+)
+from app.services.score_history import rebuild_user_aggregates
+
+
+def _fmt_eta(seconds: float) -> str:
+    seconds = int(max(0, seconds))
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m{seconds % 60:02d}s"
+
+
+class Progress:
+    """배치마다 처리 수 / 속도 / 실시간 배수 / ETA 출력"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.media_sec = 0.0
+        self.started = time.monotonic()
+
+    def update(self, results: List[Dict[str, Any]], failed: Dict[int, str]) -> None:
+        self.done += len(results)
+        self.failed += len(failed)
+        self.media_sec += sum(r.get("media_sec", 0.0) for r in results if r["ok"])
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        rate = self.done / elapsed
+        eta = (self.total - self.done) / rate if rate > 0 else 0
+        print(
+            f"[BACKFILL] {self.done}/{self.total} (실패 {self.failed}) "
+            f"{rate * 60:.1f}건/분, 영상 {self.media_sec / elapsed:.1f}x 실시간, ETA {_fmt_eta(eta)}",
+            flush=True,
+        )
+
+
+def _filters(args) -> Dict[str, Any]:
+    return {
+        "tiers": sorted(args.tiers.split(",")),
+        "user": args.user,
+        "since": args.since,
+        "until": args.until,
+        "ids": sorted(int(v) for v in args.ids.split(",")) if args.ids else None,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="저장된 녹화본 일괄 재분석")
+    parser.add_argument("--tiers", default=",".join(DEFAULT_TIERS), help="대상 storage_tier (쉼표 구분)")
+    parser.add_argument("--user", default=None, help="username 1명만")
+    parser.add_argument("--since", default=None, help="업로드 시각 하한 (YYYY-MM-DD)")
+    parser.add_argument("--until", default=None, help="업로드 시각 상한 (미포함)")
+    parser.add_argument("--ids", default=None, help="video id 목록 (쉼표 구분)")
+    parser.add_argument("--limit", type=int, default=0, help="이번 실행에서 처리할 최대 건수 (0 = 전부)")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--torch-threads", type=int, default=0, help="워커당 torch 스레드 (0 = 코어 수 / 워커 수)")
+    parser.add_argument("--batch-size", type=int, default=20, help="트랜잭션 1회당 결과 수")
+    parser.add_argument("--max-tasks-per-worker", type=int, default=200, help="워커 재시작 주기 (메모리 누수 대비)")
+    parser.add_argument("--checkpoint", default="backfill_checkpoint.json")
+    parser.add_argument("--restart", action="store_true", help="체크포인트 무시")
+    parser.add_argument("--retry-failed", action="store_true", help="체크포인트의 실패 건만 재처리")
+    parser.add_argument("--no-rebuild-trends", action="store_true", help="끝난 뒤 점수 추이 재집계 생략")
+    parser.add_argument("--rescore-only", action="store_true", help="미디어 재분석 없이 analysis_result 점수만 현재 곡선으로")
+    parser.add_argument("--force", action="store_true", help="--rescore-only 에서 현재 버전 행도 다시 계산")
+    args = parser.parse_args(argv)
+
+    if args.rescore_only:
+        return rescore_only(force=args.force, rebuild_trends=not args.no_rebuild_trends)
+
+    filters = _filters(args)
+    if args.restart and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+    checkpoint = BackfillCheckpoint.load(args.checkpoint, filters)
+
+    db = SessionLocal()
+    if args.retry_failed:
+        retry_ids = sorted(int(v) for v in checkpoint.failed)
+        if not retry_ids:
+            print("[BACKFILL] 다시 처리할 실패 건이 없습니다.")
+            return 0
+        run_filters, after_id = {**filters, "ids": retry_ids}, 0
+    else:
+        run_filters, after_id = filters, checkpoint.last_video_id
+
+    total = count_targets(db, run_filters, after_id)
+    if args.limit:
+        total = min(total, args.limit)
+    print(f"[BACKFILL] 대상 {total}건 (video id > {after_id}), 워커 {args.workers}개, 배치 {args.batch_size}")
+    if total == 0:
+        return 0
+
+    torch_threads = args.torch_threads or max(1, (os.cpu_count() or 1) // args.workers)
+    # torch / mediapipe 스레드가 있는 부모를 fork 하지 않도록 spawn
+    pool = multiprocessing.get_context("spawn").Pool(
+        args.workers,
+        initializer=init_worker,
+        initargs=(torch_threads,),
+        maxtasksperchild=args.max_tasks_per_worker,
+    )
+    progress = Progress(total)
+    interrupted = False
+    try:
+        remaining = total
+        for page in iter_target_pages(db, run_filters, after_id):
+            page = page[:remaining]
+            videos = {row[0]: row for row in page}
+            batch: List[Dict[str, Any]] = []
+            # imap 은 입력 순서대로 결과 반환 → 배치 마지막 id 가 곧 체크포인트 위치
+            for result in pool.imap(analyze_recording, [(row[0], row[1]) for row in page]):
+                batch.append(result)
+                if len(batch) >= args.batch_size:
+                    _commit(db, checkpoint, videos, batch, progress, args.retry_failed)
+                    batch = []
+            if batch:
+                _commit(db, checkpoint, videos, batch, progress, args.retry_failed)
+            remaining -= len(page)
+            if remaining <= 0:
+                break
+        pool.close()
+    except KeyboardInterrupt:
+        interrupted = True
+        print("\n[BACKFILL] 중단 요청 → 마지막 커밋 배치까지 체크포인트 저장됨, 같은 명령으로 이어서 실행")
+        pool.terminate()
+    finally:
+        pool.join()
+
+    # 이전 실행(중단 전)에 바뀐 사용자까지 포함해 재집계 (재집계는 여러 번 해도 결과 같음)
+    if checkpoint.users and not args.no_rebuild_trends:
+        print(f"[BACKFILL] 점수 추이 재집계: 사용자 {len(checkpoint.users)}명")
+        for user_id in sorted(checkpoint.users):
+            rebuild_user_aggregates(db, user_id)
+            db.commit()
+    db.close()
+
+    print(f"[BACKFILL] 완료 {progress.done}건, 실패 누적 {len(checkpoint.failed)}건 (체크포인트: {args.checkpoint})")
+    return 130 if interrupted else (1 if checkpoint.failed else 0)
+
+
+def rescore_only(force: bool, rebuild_trends: bool) -> int:
+    db = SessionLocal()
+    after_id, updated, users = 0, 0, set()
+    started = time.monotonic()
+    try:
+        while True:
+            after_id, count, page_users = rescore_page(db, after_id, force=force)
+            if after_id < 0:
+                break
+            updated += count
+            users.update(page_users)
+            print(f"[BACKFILL] 점수 재계산 id<={after_id}, 갱신 {updated}건 ({time.monotonic() - started:.1f}s)", flush=True)
+        if rebuild_trends:
+            for user_id in sorted(users):
+                rebuild_user_aggregates(db, user_id)
+                db.commit()
+    finally:
+        db.close()
+    print(f"[BACKFILL] 점수 재계산 완료 {updated}건, 추이 재집계 사용자 {len(users) if rebuild_trends else 0}명")
+    return 0
+
+
+def _commit(db, checkpoint, videos, batch, progress, retrying: bool) -> None:
+    failed = write_batch(db, videos, batch)
+    touched_users = set(checkpoint.users)
+    for r in batch:
+        key = str(r["video_id"])
+        if r["video_id"] in failed:
+            checkpoint.failed[key] = failed[r["video_id"]]
+        else:
+            checkpoint.failed.pop(key, None)
+            owner_id = videos[r["video_id"]][2]
+            if owner_id is not None:
+                touched_users.add(owner_id)
+    checkpoint.users = sorted(touched_users)
+    checkpoint.done += len(batch) - len(failed)
+    if not retrying:
+        checkpoint.last_video_id = max(checkpoint.last_video_id, batch[-1]["video_id"])
+    checkpoint.save()
+    progress.update(batch, failed)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
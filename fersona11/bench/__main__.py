@@ -0,0 +1,262 @@
+"""
+분석 파이프라인 오프라인 벤치마크
+
+    python -m bench                                  # 전체 단계, 결과 표 출력
+    python -m bench --stages speech_analysis,db_insert --durations 10,60 --repeat 5
+    python -m bench --save-baseline bench/baseline.json
+    python -m bench --baseline bench/baseline.json --fail-on-regression
+
+- 합성 픽스처(톤/잡음/말소리 흉내 오디오, 얼굴 그림/얼굴 없는 영상)를 seed 고정으로 생성
+- DB 는 작업 폴더의 SQLite 파일 사용 (MySQL / 네트워크 불필요)
+- 모델 로드 등 첫 호출 비용은 warmup 으로 분리 (first_ms 에 기록)
+"""
+import io
+import os
+import sys
+import json
+import shutil
+import argparse
+import platform
+import resource
+import statistics
+import tempfile
+import time
+import traceback
+from contextlib import redirect_stdout, nullcontext
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.fixtures import build_fixtures  # noqa: E402
+from bench.stages import STAGES, stage_names  # noqa: E402
+
+BENCH_SCHEMA_VERSION = 1
+MIN_SAMPLE_MS = 20.0        # 측정 1회가 이보다 짧으면 반복 호출해 평균
+MAX_INNER_LOOPS = 1000
+
+
+def peak_rss_mb() -> float:
+    # Linux: KB / macOS: bytes
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0, 1)
+
+
+def _parse_floats(value: str) -> List[float]:
+    return [float(v) for v in value.split(",") if v.strip()]
+
+
+# =========================================
+# ✅ SQLite 대체 DB
+# =========================================
+def sqlite_session_factory(workdir: str):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.database import Base
+    import app.models  # noqa: F401  (테이블 등록)
+
+    engine = create_engine(f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+# =========================================
+# ✅ 단계 1개 측정
+# =========================================
+def run_stage(name: str, fixtures, ctx: Dict[str, Any], repeat: int, warmup: int, verbose: bool) -> Dict[str, Any]:
+    group, setup = STAGES[name]
+    if not fixtures[group]:
+        return {"skipped": f"'{group}' 픽스처 없음 (ffmpeg / opencv 필요)"}
+
+    quiet = nullcontext() if verbose else redirect_stdout(io.StringIO())
+    try:
+        with quiet:
+            run = setup(ctx)
+    except Exception as e:
+        return {"skipped": f"{type(e).__name__}: {e}"}
+
+    rss_before = peak_rss_mb()
+    results: Dict[str, Any] = {}
+    for fx in fixtures[group]:
+        timings: List[float] = []
+        first_ms: Optional[float] = None
+        loops = 1
+        try:
+            for i in range(warmup + repeat):
+                quiet = nullcontext() if verbose else redirect_stdout(io.StringIO())
+                started = time.perf_counter()
+                with quiet:
+                    for _ in range(loops):
+                        run(fx)
+                elapsed_ms = (time.perf_counter() - started) * 1000.0 / loops
+                if i == 0:
+                    first_ms = elapsed_ms
+                    # ms 미만 단계는 여러 번 묶어 재야 타이머 해상도에 묻히지 않음
+                    loops = min(MAX_INNER_LOOPS, max(1, int(MIN_SAMPLE_MS / max(elapsed_ms, 1e-3))))
+                if i >= warmup:
+                    timings.append(elapsed_ms)
+        except Exception as e:
+            if verbose:
+                traceback.print_exc()
+            results[fx.name] = {"error": f"{type(e).__name__}: {e}"}
+            continue
+
+        median_ms = statistics.median(timings)
+        results[fx.name] = {
+            "media_sec": fx.duration_sec,
+            "median_ms": round(median_ms, 4),
+            "min_ms": round(min(timings), 4),
+            "max_ms": round(max(timings), 4),
+            "first_ms": round(first_ms, 4),
+            "runs": len(timings),
+            "loops": loops,
+            # 실시간 배수 (초당 처리한 미디어 초)
+            "realtime_x": round(fx.duration_sec / (median_ms / 1000.0), 2) if median_ms > 0 else None,
+        }
+
+    rss_after = peak_rss_mb()
+    return {"fixtures": results, "peak_rss_mb": rss_after, "peak_rss_growth_mb": round(rss_after - rss_before, 1)}
+
+
+# =========================================
+# ✅ 기준선 비교
+# =========================================
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """median_ms 비율로 단계/픽스처별 변화 판정 (tolerance=0.15 → ±15% 밖이면 regression/improvement)"""
+    rows = []
+    for stage, cur in current["stages"].items():
+        base = baseline.get("stages", {}).get(stage, {})
+        for fx_name, cur_fx in (cur.get("fixtures") or {}).items():
+            base_fx = (base.get("fixtures") or {}).get(fx_name)
+            if not base_fx or not base_fx.get("median_ms") or "median_ms" not in cur_fx:
+                continue
+            ratio = cur_fx["median_ms"] / base_fx["median_ms"]
+            if ratio > 1.0 + tolerance:
+                verdict = "regression"
+            elif ratio < 1.0 - tolerance:
+                verdict = "improvement"
+            else:
+                verdict = "same"
+            rows.append({
+                "stage": stage,
+                "fixture": fx_name,
+                "baseline_ms": base_fx["median_ms"],
+                "current_ms": cur_fx["median_ms"],
+                "ratio": round(ratio, 3),
+                "verdict": verdict,
+            })
+    return rows
+
+
+def print_report(report: Dict[str, Any], diff: Optional[List[Dict[str, Any]]]) -> None:
+    print(f"{'stage':<18} {'fixture':<22} {'median_ms':>10} {'min_ms':>10} {'first_ms':>10} {'x_realtime':>10}")
+    for stage, res in report["stages"].items():
+        if "skipped" in res:
+            print(f"{stage:<18} {'-':<22} skipped: {res['skipped']}")
+            continue
+        for fx_name, fx in res["fixtures"].items():
+            if "error" in fx:
+                print(f"{stage:<18} {fx_name:<22} error: {fx['error']}")
+                continue
+            print(
+                f"{stage:<18} {fx_name:<22} {fx['median_ms']:>10.3f} {fx['min_ms']:>10.3f} "
+                f"{fx['first_ms']:>10.3f} {fx['realtime_x'] or 0:>10.1f}"
+            )
+        print(f"{'':<18} {'(peak RSS)':<22} {res['peak_rss_mb']:>10.1f} MB (+{res['peak_rss_growth_mb']} MB)")
+
+    if diff is not None:
+        print()
+        print(f"{'stage':<18} {'fixture':<22} {'baseline':>10} {'current':>10} {'ratio':>7}  verdict")
+        for row in diff:
+            print(
+                f"{row['stage']:<18} {row['fixture']:<22} {row['baseline_ms']:>10.3f} "
+                f"{row['current_ms']:>10.3f} {row['ratio']:>7.3f}  {row['verdict']}"
+            )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench", description="분석 파이프라인 단계별 벤치마크 (오프라인)")
+    parser.add_argument("--stages", default=",".join(stage_names()), help=f"쉼표 구분 ({', '.join(stage_names())})")
+    parser.add_argument("--durations", default="10,30", help="오디오 픽스처 길이(초), 쉼표 구분")
+    parser.add_argument("--video-duration", type=float, default=10.0, help="영상 픽스처 길이(초)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1, help="측정에서 제외할 첫 실행 횟수 (모델 로드 등)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", default=None, help="픽스처/SQLite 위치 (기본: 임시 폴더, 종료 시 삭제)")
+    parser.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", default=None, help="비교할 기준선 JSON")
+    parser.add_argument("--save-baseline", default=None, help="이번 결과를 기준선으로 저장")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="회귀 판정 허용 비율")
+    parser.add_argument("--fail-on-regression", action="store_true", help="회귀가 있으면 종료 코드 1")
+    parser.add_argument("--verbose", action="store_true", help="단계 출력(print) 그대로 표시")
+    args = parser.parse_args(argv)
+
+    selected = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in selected if s not in STAGES]
+    if unknown:
+        parser.error(f"알 수 없는 단계: {', '.join(unknown)}")
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="fersona_bench_")
+    try:
+        durations = _parse_floats(args.durations)
+        print(f"[BENCH] 픽스처 생성 중... ({workdir})")
+        fixtures = build_fixtures(workdir, durations, args.video_duration, args.seed)
+
+        ctx: Dict[str, Any] = {"workdir": workdir}
+        try:
+            ctx["session_factory"] = sqlite_session_factory(workdir)
+        except Exception as e:
+            print(f"[BENCH] SQLite 준비 실패 → DB 단계 건너뜀: {e}")
+            ctx["session_factory"] = None
+
+        report: Dict[str, Any] = {
+            "schema_version": BENCH_SCHEMA_VERSION,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "env": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "whisper_model": os.getenv("WHISPER_MODEL", "base"),
+            },
+            "params": {
+                "durations": durations,
+                "video_duration": args.video_duration,
+                "repeat": args.repeat,
+                "warmup": args.warmup,
+                "seed": args.seed,
+            },
+            "stages": {},
+        }
+        for name in selected:
+            print(f"[BENCH] {name} 측정 중...")
+            if name in ("db_insert", "end_to_end") and ctx["session_factory"] is None:
+                report["stages"][name] = {"skipped": "SQLite 준비 실패"}
+                continue
+            report["stages"][name] = run_stage(name, fixtures, ctx, args.repeat, args.warmup, args.verbose)
+        report["peak_rss_mb"] = peak_rss_mb()
+
+        diff = None
+        if args.baseline:
+            with open(args.baseline, encoding="utf-8") as f:
+                diff = compare(report, json.load(f), args.tolerance)
+            report["comparison"] = {"baseline": args.baseline, "tolerance": args.tolerance, "rows": diff}
+
+        print()
+        print_report(report, diff)
+
+        for path in (args.out, args.save_baseline):
+            if path:
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump({k: v for k, v in report.items() if k != "comparison" or path == args.out},
+                              f, ensure_ascii=False, indent=2)
+                print(f"[BENCH] 저장 → {path}")
+
+        if args.fail_on_regression and diff and any(r["verdict"] == "regression" for r in diff):
+            return 1
+        return 0
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
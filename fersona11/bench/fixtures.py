@@ -0,0 +1,202 @@
+import os
+import wave
+import shutil
+import subprocess
+import numpy as np
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+# ----------------------------------------
+# 합성 미디어 픽스처
+# - 같은 seed → 같은 바이트 (네트워크 / 실제 녹화본 없이 반복 측정)
+# ----------------------------------------
+SAMPLE_RATE = 16000
+VIDEO_SIZE = (640, 480)
+VIDEO_FPS = 15
+
+AUDIO_KINDS = ("tone", "noise", "speech")
+VIDEO_KINDS = ("face", "noface")
+
+
+@dataclass
+class Fixture:
+    name: str
+    kind: str
+    duration_sec: float
+    path: str
+    whisper_result: Optional[Dict[str, Any]] = None
+
+
+# =========================================
+# ✅ 오디오 (16kHz mono PCM16 wav)
+# =========================================
+def _speech_like(n: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    말소리 흉내: 100~220Hz 사이를 오가는 기본음 + 배음, 초당 4음절 정도의 진폭 변조, 0.3~0.8초 쉼
+    (Whisper 가 한국어로 인식하지는 않지만 RMS / pyin / 구간 분할 비용은 실제와 비슷)
+    """
+    t = np.arange(n) / SAMPLE_RATE
+    f0 = 160 + 60 * np.sin(2 * np.pi * 0.3 * t) + rng.normal(0, 4, n).cumsum() / np.sqrt(n)
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    syllables = 0.5 * (1 + np.sin(2 * np.pi * 4.0 * t + rng.uniform(0, np.pi)))
+
+    gate = np.ones(n)
+    pos = 0
+    while pos < n:
+        pos += int(rng.uniform(1.5, 4.0) * SAMPLE_RATE)
+        gap = int(rng.uniform(0.3, 0.8) * SAMPLE_RATE)
+        gate[pos:pos + gap] = 0.0
+        pos += gap
+    return 0.3 * voice * syllables * gate + rng.normal(0, 0.003, n)
+
+
+def synth_audio(kind: str, duration_sec: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    n = int(duration_sec * SAMPLE_RATE)
+    if kind == "tone":
+        t = np.arange(n) / SAMPLE_RATE
+        y = 0.3 * np.sin(2 * np.pi * 220.0 * t)
+    elif kind == "noise":
+        y = rng.normal(0, 0.1, n)
+    elif kind == "speech":
+        y = _speech_like(n, rng)
+    else:
+        raise ValueError(f"알 수 없는 오디오 종류: {kind}")
+    return np.clip(y, -1.0, 1.0).astype(np.float32)
+
+
+def write_wav(path: str, y: np.ndarray) -> str:
+    pcm = (y * 32767).astype("<i2")
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(SAMPLE_RATE)
+        wf.writeframes(pcm.tobytes())
+    return path
+
+
+# =========================================
+# ✅ 비디오 (mp4v, 얼굴 그림 / 얼굴 없음)
+# =========================================
+def _draw_face(frame: np.ndarray, i: int, rng: np.random.Generator) -> None:
+    import cv2
+
+    w, h = VIDEO_SIZE
+    cx = w // 2 + int(10 * np.sin(i / 20))
+    cy = h // 2 + int(5 * np.cos(i / 25))
+    cv2.ellipse(frame, (cx, cy), (110, 145), 0, 0, 360, (150, 180, 225), -1)
+    eye_h = 2 if i % 45 < 3 else 12          # 3초마다 깜빡임
+    for dx in (-45, 45):
+        cv2.ellipse(frame, (cx + dx, cy - 35), (20, eye_h), 0, 0, 360, (255, 255, 255), -1)
+        cv2.circle(frame, (cx + dx + int(rng.integers(-3, 4)), cy - 35), 6, (40, 30, 20), -1)
+    cv2.line(frame, (cx, cy - 20), (cx - 8, cy + 20), (110, 140, 190), 3)
+    mouth = 10 + int(8 * abs(np.sin(i / 4)))
+    cv2.ellipse(frame, (cx, cy + 60), (40, mouth), 0, 0, 180, (60, 60, 160), -1)
+
+
+def synth_video(path: str, kind: str, duration_sec: float, seed: int = 0) -> str:
+    import cv2
+
+    rng = np.random.default_rng(seed)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), VIDEO_FPS, VIDEO_SIZE)
+    if not writer.isOpened():
+        raise RuntimeError("cv2.VideoWriter(mp4v) 를 열 수 없습니다.")
+    w, h = VIDEO_SIZE
+    gradient = np.tile(np.linspace(40, 200, w, dtype=np.uint8), (h, 1))
+    try:
+        for i in range(int(duration_sec * VIDEO_FPS)):
+            frame = cv2.merge([gradient, np.roll(gradient, i * 3, axis=1), gradient[::-1]])
+            if kind == "face":
+                _draw_face(frame, i, rng)
+            elif kind == "noface":
+                frame = cv2.add(frame, rng.integers(0, 30, frame.shape, dtype=np.uint8))
+            else:
+                raise ValueError(f"알 수 없는 비디오 종류: {kind}")
+            writer.write(frame)
+    finally:
+        writer.release()
+    return path
+
+
+def mux_audio(video_path: str, audio_path: str, out_path: str) -> Optional[str]:
+    """ffmpeg 가 있으면 영상+음성 mp4 생성 (업로드 전체 흐름 측정용), 없으면 None"""
+    if shutil.which("ffmpeg") is None:
+        return None
+    cmd = [
+        "ffmpeg", "-y", "-loglevel", "error", "-i", video_path, "-i", audio_path,
+        "-c:v", "copy", "-c:a", "aac", "-shortest", out_path,
+    ]
+    return out_path if subprocess.run(cmd, capture_output=True).returncode == 0 else None
+
+
+# =========================================
+# ✅ Whisper 결과 흉내 (피드백 / 직렬화 / DB 단계를 모델 없이 측정)
+# =========================================
+def synth_whisper_result(duration_sec: float, seed: int = 0) -> Dict[str, Any]:
+    rng = np.random.default_rng(seed)
+    segments: List[Dict[str, Any]] = []
+    start = 0.0
+    seg_id = 0
+    while start < duration_sec:
+        end = min(duration_sec, start + float(rng.uniform(2.0, 6.0)))
+        n_syll = int(rng.integers(6, 30))
+        segments.append({
+            "id": seg_id,
+            "seek": int(start * 100),
+            "start": round(start, 2),
+            "end": round(end, 2),
+            "text": "가나다라마바사" * (n_syll // 7 + 1),
+            "tokens": rng.integers(50000, 51000, int(rng.integers(20, 60))).tolist(),
+            "temperature": 0.0,
+            "avg_logprob": float(rng.uniform(-1.0, -0.1)),
+            "compression_ratio": float(rng.uniform(1.0, 2.5)),
+            "no_speech_prob": float(rng.uniform(0.0, 0.3)),
+            "seg_wpm": float(rng.uniform(40, 140)),
+            "f0_std": float(rng.uniform(5, 80)),
+        })
+        start = end
+        seg_id += 1
+
+    return {
+        "text": " ".join(s["text"] for s in segments),
+        "duration": round(duration_sec, 2),
+        "speech_time": round(duration_sec, 2),
+        "syllables_total": int(sum(len(s["text"]) for s in segments)),
+        "wpm_total": float(rng.uniform(60, 120)),
+        "f0_mean_total": float(rng.uniform(120, 200)),
+        "f0_std_total": float(rng.uniform(10, 60)),
+        "speech_score_value": 80.0,
+        "pitch_score_value": 75.0,
+        "feedback": {"speech": ["발화 속도가 안정적입니다."], "pitch": ["억양이 안정적입니다."]},
+        "segments": segments,
+    }
+
+
+def build_fixtures(workdir: str, durations: List[float], video_duration: float, seed: int = 0) -> Dict[str, List[Fixture]]:
+    """workdir 아래에 픽스처 생성 → {"audio": [...], "video": [...], "upload": [...]}"""
+    os.makedirs(workdir, exist_ok=True)
+    audio: List[Fixture] = []
+    for kind in AUDIO_KINDS:
+        for dur in durations:
+            path = write_wav(os.path.join(workdir, f"{kind}_{int(dur)}s.wav"), synth_audio(kind, dur, seed))
+            audio.append(Fixture(f"{kind}_{int(dur)}s", kind, dur, path, synth_whisper_result(dur, seed)))
+
+    video: List[Fixture] = []
+    upload: List[Fixture] = []
+    try:
+        speech_wav = write_wav(
+            os.path.join(workdir, "upload_audio.wav"), synth_audio("speech", video_duration, seed)
+        )
+        for kind in VIDEO_KINDS:
+            path = synth_video(os.path.join(workdir, f"{kind}_{int(video_duration)}s.mp4"), kind, video_duration, seed)
+            video.append(Fixture(f"{kind}_{int(video_duration)}s", kind, video_duration, path))
+            muxed = mux_audio(path, speech_wav, os.path.join(workdir, f"upload_{kind}.mp4"))
+            if muxed:
+                upload.append(Fixture(
+                    f"upload_{kind}_{int(video_duration)}s", kind, video_duration, muxed,
+                    synth_whisper_result(video_duration, seed),
+                ))
+    except ImportError as e:
+        print(f"[BENCH] 비디오 픽스처 생략 (opencv 없음): {e}")
+    return {"audio": audio, "video": video, "upload": upload}
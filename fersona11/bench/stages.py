@@ -0,0 +1,175 @@
+import os
+import shutil
+import tempfile
+from typing import Any, Callable, Dict, List, Tuple
+from bench.fixtures import Fixture
+
+# ----------------------------------------
+# 측정 단계
+# - 각 단계: (픽스처 그룹, setup(ctx) → run(fixture) 함수)
+# - setup 에서 무거운 모듈을 import → 의존성이 없으면 해당 단계만 건너뜀
+# ----------------------------------------
+StageRun = Callable[[Fixture], Any]
+
+
+def _audio_extract(ctx: Dict[str, Any]) -> StageRun:
+    from app.services.pipeline import process_video
+
+    def run(fx: Fixture) -> None:
+        audio = process_video(fx.path)
+        if not audio:
+            raise RuntimeError("오디오 추출 실패")
+        os.remove(audio)
+    return run
+
+
+def _speech_analysis(ctx: Dict[str, Any]) -> StageRun:
+    import whisper, librosa  # noqa: F401,E401  (analysis 모듈은 지연 import → 의존성 여기서 확인)
+    from app.services.analysis import analyze_speech
+
+    return lambda fx: analyze_speech(fx.path)
+
+
+def _segment_feedback(ctx: Dict[str, Any]) -> StageRun:
+    from app.services.feedback_service import generate_feedback_with_segments
+
+    return lambda fx: generate_feedback_with_segments(fx.whisper_result)
+
+
+def _video_analysis(ctx: Dict[str, Any]) -> StageRun:
+    import cv2, mediapipe  # noqa: F401,E401
+    from app.services.analysis import analyze_video_features
+
+    def run(fx: Fixture) -> None:
+        preview_dir = tempfile.mkdtemp(dir=ctx["workdir"])
+        try:
+            analyze_video_features(fx.path, preview_dir=preview_dir)
+        finally:
+            shutil.rmtree(preview_dir, ignore_errors=True)
+    return run
+
+
+def _vision_roi_check(ctx: Dict[str, Any]) -> StageRun:
+    """
+    ROI 크롭 경로와 전체 프레임 경로의 랜드마크 비교 (정확도 확인용, 시간도 함께 기록)
+    - 두 경로가 같은 프레임에서 모두 얼굴을 찾았을 때 평균 좌표 차이가 허용치를 넘으면 실패
+    """
+    import cv2
+    import mediapipe  # noqa: F401
+    import numpy as np
+    from app.config import settings
+    from app.services.analysis import create_face_mesh
+    from app.services.face_roi import FaceMeshInput
+
+    tolerance = 0.01    # 원본 기준 정규화 좌표 (1080p 가로 약 19px)
+
+    def run(fx: Fixture) -> None:
+        roi = FaceMeshInput(create_face_mesh, max_side=settings.VISION_WORK_MAX_SIDE, use_roi=True)
+        full = FaceMeshInput(create_face_mesh, max_side=settings.VISION_WORK_MAX_SIDE, use_roi=False)
+        cap = cv2.VideoCapture(fx.path)
+        diffs, mismatched = [], 0
+        try:
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                a, b = roi.landmarks(frame), full.landmarks(frame)
+                if (a is None) != (b is None):
+                    mismatched += 1
+                elif a is not None:
+                    diffs.append(float(np.abs(a - b).mean()))
+        finally:
+            cap.release()
+            roi.close()
+            full.close()
+        mean_diff = float(np.mean(diffs)) if diffs else 0.0
+        if mean_diff > tolerance or mismatched > max(1, len(diffs) // 20):
+            raise AssertionError(
+                f"ROI 경로 랜드마크 불일치: 평균 차이 {mean_diff:.4f} (허용 {tolerance}), "
+                f"한쪽만 검출 {mismatched}프레임, stats={roi.summary()}"
+            )
+    return run
+
+
+def _result_codec(ctx: Dict[str, Any]) -> StageRun:
+    from app.services.result_codec import split_analysis, encode_detail, decode_detail
+
+    def run(fx: Fixture) -> None:
+        summary, detail = split_analysis(fx.whisper_result)
+        encoded = encode_detail(detail)
+        decode_detail(encoded["codec"], encoded["payload"], encoded["schema_version"])
+    return run
+
+
+def _db_insert(ctx: Dict[str, Any]) -> StageRun:
+    from app.services.report_service import analyze_and_insert_with_feedback
+    from app.services.score_history import extract_scores
+    from app.services.user_identity import resolve_user_id
+
+    session_factory = ctx["session_factory"]
+
+    def run(fx: Fixture) -> None:
+        db = session_factory()
+        try:
+            user_pk = resolve_user_id(db, "bench_user")
+            analyze_and_insert_with_feedback(
+                db=db,
+                analysis_result=dict(fx.whisper_result),
+                user_id=user_pk,
+                scores=extract_scores(fx.whisper_result),
+            )
+        finally:
+            db.close()
+    return run
+
+
+def _end_to_end(ctx: Dict[str, Any]) -> StageRun:
+    """업로드 1건: 오디오 추출 → 음성 → 피드백 → 영상 → 점수 → DB (저장소 복사 제외)"""
+    import whisper, librosa, cv2, mediapipe  # noqa: F401,E401
+    from app.services.pipeline import process_video
+    from app.services.analysis import analyze_speech, analyze_video_features
+    from app.services.feedback_service import generate_feedback_with_segments
+    from app.services.report_service import analyze_and_insert_with_feedback
+    from app.services.score_history import extract_scores
+    from app.services.user_identity import resolve_user_id
+
+    session_factory = ctx["session_factory"]
+
+    def run(fx: Fixture) -> None:
+        audio = process_video(fx.path)
+        if not audio:
+            raise RuntimeError("오디오 추출 실패")
+        preview_dir = tempfile.mkdtemp(dir=ctx["workdir"])
+        db = session_factory()
+        try:
+            whisper_result = analyze_speech(audio)
+            whisper_result["feedback"] = generate_feedback_with_segments(whisper_result)
+            report_result = analyze_video_features(fx.path, preview_dir=preview_dir)
+            analyze_and_insert_with_feedback(
+                db=db,
+                analysis_result=whisper_result,
+                user_id=resolve_user_id(db, "bench_user"),
+                scores=extract_scores(report_result, whisper_result),
+            )
+        finally:
+            db.close()
+            os.remove(audio)
+            shutil.rmtree(preview_dir, ignore_errors=True)
+    return run
+
+
+# 실행 순서 = 정의 순서 (가벼운 단계부터 → 최대 RSS 증가분이 단계별로 보이도록)
+STAGES: Dict[str, Tuple[str, Callable[[Dict[str, Any]], StageRun]]] = {
+    "segment_feedback": ("audio", _segment_feedback),
+    "result_codec": ("audio", _result_codec),
+    "db_insert": ("audio", _db_insert),
+    "audio_extract": ("upload", _audio_extract),
+    "video_analysis": ("video", _video_analysis),
+    "vision_roi_check": ("video", _vision_roi_check),
+    "speech_analysis": ("audio", _speech_analysis),
+    "end_to_end": ("upload", _end_to_end),
+}
+
+
+def stage_names() -> List[str]:
+    return list(STAGES)
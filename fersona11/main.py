@@ -1,72 +1,104 @@
 import os
 import json
-import tempfile
-import subprocess
+import threading
 import traceback
-from fastapi import FastAPI, UploadFile, Form, HTTPException
+from typing import Optional
+from fastapi import FastAPI, UploadFile, Form, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.staticfiles import StaticFiles
-from sqlalchemy.orm import sessionmaker
-from app.database import engine, init_db, get_db_connection
-from app.services.analysis import analyze_speech, analyze_video_features
-from app.services.feedback_service import generate_feedback_with_segments
-from app.services.report_service import analyze_and_insert_with_feedback
-from app.models import User
+from app.config import settings
+from app.database import get_db_connection, init_db, SessionLocal
+from app.services.expiry_sweeper import start_expiry_sweeper, stop_expiry_sweeper
+from app.services.retention import start_retention_worker, stop_retention_worker
+from app.services.pdf_report import shutdown_report_workers
+from app.services.pipeline import run_upload_pipeline, store_upload
+from app.services.result_payload import parse_include, slim_result
+from app.services.report_service import load_result_payload
+from app.services.admission import analysis_admission, AdmissionRejected
+from app.services.model_policy import analysis_policy
+from app.utils.metrics import stage_timer, render_metrics, JOBS, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from app.utils.tracing import JobTrace, use_trace, annotate
+from app.utils.json_response import FastJSONResponse
+from app.utils.compression import JSONCompressionMiddleware
+from app.routers import trends, playback, direct_upload, debug, jobs
+from app.routers.jobs import start_job_progress
 
 # =========================================
 # ✅ 업로드 디렉토리 설정
 # =========================================
-UPLOAD_DIR = "/home/ubuntu/fersona/uploads"
+UPLOAD_DIR = settings.UPLOAD_DIR
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)
+
+# ✅ JSON 응답 압축 (br/gzip, 1KB 이상만 / 영상·Range 응답 제외)
+app.add_middleware(JSONCompressionMiddleware, minimum_size=1024)
+
+# ✅ 분석 대기열 초과 → 429 (Retry-After = 최근 작업 시간 이동 평균 기반)
+@app.exception_handler(AdmissionRejected)
+async def _admission_rejected(request: Request, exc: AdmissionRejected):
+    print(f"[ADMISSION] 요청 거절 ({exc.reason}) retry_after={exc.retry_after}s")
+    JOBS.inc(outcome="rejected")
+    return FastJSONResponse(
+        {"detail": "분석 요청이 많아 잠시 후 다시 시도해주세요.", "retry_after": exc.retry_after},
+        status_code=429,
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+# ✅ 분석 대기열 상태 조회
+@app.get("/fersona/api/admission")
+def get_admission_state():
+    return {**analysis_admission.snapshot(), "analysis_policy": analysis_policy.snapshot()}
+
+
+# ✅ Prometheus 지표 (단계별 지연 / 작업 수 / 대기열 / 모델 로드 / 실시간 배수)
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
 
 # ✅ 정적 파일 서빙 (React와 Nginx의 /fersona/api/uploads 경로 일치)
 app.mount("/fersona/api/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
+app.include_router(trends.router, prefix="/fersona/api")
+app.include_router(playback.router, prefix="/fersona/api")
+app.include_router(direct_upload.router, prefix="/fersona/api")
+app.include_router(debug.router, prefix="/fersona/api")
+app.include_router(jobs.router, prefix="/fersona/api")
 
 
 # =========================================
-# ✅ DB 저장 함수
+# ✅ 백그라운드 작업 (프로세스당 스레드 1개씩)
+# - 비회원 데이터 만료 스위퍼
+# - 원본 → 저용량 변환 / 회원 용량 쿼터 정리
 # =========================================
-def save_analysis_to_db(conn, user_id, video_path, audio_path, result_data):
-    """분석 결과 DB 저장"""
-    try:
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                INSERT INTO analysis (user_id, video_path, audio_path, timestamp, result_data)
-                VALUES (%s, %s, %s, NOW(), %s)
-            """, (user_id, video_path, audio_path, json.dumps(result_data)))
-            conn.commit()
-            print("[DB] 데이터 저장 완료 ✅")
-    except Exception as e:
-        print(f"[DB] 저장 실패: {e}")
-    finally:
-        if conn:
-            conn.close()
-
-
-# =========================================
-# ✅ 비디오 처리 함수 (오디오 추출)
-# =========================================
-def process_video(video_path: str):
-    """비디오에서 오디오 추출"""
-    try:
-        tmp_audio = tempfile.NamedTemporaryFile(delete=False, suffix=".wav").name
-        cmd = [
-            "ffmpeg", "-y", "-i", video_path,
-            "-vn", "-acodec", "pcm_s16le", "-ar", "16000", "-ac", "1",
-            tmp_audio
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-
-        if result.returncode != 0:
-            print(f"[FFMPEG ERROR] {result.stderr}")
-            return None
-
-        print(f"[FFMPEG] 오디오 추출 완료 → {tmp_audio}")
-        return tmp_audio
-    except Exception as e:
-        print(f"[ERROR] ffmpeg 추출 실패: {e}")
-        return None
+@app.on_event("startup")
+def _init_tables():
+    # ORM 테이블 생성 (예전에는 업로드마다 init_db 호출)
+    conn = init_db()
+    if conn:
+        conn.close()
+
+
+@app.on_event("startup")
+def _start_background_jobs():
+    # 다중 워커에서는 한 프로세스만 주기 작업 실행 (serve.py 가 워커별로 지정)
+    if settings.RUN_BACKGROUND_JOBS:
+        start_expiry_sweeper(SessionLocal)
+        start_retention_worker(SessionLocal)
+    if settings.ANALYSIS_PRELOAD_MODELS:
+        # 분석 워커 전용: 기동 응답을 막지 않도록 별도 스레드에서 로드
+        from app.services.analysis import preload_models
+        threading.Thread(
+            target=preload_models, args=(analysis_policy.whisper_models(),), name="model-preload", daemon=True
+        ).start()
+
+
+@app.on_event("shutdown")
+def _stop_background_jobs():
+    stop_expiry_sweeper()
+    stop_retention_worker()
+    shutdown_report_workers()
 
 
 # =========================================
@@ -76,68 +108,47 @@ def process_video(video_path: str):
 async def upload_media(
     user_id: str = Form(...),
     video: UploadFile = Form(...),
+    include: Optional[str] = None,
+    job_id: Optional[str] = None,
 ):
+    """
+    영상 업로드 → 분석 → 결과 반환
+    - 기본 응답은 화면에서 쓰는 필드만 (Whisper segments 제외)
+    - ?include=segments (구간 시작/끝/텍스트) / raw_segments (Whisper 원본)
+    - ?job_id= (uuid4 hex) 를 정해 보내면 GET /fersona/api/jobs/{job_id}/events 로 단계별 부분 결과 수신
+    """
+    # ✅ 진행 문서 등록 (단계별 부분 결과 → SSE), 응답 헤더 X-Job-Id
+    progress = await start_job_progress(job_id, user_id)
     try:
-        print(f"[UPLOAD] 요청 수신 user_id={user_id}, file={video.filename}")
-
-        # 1️⃣ 비디오 저장
-        save_path = os.path.join(UPLOAD_DIR, video.filename)
-        with open(save_path, "wb") as f:
-            f.write(await video.read())
-        print(f"[UPLOAD] 비디오 저장 완료 → {save_path}")
-
-        # 2️⃣ 오디오 추출
-        temp_audio = process_video(save_path)
-        if not temp_audio:
-            raise HTTPException(status_code=500, detail="오디오 추출 실패")
-
-        # 3️⃣ Whisper + 비디오 분석
-        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-        db = SessionLocal()
-
-        print("[ANALYSIS] Whisper 음성 분석 시작...")
-        whisper_result = analyze_speech(temp_audio)
-
-        print("[ANALYSIS] Whisper 세그먼트 피드백 생성...")
-        whisper_feedback = generate_feedback_with_segments(whisper_result)
-        whisper_result["feedback"] = whisper_feedback
-
-        print("[ANALYSIS] 비디오(시선/표정) 분석 시작...")
-        report_result = analyze_video_features(save_path)
-
-        # ✅ 사용자 정보 확인/생성
-        user_obj = db.query(User).filter(User.username == user_id).first()
-        if not user_obj:
-            user_obj = User(username=user_id)
-            db.add(user_obj)
-            db.commit()
-            db.refresh(user_obj)
-            print(f"[USER] 새 사용자 생성: username={user_id}, id={user_obj.id}")
-
-        # ✅ 결과 통합 및 DB 반영
-        analyze_and_insert_with_feedback(
-            db=db,
-            analysis_result=whisper_result,
-            user_id=user_obj.id
-        )
+        print(f"[UPLOAD] 요청 수신 user_id={user_id}, file={video.filename}, job_id={progress.job_id}")
+
+        # ✅ 작업 트레이스 (단계별 span 을 결과와 함께 저장)
+        trace = JobTrace("upload", job_id=progress.job_id, user_id=user_id, filename=video.filename)
 
-        # ✅ 결과 JSON 통합
-        result_data = {
-            "user_id": user_id,
-            "video_file": f"/fersona/api/uploads/{video.filename}",
-            "audio_file": temp_audio,
-            "report": report_result,
-            "whisper": whisper_result
-        }
+        # ✅ 동시 분석 수 제한 (대기열이 가득 차면 429 + Retry-After)
+        async with analysis_admission.slot():
+            # 1️⃣ 비디오 저장 (내용 해시 기반 blob, 새 파일이면 재생용 remux 후 저장) + 영상 행 등록
+            with use_trace(trace), stage_timer("upload_store"):
+                blob, video_id = await run_in_threadpool(store_upload, video.file, video.filename, user_id)
+                annotate(size=blob.size, dedup=not blob.created)
+            print(f"[UPLOAD] 비디오 저장 완료 → {blob.key} (dedup={not blob.created}, video_id={video_id})")
 
-        # ✅ DB 저장
-        conn = init_db()
-        save_analysis_to_db(conn, user_id, save_path, temp_audio, result_data)
+            # 2️⃣~4️⃣ 오디오 추출 → 분석 → DB 반영 (이벤트 루프를 막지 않도록 스레드에서)
+            result_data = await run_in_threadpool(
+                run_upload_pipeline, user_id, blob, video.filename, trace, progress, video_id
+            )
 
         print("[UPLOAD] 전체 프로세스 완료 ✅")
-        return {"result": result_data}
+        return FastJSONResponse(
+            {"result": slim_result(result_data, parse_include(include))},
+            headers={"X-Job-Id": progress.job_id},
+        )
 
+    except AdmissionRejected as e:
+        await run_in_threadpool(progress.fail, e.reason)
+        raise
     except Exception as e:
+        await run_in_threadpool(progress.fail, f"{type(e).__name__}: {e}")
         print("[ERROR] 업로드 중 예외 발생:", e)
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
@@ -150,69 +161,70 @@ async def upload_media(
 async def upload_alias(
     user_id: str = Form(...),
     video: UploadFile = Form(...),
+    include: Optional[str] = None,
+    job_id: Optional[str] = None,
 ):
     """호환용 alias 경로 (/upload → /fersona/api/upload)"""
     print("[ALIAS] /upload 경로로 요청 → /fersona/api/upload 처리")
-    return await upload_media(user_id=user_id, video=video)
+    return await upload_media(user_id=user_id, video=video, include=include, job_id=job_id)
 
 
 # =========================================
 # ✅ 결과 조회 엔드포인트
 # =========================================
-@app.get("/fersona/api/result/{user_id}")
-def get_analysis_result(user_id: str):
-    """특정 user_id의 최근 분석 결과 조회"""
-    conn = None
+def _load_legacy_report(user_id: str) -> dict:
+    """analysis_result 에 report 가 없는 예전 행 → 구 analysis 테이블의 최근 report (읽기 전용)"""
+    conn = get_db_connection()
+    if not conn:
+        return {}
     try:
-        conn = get_db_connection()
-        if not conn:
-            raise HTTPException(status_code=500, detail="DB 연결 실패")
-
-        with conn.cursor() as cursor:
+        with conn.cursor(dictionary=True) as cursor:
             cursor.execute("""
-                SELECT id, user_id, video_path, audio_path, timestamp, result_data
+                SELECT result_data
                 FROM analysis
                 WHERE user_id = %s
                 ORDER BY id DESC
                 LIMIT 1
             """, (user_id,))
-            result = cursor.fetchone()
+            row = cursor.fetchone()
+    except Exception as e:
+        print(f"[RESULT] 구 analysis 테이블 조회 실패: {e}")
+        return {}
+    finally:
+        conn.close()
+    try:
+        return (json.loads(row["result_data"]) if row and row.get("result_data") else {}).get("report") or {}
+    except Exception:
+        return {}
+
 
+@app.get("/fersona/api/result/{user_id}")
+def get_analysis_result(user_id: str, include: Optional[str] = None):
+    """특정 user_id의 최근 분석 결과 조회 (?include= 는 업로드 응답과 동일)"""
+    db = SessionLocal()
+    try:
+        # 요약 행 + 압축 상세 문서 병합 (긴 목록은 상세 문서에 있음)
+        include_set = parse_include(include)
+        result = load_result_payload(db, username=user_id)
         if not result:
             raise HTTPException(status_code=404, detail=f"{user_id} 결과 없음")
-
-        parsed = {}
-        if result.get("result_data"):
-            try:
-                parsed = json.loads(result["result_data"])
-            except Exception:
-                parsed = {}
-
-        response = {
-            "result": {
-                "id": result.get("id"),
-                "user_id": result.get("user_id"),
-                "video_file": parsed.get("video_file", ""),
-                "audio_file": parsed.get("audio_file", ""),
-                "report": parsed.get("report", {}),
-                "whisper": parsed.get("whisper", {}),
-                "timestamp": result.get("timestamp"),
-            }
-        }
+        if not result["report"]:
+            result["report"] = _load_legacy_report(user_id)
 
         print(f"[RESULT] 조회 성공 user_id={user_id}")
-        return response
+        return FastJSONResponse({"result": slim_result(result, include_set)})
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"[ERROR] 결과 조회 실패: {e}")
         raise HTTPException(status_code=500, detail=str(e))
     finally:
-        if conn:
-            conn.close()
+        db.close()
 
 
 # =========================================
-# ✅ 실행부
+# ✅ 실행부 (개발용, 운영은 python serve.py)
 # =========================================
 if __name__ == "__main__":
     import uvicorn
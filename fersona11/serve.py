@@ -0,0 +1,253 @@
+"""
+운영용 pre-fork 서버
+
+    python serve.py                  # SERVE_* 설정 (.env) 사용
+    SERVE_WORKERS=4 python serve.py
+
+- 마스터가 앱 import + Whisper 가중치(작업별 설정에서 쓰는 모델 전부)를 1회 로드 → gc.freeze() → 워커 N개 fork
+  워커는 같은 물리 페이지를 copy-on-write 로 공유 (모델이 워커 수만큼 복제되지 않음)
+- 리슨 소켓은 마스터가 열고 워커가 공유 (커널이 연결을 분배)
+- 워커 고유 메모리(USS)가 상한을 넘으면 새 워커를 먼저 띄우고 기존 워커를 graceful 종료
+- FaceMesh(mediapipe)는 내부 스레드가 있어 fork 전에 만들지 않음 (분석 1건마다 새로 생성)
+"""
+import gc
+import math
+import os
+import sys
+import time
+import signal
+import socket
+from typing import Dict, Optional
+
+from app.config import settings
+
+# 워커 상태: pid → 슬롯 번호 (슬롯 0 이 주기 작업 담당)
+_workers: Dict[int, int] = {}
+_retiring: Dict[int, float] = {}        # 종료 요청한 pid → SIGKILL 기한
+_shutting_down = False
+
+
+# =========================================
+# ✅ 메모리 측정 (Linux /proc)
+# =========================================
+def worker_private_mb(pid: int) -> Optional[float]:
+    """
+    공유 페이지를 뺀 워커 고유 메모리(MB)
+    - smaps_rollup 의 Private_Clean + Private_Dirty (CoW 로 복사된 페이지만 포함)
+    - RSS 는 공유된 모델 가중치까지 워커마다 세므로 재활용 기준으로 쓰지 않음
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            kb = sum(int(line.split()[1]) for line in f if line.startswith(("Private_Clean:", "Private_Dirty:")))
+        return kb / 1024.0
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+# =========================================
+# ✅ 마스터: 공유할 것들 미리 로드
+# =========================================
+def preload(app_path: str = "main:app"):
+    module_name, attr = app_path.split(":", 1)
+    module = __import__(module_name)
+    app = getattr(module, attr)
+
+    if settings.SERVE_PRELOAD_WHISPER:
+        from app.services.analysis import get_whisper_model
+        from app.services.model_policy import analysis_policy
+
+        # 작업별 설정에서 쓰일 수 있는 모델 모두 (부하 때 쓰는 가벼운 모델도 워커끼리 공유)
+        for model_name in analysis_policy.whisper_models():
+            started = time.perf_counter()
+            try:
+                get_whisper_model(model_name)
+                print(f"[SERVE] Whisper({model_name}) 가중치 마스터 로드 완료 ({time.perf_counter() - started:.1f}s)")
+            except Exception as e:
+                print(f"[SERVE] Whisper({model_name}) 사전 로드 실패 → 워커별 첫 분석 때 로드: {e}")
+
+    # import/로드로 생긴 객체를 GC 추적 대상에서 제외
+    # → 워커에서 GC 가 돌 때 이 객체들의 헤더를 건드려 페이지가 복사되는 일을 줄임
+    gc.collect()
+    gc.freeze()
+    return app
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+# =========================================
+# ✅ 워커
+# =========================================
+def _run_worker(app, sock: socket.socket, slot: int, workers: int) -> None:
+    import uvicorn
+
+    # 마스터 신호 처리기 해제 (uvicorn 이 SIGTERM/SIGINT 를 직접 처리)
+    for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+        signal.signal(sig, signal.SIG_DFL)
+
+    # 주기 작업은 슬롯 0 워커만 (startup 이벤트에서 확인)
+    settings.RUN_BACKGROUND_JOBS = slot == 0
+
+    # fork 이전 커넥션 풀을 물려받지 않도록 (부모 소켓은 닫지 않고 버림)
+    from app.database import engine
+    engine.dispose(close=False)
+
+    # 분석 동시 실행 수 / 대기열 길이는 서버 전체 기준 → 워커별로 나눔 (워커당 최소 1)
+    from app.services.admission import analysis_admission
+    analysis_admission.resize(
+        limit=math.ceil(settings.ANALYSIS_MAX_CONCURRENCY / workers),
+        max_queue=math.ceil(settings.ANALYSIS_QUEUE_DEPTH / workers),
+    )
+
+    # 워커 수만큼 torch 스레드가 겹치지 않도록
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        threads = settings.SERVE_TORCH_THREADS or max(1, (os.cpu_count() or 1) // workers)
+        torch.set_num_threads(threads)
+
+    config = uvicorn.Config(
+        app,
+        host=settings.SERVE_HOST,
+        port=settings.SERVE_PORT,
+        timeout_graceful_shutdown=settings.SERVE_GRACEFUL_TIMEOUT_SEC,
+        log_level="info",
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def spawn(app, sock: socket.socket, slot: int, workers: int) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            _run_worker(app, sock, slot, workers)
+        except BaseException as e:
+            print(f"[SERVE] 워커 {os.getpid()} 비정상 종료: {e}")
+            code = 1
+        finally:
+            os._exit(code)
+    _workers[pid] = slot
+    print(f"[SERVE] 워커 시작 pid={pid} slot={slot}")
+    return pid
+
+
+def retire(pid: int, reason: str) -> None:
+    """SIGTERM → uvicorn graceful 종료 (진행 중 요청 완료 대기), 기한이 지나면 SIGKILL"""
+    if pid in _retiring:
+        return
+    print(f"[SERVE] 워커 교체 pid={pid} ({reason})")
+    _retiring[pid] = time.monotonic() + settings.SERVE_GRACEFUL_TIMEOUT_SEC + 10
+    try:
+        os.kill(pid, signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+
+
+def _reap() -> list:
+    """종료된 워커 정리 → 다시 띄워야 할 슬롯 목록"""
+    respawn = []
+    while True:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid == 0:
+            break
+        slot = _workers.pop(pid, None)
+        was_retiring = _retiring.pop(pid, None) is not None
+        if slot is None:
+            continue
+        if not was_retiring:
+            print(f"[SERVE] 워커 종료 감지 pid={pid} status={status} → 재시작")
+            respawn.append(slot)
+    return respawn
+
+
+def _handle_stop(signum, frame) -> None:
+    global _shutting_down
+    _shutting_down = True
+
+
+# =========================================
+# ✅ 마스터 루프
+# =========================================
+def main() -> int:
+    workers = settings.SERVE_WORKERS or (os.cpu_count() or 1)
+    limit_mb = settings.SERVE_MAX_WORKER_MEMORY_MB
+
+    sock = bind_socket(settings.SERVE_HOST, settings.SERVE_PORT)
+    print(f"[SERVE] {settings.SERVE_HOST}:{settings.SERVE_PORT} 리슨, 워커 {workers}개")
+    if workers > settings.ANALYSIS_MAX_CONCURRENCY:
+        print(
+            f"[SERVE] 워커 {workers}개 > ANALYSIS_MAX_CONCURRENCY={settings.ANALYSIS_MAX_CONCURRENCY} "
+            f"→ 워커당 1개씩, 서버 전체 동시 분석은 최대 {workers}개"
+        )
+    app = preload()
+
+    signal.signal(signal.SIGTERM, _handle_stop)
+    signal.signal(signal.SIGINT, _handle_stop)
+
+    for slot in range(workers):
+        spawn(app, sock, slot, workers)
+
+    next_check = time.monotonic() + settings.SERVE_MEMORY_CHECK_SEC
+    while not _shutting_down:
+        for slot in _reap():
+            spawn(app, sock, slot, workers)
+
+        now = time.monotonic()
+        for pid, deadline in list(_retiring.items()):
+            if now > deadline:
+                print(f"[SERVE] graceful 종료 기한 초과 → SIGKILL pid={pid}")
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                _retiring[pid] = now + 3600
+
+        if limit_mb > 0 and now >= next_check:
+            next_check = now + settings.SERVE_MEMORY_CHECK_SEC
+            for pid, slot in list(_workers.items()):
+                if pid in _retiring:
+                    continue
+                used = worker_private_mb(pid)
+                if used is not None and used > limit_mb:
+                    # 새 워커를 먼저 띄워 처리량이 비지 않게 한 뒤 기존 워커 종료
+                    spawn(app, sock, slot, workers)
+                    retire(pid, f"고유 메모리 {used:.0f}MB > {limit_mb}MB")
+
+        time.sleep(0.5)
+
+    # ✅ 종료: 모든 워커 graceful 종료 후 대기
+    print("[SERVE] 종료 신호 수신 → 워커 정리")
+    for pid in list(_workers):
+        retire(pid, "shutdown")
+    deadline = time.monotonic() + settings.SERVE_GRACEFUL_TIMEOUT_SEC + 10
+    while _workers and time.monotonic() < deadline:
+        _reap()
+        time.sleep(0.2)
+    for pid in list(_workers):
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    sock.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())